@@ -0,0 +1,102 @@
+# =============================================================================
+# Platformer: The Mysterious Path - Simulation Level of Detail
+#
+# Only the enemies and parts near a player need simulating every tick. An
+# ActivitySet keeps a level's entities sorted by position, so finding those
+# within reach of the players is a binary search and costs the same on a
+# level of any length. The rest sleep. A sleeping entity remembers the
+# tick it fell asleep and, when a player comes near again, catches up in
+# one step with its advance(ticks) method, which works out where the
+# skipped ticks would have left it. Its movement is a fixed back-and-forth
+# cycle, so it ends up exactly where stepping it would have. Entities that
+# don't move, and whose look is worked out from the world clock (see
+# animation.py), have nothing to catch up on.
+# =============================================================================
+
+import bisect
+
+
+class ActivitySet:
+    """A level's entities, split into those near a player (awake) and the rest.
+
+    `span(entity)` returns the (left, right) level x range the entity can
+    move in. Entities further than `wake_distance` from every player sleep.
+    With `catch_up` they must have an advance(ticks) method, called for the
+    ticks they slept through.
+    """
+    def __init__(self, entities, span, wake_distance, catch_up=True):
+        self.span = span
+        self.wake_distance = wake_distance
+        self.catch_up = catch_up
+        self.entities = sorted(entities, key=lambda entity: span(entity)[0])
+        self.lefts = [span(entity)[0] for entity in self.entities]
+        self.widest = max((right - left for left, right in map(span, self.entities)), default=0)
+        self.asleep_since = {entity: 0 for entity in self.entities} # Entity -> tick it stopped moving
+        self.awake = [] # Entities simulated this tick, in level order
+        self.removed = set()
+
+    def near(self, xs):
+        """The entities within wake_distance of any of the x positions, in level order."""
+        found = {}
+        for x in xs:
+            low, high = x - self.wake_distance, x + self.wake_distance
+            start = bisect.bisect_left(self.lefts, low - self.widest)
+            end = bisect.bisect_right(self.lefts, high)
+            for index in range(start, end):
+                entity = self.entities[index]
+                if self.span(entity)[1] >= low and entity not in self.removed:
+                    found[index] = entity
+        return [found[index] for index in sorted(found)]
+
+    def update(self, xs, tick):
+        """Wakes the entities near the players at `xs` and puts the rest to sleep.
+
+        Call at the start of a tick, before the awake entities are moved.
+        """
+        awake = self.near(xs)
+        for entity in awake:
+            since = self.asleep_since.pop(entity, None)
+            if self.catch_up and since is not None and since != tick:
+                entity.advance(tick - since)
+        awake_now = set(awake)
+        for entity in self.awake:
+            if entity not in awake_now:
+                self.asleep_since[entity] = tick
+        self.awake = awake
+
+    def remove(self, entity):
+        """Drops an entity for good, e.g. a collected part."""
+        self.removed.add(entity)
+        if entity in self.awake:
+            self.awake.remove(entity)
+        self.asleep_since.pop(entity, None)
+
+    def sync(self, tick):
+        """Brings every sleeping entity up to `tick` without waking it."""
+        if not self.catch_up:
+            return
+        for entity, since in self.asleep_since.items():
+            if since != tick:
+                entity.advance(tick - since)
+                self.asleep_since[entity] = tick
+
+    def near_synced(self, xs, tick):
+        """near(xs), with any sleeping entities among them brought up to `tick` without waking them."""
+        entities = self.near(xs)
+        if self.catch_up:
+            for entity in entities:
+                since = self.asleep_since.get(entity)
+                if since is not None and since != tick:
+                    entity.advance(tick - since)
+                    self.asleep_since[entity] = tick
+        return entities
+
+    def reset(self, present, tick):
+        """Starts over after the entities' state was replaced, e.g. by a snapshot.
+
+        `present` are the entities still in the level; everything is put to
+        sleep as of `tick` and the next update() wakes what's near.
+        """
+        self.asleep_since = {entity: tick for entity in present}
+        self.removed = set(self.entities) - self.asleep_since.keys()
+        self.awake = []
@@ -0,0 +1,67 @@
+# =============================================================================
+# Platformer: The Mysterious Path - Animation Clips
+#
+# Animations are evaluated, not stepped. Which frame a clip shows, or how
+# far a part has floated, is a pure function of the world clock (in
+# milliseconds) and a per-entity phase, so nothing is written per frame,
+# sleeping or off-screen entities cost nothing, and drawing doesn't depend
+# on the order things were updated or drawn in. A world restored from a
+# snapshot or rewound looks exactly as it did, because the clock is saved.
+#
+# The clips themselves are data, in assets/animations.json: sets of named
+# clips, each either a list of frame images or a strip cut from a
+# spritesheet, with the time each frame is shown for.
+# =============================================================================
+
+import json
+
+import pygame
+
+CLIPS_PATH = "assets/animations.json"
+
+
+class Clip:
+    """A sequence of frames, each shown for `frame_ms`, and their mirrored copies."""
+    def __init__(self, frames, frame_ms, loop=True):
+        self.frames = frames
+        # Mirrored once here rather than with a transform on every draw
+        self.flipped = [pygame.transform.flip(frame, True, False) for frame in frames]
+        self.frame_ms = frame_ms
+        self.loop = loop
+
+    def index(self, elapsed):
+        """The frame showing `elapsed` ms into the clip; non-looping clips hold their last frame."""
+        index = int(elapsed // self.frame_ms)
+        return index % len(self.frames) if self.loop else min(index, len(self.frames) - 1)
+
+    def frame(self, elapsed, flipped=False):
+        """The image showing `elapsed` ms into the clip."""
+        return (self.flipped if flipped else self.frames)[self.index(elapsed)]
+
+
+def ping_pong(t, period):
+    """Goes from -1 up to 1 and back down again once every `period`, starting at 0 rising."""
+    phase = (t / period + 0.25) % 1.0
+    return 4 * phase - 1 if phase < 0.5 else 3 - 4 * phase
+
+
+def load_clips(name, load_image, path=CLIPS_PATH):
+    """Loads one set of clips from the clip file as {clip name: Clip}.
+
+    `load_image(path, size, area)` loads a frame at its in-game size; the
+    set's "size" (an integer scale or a [width, height]) is passed through.
+    """
+    with open(path) as f:
+        clip_set = json.load(f)[name]
+    size = clip_set["size"]
+    size = size if isinstance(size, int) else tuple(size)
+    clips = {}
+    for clip_name, spec in clip_set["clips"].items():
+        if "sheet" in spec:
+            # A strip of equally sized frames, cut without measuring the sheet first
+            width, height = spec["frame_size"]
+            frames = [load_image(spec["sheet"], size, (i * width, 0, width, height)) for i in range(spec["count"])]
+        else:
+            frames = [load_image(frame_path, size) for frame_path in spec["frames"]]
+        clips[clip_name] = Clip(frames, spec["frame_ms"], spec.get("loop", True))
+    return clips
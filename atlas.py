@@ -0,0 +1,143 @@
+# =============================================================================
+# Platformer: The Mysterious Path - Sprite Atlas
+#
+# Packs every sprite the game uses, already scaled to its in-game size, into
+# a few large atlas pages plus a JSON index. At runtime the game loads the
+# pages once and serves sprites as subsurfaces (source rects into the page)
+# instead of decoding dozens of separate PNGs.
+#
+# Usage (offline, re-run whenever sprites change):
+#   python atlas.py
+# =============================================================================
+
+import json
+import os
+
+import pygame
+
+ATLAS_DIR = "assets/atlas"
+ATLAS_INDEX = os.path.join(ATLAS_DIR, "atlas.json")
+PAGE_SIZE = 2048
+PADDING = 1 # Gap between sprites so neighbours never bleed into each other
+MAX_SPRITE_SIZE = 512 # Larger images (backgrounds) are left out of the atlas
+
+
+def sprite_key(path, size, area=None):
+    """Builds the atlas lookup key for a sprite.
+
+    `size` is either a (width, height) tuple or an integer scale factor and
+    `area` an optional (x, y, w, h) frame within a spritesheet.
+    """
+    key = path
+    if area:
+        key += "#" + ",".join(str(v) for v in area)
+    if isinstance(size, int):
+        return f"{key}@x{size}"
+    return f"{key}@{size[0]}x{size[1]}"
+
+
+class SpriteAtlas:
+    """Runtime view of a packed atlas: page surfaces and sprite source rects."""
+    def __init__(self, pages, rects):
+        self.pages = pages
+        self.rects = rects
+        self.cache = {}
+
+    def get(self, key):
+        """Returns the sprite as a subsurface of its page, or None if not packed."""
+        sprite = self.cache.get(key)
+        if sprite is None and key in self.rects:
+            page, x, y, w, h = self.rects[key]
+            # Subsurfaces share the page's pixels, so blitting one is a
+            # source-rect blit from the atlas
+            sprite = self.cache[key] = self.pages[page].subsurface((x, y, w, h))
+        return sprite
+
+
+def load_atlas(index_path=ATLAS_INDEX):
+    """Loads a packed atlas, or returns None if it hasn't been built."""
+    if not os.path.exists(index_path):
+        return None
+    try:
+        with open(index_path) as f:
+            index = json.load(f)
+        base = os.path.dirname(index_path)
+        pages = [pygame.image.load(os.path.join(base, name)).convert_alpha() for name in index["pages"]]
+    except (OSError, ValueError, KeyError, pygame.error) as e:
+        print(f"Error loading sprite atlas {index_path}: {e}")
+        return None
+    return SpriteAtlas(pages, index["sprites"])
+
+
+# --- Offline Packing ---
+
+def pack(sizes, page_size=PAGE_SIZE, padding=PADDING):
+    """Shelf-packs rectangles into square pages.
+
+    `sizes` maps keys to (width, height). Returns a dict of key ->
+    (page, x, y) and the number of pages used. Tallest sprites are placed
+    first so each shelf wastes as little height as possible.
+    """
+    placements = {}
+    page, shelf_x, shelf_y, shelf_height = 0, 0, 0, 0
+    for key, (w, h) in sorted(sizes.items(), key=lambda item: (-item[1][1], -item[1][0])):
+        if w > page_size or h > page_size:
+            raise ValueError(f"Sprite {key} ({w}x{h}) does not fit in a {page_size} page")
+        if shelf_x + w > page_size: # Start a new shelf
+            shelf_x, shelf_y, shelf_height = 0, shelf_y + shelf_height, 0
+        if shelf_y + h > page_size: # Start a new page
+            page, shelf_x, shelf_y, shelf_height = page + 1, 0, 0, 0
+        placements[key] = (page, shelf_x, shelf_y)
+        shelf_x += w + padding
+        shelf_height = max(shelf_height, h + padding)
+    return placements, page + 1 if placements else 0
+
+
+def build_atlas(sprites, out_dir=ATLAS_DIR, page_size=PAGE_SIZE):
+    """Packs the given key -> Surface sprites and writes the pages and index."""
+    placements, page_count = pack({key: s.get_size() for key, s in sprites.items()}, page_size)
+
+    # Trim each page to the area actually used
+    extents = [[0, 0] for _ in range(page_count)]
+    for key, (page, x, y) in placements.items():
+        w, h = sprites[key].get_size()
+        extents[page][0] = max(extents[page][0], x + w)
+        extents[page][1] = max(extents[page][1], y + h)
+
+    os.makedirs(out_dir, exist_ok=True)
+    pages = [pygame.Surface(extent, pygame.SRCALPHA, 32) for extent in extents]
+    index = {"pages": [], "sprites": {}}
+    for key, (page, x, y) in placements.items():
+        pages[page].blit(sprites[key], (x, y))
+        index["sprites"][key] = [page, x, y, *sprites[key].get_size()]
+    for i, surface in enumerate(pages):
+        name = f"atlas-{i}.png"
+        pygame.image.save(surface, os.path.join(out_dir, name))
+        index["pages"].append(name)
+    with open(os.path.join(out_dir, "atlas.json"), "w") as f:
+        json.dump(index, f, separators=(",", ":"))
+    return index
+
+
+def main():
+    """Collects every sprite the game loads and packs them into the atlas."""
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    import platformer
+
+    # Sprites are registered as the game loads them
+    platformer.game.initialize()
+    assets = platformer.assets
+    sprites = {}
+    for key, args in assets.sprite_manifest.items():
+        image = assets.load_image_file(*args)
+        # Full-screen backdrops don't belong in a sprite atlas
+        if args[3] and max(image.get_size()) <= MAX_SPRITE_SIZE:
+            sprites[key] = image
+    index = build_atlas(sprites)
+
+    area = sum(w * h for _, _, _, w, h in index["sprites"].values())
+    print(f"Packed {len(sprites)} sprites ({area} px) into {len(index['pages'])} page(s) in {ATLAS_DIR}")
+
+if __name__ == "__main__":
+    main()
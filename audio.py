@@ -0,0 +1,197 @@
+# =============================================================================
+# Platformer: The Mysterious Path - Audio Manager
+#
+# Central place for all sound playback. Each category of sound gets its own
+# reserved mixer channels, repeated triggers of the same sound are rate
+# limited, and when a category is full the oldest voice is stolen instead of
+# piling up overlapping plays. Music is streamed with pygame.mixer.music and
+# prefetched in the background so track changes don't stall the game.
+# =============================================================================
+
+import concurrent.futures
+import contextlib
+import io
+
+import pygame
+
+
+class SoundCategory:
+    """A group of reserved mixer channels shared by one kind of sound."""
+    def __init__(self, name, channels, min_interval):
+        self.name = name
+        self.channels = channels
+        self.min_interval = min_interval # ms before the same sound may retrigger
+        self.started = [0] * len(channels) # Start time of each channel's voice
+        self.last_played = {} # Sound -> time it was last started
+
+
+class AudioManager:
+    """Plays sound effects through per-category channel pools and owns the music.
+
+    `categories` maps a category name to (channel count, minimum interval in
+    ms between plays of the same sound). `music_fade_ms` is how long the music
+    takes to fade out and back in when the track changes.
+    """
+    def __init__(self, categories, music_fade_ms=500):
+        self.sound_on = True
+        self.music_on = True
+        self.stats = {"plays": 0, "dropped": 0, "stolen": 0}
+
+        # Reserve the first channels for the categories so sounds played
+        # elsewhere with Sound.play() can never take them over
+        total = sum(count for count, _ in categories.values())
+        pygame.mixer.set_num_channels(max(pygame.mixer.get_num_channels(), total))
+        pygame.mixer.set_reserved(total)
+        self.categories = {}
+        first = 0
+        for name, (count, min_interval) in categories.items():
+            channels = [pygame.mixer.Channel(i) for i in range(first, first + count)]
+            self.categories[name] = SoundCategory(name, channels, min_interval)
+            first += count
+
+        # Music state
+        self.music_fade_ms = music_fade_ms
+        self.music_track = None # Track that should be playing
+        self.music_loaded = None # Track currently loaded into the mixer
+        self.switch_pending = False # Whether update() still has to switch to music_track
+        self.fade_remaining = 0 # ms left in the current fade-out
+        self.music_cache = {} # Path -> Future with the track's file contents
+        self.prefetcher = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="music-prefetch")
+
+    def play(self, sound, category="sfx", loops=0):
+        """Plays a sound in the given category.
+
+        Returns the channel used, or None if the play was dropped because
+        sound is off, the sound failed to load, or it was rate limited.
+        """
+        if not self.sound_on or not isinstance(sound, pygame.mixer.Sound):
+            return None
+        group = self.categories[category]
+        now = pygame.time.get_ticks()
+        if now - group.last_played.get(sound, -group.min_interval) < group.min_interval:
+            self.stats["dropped"] += 1
+            return None
+
+        # Prefer an idle channel, otherwise steal the oldest voice
+        index = next((i for i, channel in enumerate(group.channels) if not channel.get_busy()), None)
+        if index is None:
+            index = group.started.index(min(group.started))
+            self.stats["stolen"] += 1
+        channel = group.channels[index]
+        channel.play(sound, loops)
+        group.started[index] = now
+        group.last_played[sound] = now
+        self.stats["plays"] += 1
+        return channel
+
+    def stop(self, category):
+        """Stops every voice in a category."""
+        for channel in self.categories[category].channels:
+            channel.stop()
+
+    def set_sound_on(self, enabled):
+        """Turns sound effects on or off, silencing anything still playing."""
+        self.sound_on = enabled
+        if not enabled:
+            for name in self.categories:
+                self.stop(name)
+
+    @contextlib.contextmanager
+    def muted(self):
+        """Drops sound effects played inside the with-block, e.g. while re-simulating."""
+        sound_on, self.sound_on = self.sound_on, False
+        try:
+            yield
+        finally:
+            self.sound_on = sound_on
+
+    def get_stats(self):
+        """Returns play counters and the number of active voices per category."""
+        stats = dict(self.stats)
+        stats["active"] = {name: sum(channel.get_busy() for channel in group.channels)
+                           for name, group in self.categories.items()}
+        return stats
+
+    # --- Music ---
+    # Switching tracks never blocks the game loop: files are read by a
+    # background thread, the old track fades out over a few frames in
+    # update(), and the new one is loaded from memory and faded in.
+
+    def preload_music(self, path):
+        """Starts reading a music track into memory on the prefetch thread."""
+        if path not in self.music_cache:
+            self.music_cache[path] = self.prefetcher.submit(_read_file, path)
+
+    def play_music(self, path):
+        """Makes `path` the current track; update() fades over to it."""
+        self.preload_music(path)
+        self.music_track = path
+        if path == self.music_loaded:
+            # Asked for the track that is already on, e.g. mid fade-out
+            self.switch_pending = False
+            self.fade_remaining = 0
+            pygame.mixer.music.set_volume(1.0)
+            return
+        self.switch_pending = True
+        # Only fade out if something is audible; otherwise switch right away
+        self.fade_remaining = self.music_fade_ms if self.music_on and pygame.mixer.music.get_busy() else 0
+
+    def set_music_on(self, enabled):
+        """Pauses or resumes the music; update() loads the current track if needed."""
+        self.music_on = enabled
+        if not enabled:
+            pygame.mixer.music.pause()
+        elif not self.switch_pending:
+            pygame.mixer.music.unpause()
+
+    def update(self, dt):
+        """Advances any music fade or pending track switch. Call once per frame."""
+        if not self.switch_pending or not self.music_on:
+            return
+        if self.fade_remaining > 0:
+            self.fade_remaining -= dt
+            pygame.mixer.music.set_volume(max(0.0, self.fade_remaining / self.music_fade_ms))
+            if self.fade_remaining > 0:
+                return
+        future = self.music_cache[self.music_track]
+        if not future.done():
+            return # Still being read; the old track stays faded out meanwhile
+        self._start_music(future.result())
+        self.switch_pending = False
+
+    def _start_music(self, data):
+        """Loads the current track from memory (or disk, if prefetching failed) and fades it in."""
+        path = self.music_track
+        try:
+            if data is not None:
+                # pygame needs the extension hint to pick a decoder for a file object
+                pygame.mixer.music.load(io.BytesIO(data), path.rsplit(".", 1)[-1])
+            else:
+                pygame.mixer.music.load(path)
+            pygame.mixer.music.set_volume(1.0)
+            pygame.mixer.music.play(-1, fade_ms=self.music_fade_ms)
+            self.music_loaded = path
+        except pygame.error as e:
+            print(f"Could not load music {path}: {e}")
+
+
+class NoAudio:
+    """Stands in for the AudioManager where nothing is heard, e.g. a headless simulation."""
+    sound_on = False
+
+    @contextlib.contextmanager
+    def muted(self):
+        yield
+
+    def play(self, sound, category="sfx", loops=0):
+        return None
+
+
+def _read_file(path):
+    """Reads a whole file, returning None if it can't be read."""
+    try:
+        with open(path, "rb") as f:
+            return f.read()
+    except OSError as e:
+        print(f"Could not preload music {path}: {e}")
+        return None
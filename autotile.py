@@ -0,0 +1,100 @@
+# =============================================================================
+# Platformer: The Mysterious Path - Autotiling
+#
+# Picks each terrain tile's look from its neighbours: a tile with ground on
+# top of it loses its lit grassy lip, one with ground below it loses its
+# dangling roots, and the ends of a platform get a dark outline and rounded
+# corners. Which of the four neighbours (up, right, down, left) are solid
+# makes a 4-bit mask, and the 16 variants are made once, up front, from the
+# single tile in assets/terrain/tilesets.png. The masks for a whole level
+# are worked out in one pass over the map, and the chosen variants are
+# baked into the pre-rendered terrain layer (render.TileLayer), so nicer
+# ground costs nothing per frame.
+# =============================================================================
+
+import pygame
+
+try:
+    import numpy
+except ImportError: # Masks are worked out tile by tile instead
+    numpy = None
+
+# Bit of each solid neighbour in a tile's mask
+UP, RIGHT, DOWN, LEFT = 1, 2, 4, 8
+VARIANTS = 16
+
+# Horizontal bands of the tileset's tile, as fractions of its height: the
+# rock crust and lit lip on top, and the roots underneath. ROCK is a plain
+# band of rock used to fill in where a neighbour covers the others.
+LIP_END = 13 / 48
+ROOTS_START = 20 / 48
+ROCK = (2 / 48, 8 / 48)
+
+
+def tile_masks(world_map, solid="X"):
+    """Returns each cell's neighbour mask, indexable as masks[row][column].
+
+    Cells outside the map count as empty, so the level's outer tiles are
+    drawn as edges. Rows may be of different lengths.
+    """
+    rows, columns = len(world_map), max(map(len, world_map))
+    if numpy is None:
+        grid = [[char == solid for char in row.ljust(columns)] for row in world_map]
+        def at(row, column):
+            return 0 <= row < rows and 0 <= column < columns and grid[row][column]
+        return [[at(row - 1, column) * UP | at(row, column + 1) * RIGHT | at(row + 1, column) * DOWN
+                 | at(row, column - 1) * LEFT for column in range(columns)] for row in range(rows)]
+
+    # A border of empty cells round the map lets every neighbour be a shifted slice
+    grid = numpy.zeros((rows + 2, columns + 2), numpy.uint8)
+    for row, line in enumerate(world_map):
+        grid[row + 1, 1:len(line) + 1] = numpy.frombuffer(line.encode(), numpy.uint8) == ord(solid)
+    return (grid[:-2, 1:-1] * UP | grid[1:-1, 2:] * RIGHT
+            | grid[2:, 1:-1] * DOWN | grid[1:-1, :-2] * LEFT)
+
+
+def _fill_rock(tile, rock, top, bottom):
+    """Covers rows top..bottom of the tile with the rock band, repeated.
+
+    Every other copy is turned upside down and back to front so the
+    repeats don't line up into stripes.
+    """
+    bands = (rock, pygame.transform.flip(rock, True, True))
+    y, i = top, 0
+    while y < bottom:
+        tile.blit(bands[i % 2], (0, y), (0, 0, rock.get_width(), min(rock.get_height(), bottom - y)))
+        y, i = y + rock.get_height(), i + 1
+
+
+def make_variants(tile, size):
+    """Makes the 16 variants of a tile, indexed by neighbour mask and scaled to `size`.
+
+    The work is done at the tile's own resolution so outlines stay one
+    pixel of the original art wide.
+    """
+    width, height = tile.get_size()
+    lip_end, roots_start = round(height * LIP_END), round(height * ROOTS_START)
+    rock = tile.subsurface(0, round(height * ROCK[0]), width, round(height * (ROCK[1] - ROCK[0]))).copy()
+    outline = tile.get_at((0, height - 1)) # The darkest colour, at the tips of the roots
+    clear = (0, 0, 0, 0)
+
+    variants = []
+    for mask in range(VARIANTS):
+        variant = tile.copy()
+        if mask & UP:
+            _fill_rock(variant, rock, 0, lip_end)
+        if mask & DOWN:
+            _fill_rock(variant, rock, roots_start, height)
+        # Outline exposed sides down to where the roots take over
+        bottom = height if mask & DOWN else roots_start
+        for side, x in ((LEFT, 0), (RIGHT, width - 1)):
+            if not mask & side:
+                pygame.draw.line(variant, outline, (x, 0), (x, bottom - 1))
+                if not mask & UP:
+                    # Round off the top corner
+                    inward = 1 if x == 0 else -1
+                    for corner in ((x, 0), (x + inward, 0), (x, 1)):
+                        variant.set_at(corner, clear)
+                    variant.set_at((x + inward, 1), outline)
+        variants.append(pygame.transform.scale(variant, size))
+    return variants
@@ -0,0 +1,247 @@
+# =============================================================================
+# Platformer: The Mysterious Path - Bot Environment
+#
+# A gym-style wrapper around the game simulation for automated playtesting.
+# Runs on the simulation core alone, without a window or audio, and can fan
+# out across worker processes so thousands of episodes can be played per
+# minute for difficulty tuning.
+#
+# Usage:
+#   python bot_env.py --envs 16 --workers 4 --steps 20000
+# =============================================================================
+
+import argparse
+import multiprocessing
+import os
+import random
+import time
+
+import platformer
+import snapshot
+from controls import ActionState, JUMP, LEFT, RIGHT
+
+# The simulation core opens no window and stays silent unless the game is
+# started, so bots need no display or audio
+
+# --- Environment Constants ---
+STEP_MS = 1000 / platformer.FPS  # Simulated milliseconds per tick
+MAX_EPISODE_STEPS = 60 * platformer.FPS  # One minute of game time
+GRID_RADIUS_X = 4  # Tiles observed left/right of the player
+GRID_RADIUS_Y = 3  # Tiles observed above/below the player
+MAX_OBSERVED_ENEMIES = 4
+
+# Each action is the set of controls held down for that tick
+ACTION_BUTTONS = [
+    0,                     # 0: idle
+    LEFT,                  # 1: left
+    RIGHT,                 # 2: right
+    JUMP,                  # 3: jump
+    LEFT | JUMP,           # 4: jump left
+    RIGHT | JUMP,          # 5: jump right
+]
+NUM_ACTIONS = len(ACTION_BUTTONS)
+
+GRID_SIZE = (2 * GRID_RADIUS_X + 1) * (2 * GRID_RADIUS_Y + 1)
+OBSERVATION_SIZE = 7 + GRID_SIZE + 2 * MAX_OBSERVED_ENEMIES
+
+
+# Build the action states once; step() just indexes into this list
+ACTIONS = [ActionState(held) for held in ACTION_BUTTONS]
+
+
+class PlatformerEnv:
+    """A single headless game session with a reset/step interface."""
+    def __init__(self, level_index=0, max_steps=MAX_EPISODE_STEPS):
+        self.level_index = level_index
+        self.max_steps = max_steps
+        self.steps = 0
+        self.world = None
+        # Solid tile lookup per level, used for the observation grid
+        self.solid_grids = [[[char == 'X' for char in row] for row in world_map]
+                            for world_map in platformer.world_maps]
+
+    def reset(self, level_index=None):
+        """Starts a new episode and returns the first observation."""
+        if level_index is not None:
+            self.level_index = level_index
+        self.world = platformer.World(self.level_index)
+        self.level_width = len(platformer.world_maps[self.level_index][0]) * platformer.TILE_SIZE
+        self.steps = 0
+        return self.observe()
+
+    def step(self, action):
+        """Advances one physics tick.
+
+        Returns (observation, reward, done, info) like a gym environment. An
+        episode ends on game over, on reaching the goal with all parts, or
+        after max_steps ticks.
+        """
+        world, player = self.world, self.world.player
+        lives, parts, x = player.lives, player.collected_parts, player.rect.x
+        result = world.update((ACTIONS[action],), STEP_MS)
+        if result == "respawned":
+            world.respawn_at_checkpoint()
+        self.steps += 1
+
+        reward = (player.rect.x - x) / self.level_width
+        reward += player.collected_parts - parts
+        reward -= lives - player.lives
+
+        success = (world.goal is not None and player.collected_parts >= 3
+                   and player.rect.colliderect(world.goal))
+        if success:
+            reward += 10
+        done = result == "game_over" or success or self.steps >= self.max_steps
+        info = {"success": success, "steps": self.steps, "lives": player.lives,
+                "parts": player.collected_parts}
+        return self.observe(), reward, done, info
+
+    def observe(self):
+        """Returns a flat tuple describing the player and their surroundings.
+
+        Layout: player x, y, velocity x/y, on ground, lives, parts; then the
+        solid tile grid around the player, row by row; then the offsets of the
+        nearest enemies within WAKE_DISTANCE (zero padded).
+        """
+        player = self.world.player
+        rect = player.rect
+        obs = [rect.x, rect.y, player.velocity[0], player.velocity[1],
+               int(player.on_ground), player.lives, player.collected_parts]
+
+        grid = self.solid_grids[self.level_index]
+        rows = len(grid)
+        col = rect.centerx // platformer.TILE_SIZE
+        row = (rect.centery - platformer.SCREEN_HEIGHT) // platformer.TILE_SIZE + rows
+        for r in range(row - GRID_RADIUS_Y, row + GRID_RADIUS_Y + 1):
+            if 0 <= r < rows:
+                grid_row = grid[r]
+                for c in range(col - GRID_RADIUS_X, col + GRID_RADIUS_X + 1):
+                    obs.append(int(0 <= c < len(grid_row) and grid_row[c]))
+            else:
+                obs.extend([0] * (2 * GRID_RADIUS_X + 1))
+
+        # Only enemies within wake distance are looked at (and brought up to date), not the whole level
+        near = self.world.enemy_activity.near_synced([rect.centerx], self.world.ticks)
+        nearest = sorted(near, key=lambda e: abs(e.rect.centerx - rect.centerx))
+        for enemy in nearest[:MAX_OBSERVED_ENEMIES]:
+            obs.append(enemy.rect.x - rect.x)
+            obs.append(enemy.rect.y - rect.y)
+        obs.extend([0] * (2 * (MAX_OBSERVED_ENEMIES - min(len(nearest), MAX_OBSERVED_ENEMIES))))
+        return tuple(obs)
+
+    def save_state(self):
+        """Returns a snapshot of the episode, e.g. to fork it for a search."""
+        return self.steps.to_bytes(4, "little") + snapshot.save(self.world)
+
+    def load_state(self, data):
+        """Restores a snapshot from save_state(), possibly taken by another env."""
+        self.steps = int.from_bytes(data[:4], "little")
+        snapshot.restore(self.world, data[4:])
+        self.level_index = self.world.level_index
+        self.level_width = len(platformer.world_maps[self.level_index][0]) * platformer.TILE_SIZE
+        return self.observe()
+
+
+# --- Vectorised Environments ---
+
+def _worker(conn, num_envs, level_index, max_steps):
+    """Runs a batch of environments inside a worker process."""
+    envs = [PlatformerEnv(level_index, max_steps) for _ in range(num_envs)]
+    while True:
+        command, data = conn.recv()
+        if command == "reset":
+            conn.send([env.reset(data) for env in envs])
+        elif command == "step":
+            results = []
+            for env, action in zip(envs, data):
+                obs, reward, done, info = env.step(action)
+                if done:
+                    # Auto-reset so the batch never stalls on a finished episode
+                    info["final_observation"] = obs
+                    obs = env.reset()
+                results.append((obs, reward, done, info))
+            conn.send(results)
+        elif command == "close":
+            conn.close()
+            break
+
+
+class VectorEnv:
+    """Steps many PlatformerEnv instances in parallel across worker processes.
+
+    Environments are split evenly over the workers. Finished episodes are
+    reset automatically; the last observation is kept in
+    info["final_observation"].
+    """
+    def __init__(self, num_envs, num_workers=None, level_index=0, max_steps=MAX_EPISODE_STEPS):
+        num_workers = min(num_workers or os.cpu_count() or 1, num_envs)
+        self.num_envs = num_envs
+        # Spawn rather than fork, so workers start clean whatever the caller has initialised (e.g. SDL)
+        context = multiprocessing.get_context("spawn")
+        self.connections, self.processes, self.splits = [], [], []
+        for i in range(num_workers):
+            count = num_envs // num_workers + (1 if i < num_envs % num_workers else 0)
+            parent, child = context.Pipe()
+            process = context.Process(target=_worker, args=(child, count, level_index, max_steps), daemon=True)
+            process.start()
+            child.close()
+            self.connections.append(parent)
+            self.processes.append(process)
+            self.splits.append(count)
+
+    def reset(self, level_index=None):
+        """Resets every environment and returns the list of observations."""
+        for conn in self.connections:
+            conn.send(("reset", level_index))
+        return [obs for conn in self.connections for obs in conn.recv()]
+
+    def step(self, actions):
+        """Steps every environment with its action; returns lists of obs, rewards, dones, infos."""
+        start = 0
+        for conn, count in zip(self.connections, self.splits):
+            conn.send(("step", actions[start:start + count]))
+            start += count
+        results = [result for conn in self.connections for result in conn.recv()]
+        observations, rewards, dones, infos = zip(*results)
+        return list(observations), list(rewards), list(dones), list(infos)
+
+    def close(self):
+        """Shuts down the worker processes."""
+        for conn in self.connections:
+            conn.send(("close", None))
+        for process in self.processes:
+            process.join()
+
+
+def main():
+    """Plays random episodes and reports throughput."""
+    parser = argparse.ArgumentParser(description="Run random bots against the game headlessly.")
+    parser.add_argument("--envs", type=int, default=8, help="number of parallel environments")
+    parser.add_argument("--workers", type=int, default=None, help="number of worker processes")
+    parser.add_argument("--level", type=int, default=0, help="level index to play")
+    parser.add_argument("--steps", type=int, default=10000, help="total ticks per environment")
+    parser.add_argument("--seed", type=int, default=0, help="random seed for the bot actions")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    vec_env = VectorEnv(args.envs, args.workers, args.level)
+    vec_env.reset()
+
+    episodes = successes = 0
+    start = time.perf_counter()
+    for _ in range(args.steps):
+        actions = [rng.randrange(NUM_ACTIONS) for _ in range(args.envs)]
+        _, _, dones, infos = vec_env.step(actions)
+        for done, info in zip(dones, infos):
+            if done:
+                episodes += 1
+                successes += info["success"]
+    elapsed = time.perf_counter() - start
+    vec_env.close()
+
+    ticks = args.steps * args.envs
+    print(f"{ticks} ticks in {elapsed:.2f}s ({ticks / elapsed:.0f} ticks/s)")
+    print(f"{episodes} episodes ({episodes / elapsed * 60:.0f}/min), {successes} successful")
+
+if __name__ == "__main__":
+    main()
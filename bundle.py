@@ -0,0 +1,138 @@
+# =============================================================================
+# Platformer: The Mysterious Path - Asset Bundle
+#
+# Bakes every image the game loads (already converted and scaled to its
+# in-game size) and the decoded PCM of every sound effect into a single
+# file. At runtime the bundle is memory-mapped and surfaces are created
+# straight from the mapping with pygame.image.frombuffer, so startup does no
+# PNG/JPG/WAV decoding at all.
+#
+# File layout:
+#   magic (4 bytes) | index length (uint32, little endian) | JSON index |
+#   padding | data blobs, each aligned to BLOB_ALIGN bytes
+#
+# Usage (offline, re-run whenever assets change):
+#   python bundle.py
+# =============================================================================
+
+import json
+import mmap
+import os
+import struct
+
+import pygame
+
+BUNDLE_PATH = "assets/game.bundle"
+MAGIC = b"PLTB"
+VERSION = 1
+BLOB_ALIGN = 64
+# Byte order of a 32-bit surface with the same masks convert_alpha() produces,
+# which lets frombuffer surfaces be blitted without converting them first
+PIXEL_FORMAT = "BGRA"
+
+
+class AssetBundle:
+    """Read-only view over a memory-mapped asset bundle."""
+    def __init__(self, path):
+        self.file = open(path, "rb")
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self.map[:4] != MAGIC:
+            raise ValueError(f"{path} is not an asset bundle")
+        (index_length,) = struct.unpack_from("<I", self.map, 4)
+        self.index = json.loads(self.map[8:8 + index_length])
+        if self.index.get("version") != VERSION:
+            raise ValueError(f"{path} was built by an incompatible version")
+        self.view = memoryview(self.map)
+
+    def image(self, key):
+        """Returns the image stored under `key` or None if it isn't bundled.
+
+        The surface shares memory with the mapping (no copy); opaque images
+        are converted once so they blit without per-pixel alpha.
+        """
+        entry = self.index["images"].get(key)
+        if entry is None:
+            return None
+        offset, width, height, alpha = entry
+        surface = pygame.image.frombuffer(self.view[offset:offset + width * height * 4], (width, height), PIXEL_FORMAT)
+        return surface if alpha else surface.convert()
+
+    def sound(self, key):
+        """Returns the sound stored under `key`, or None if it isn't bundled or
+        was decoded for a different mixer configuration."""
+        entry = self.index["sounds"].get(key)
+        if entry is None or tuple(self.index["mixer"]) != pygame.mixer.get_init():
+            return None
+        offset, length = entry
+        return pygame.mixer.Sound(buffer=self.view[offset:offset + length])
+
+
+def load_bundle(path=BUNDLE_PATH):
+    """Opens the asset bundle, or returns None if it hasn't been built."""
+    if not os.path.exists(path):
+        return None
+    try:
+        return AssetBundle(path)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Error loading asset bundle {path}: {e}")
+        return None
+
+
+# --- Offline Building ---
+
+def write_bundle(images, sounds, mixer_config, path=BUNDLE_PATH):
+    """Writes a bundle from key -> (Surface, has_alpha) images and key -> bytes sounds."""
+    blobs, index = [], {"version": VERSION, "mixer": list(mixer_config), "images": {}, "sounds": {}}
+    for key, (surface, alpha) in images.items():
+        blobs.append((index["images"], key, pygame.image.tobytes(surface, PIXEL_FORMAT),
+                      [*surface.get_size(), alpha]))
+    for key, data in sounds.items():
+        blobs.append((index["sounds"], key, data, [len(data)]))
+
+    def align(n):
+        return (n + BLOB_ALIGN - 1) // BLOB_ALIGN * BLOB_ALIGN
+
+    # Offsets depend on the index length, which depends on the offsets, so
+    # reserve room for the index at its final size before placing the blobs
+    header_size = 0
+    while True:
+        offset = align(header_size)
+        for table, key, data, info in blobs:
+            table[key] = [offset, *info]
+            offset = align(offset + len(data))
+        encoded = json.dumps(index, separators=(",", ":")).encode()
+        if 8 + len(encoded) <= header_size:
+            break
+        header_size = 8 + len(encoded)
+
+    with open(path, "wb") as f:
+        f.write(MAGIC + struct.pack("<I", len(encoded)) + encoded)
+        for table, key, data, _ in blobs:
+            f.write(b"\0" * (table[key][0] - f.tell()))
+            f.write(data)
+    return index
+
+
+def main():
+    """Decodes every asset the game loads and writes them into the bundle."""
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    import platformer
+
+    # Assets are registered as the game loads them
+    platformer.game.initialize()
+    assets = platformer.assets
+    images = {key: (assets.load_image_file(*args), args[3])
+              for key, args in assets.sprite_manifest.items()}
+    sounds = {}
+    for path in assets.sound_manifest:
+        try:
+            sounds[path] = pygame.mixer.Sound(path).get_raw()
+        except (pygame.error, FileNotFoundError):
+            pass # Missing sounds stay missing; the game uses a dummy
+    write_bundle(images, sounds, pygame.mixer.get_init())
+    print(f"Bundled {len(images)} images and {len(sounds)} sounds into {BUNDLE_PATH} "
+          f"({os.path.getsize(BUNDLE_PATH) / 2**20:.1f} MiB)")
+
+if __name__ == "__main__":
+    main()
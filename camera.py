@@ -0,0 +1,57 @@
+# =============================================================================
+# Platformer: The Mysterious Path - Camera
+#
+# Follows the player horizontally. The player can move inside a dead-zone
+# around the centre of the screen without the camera moving; outside it the
+# camera eases towards a point a little ahead of the player in the direction
+# they face. The level bounds are set once when a level loads, and the
+# scroll used for drawing is snapped to whole pixels once per frame so every
+# sprite lands on the pixel grid.
+# =============================================================================
+
+import pygame
+
+
+class Camera:
+    """Horizontal scrolling camera with a dead-zone, lookahead and level bounds.
+
+    `dead_zone` is the width in pixels of the band around the screen centre
+    the target can move in freely, `lookahead` how far ahead of the target
+    the camera aims and `smoothing` the fraction of the remaining distance
+    covered per update.
+    """
+    def __init__(self, view_size, dead_zone=0, lookahead=0, smoothing=0.1):
+        self.view_width, self.view_height = view_size
+        self.dead_zone = dead_zone
+        self.lookahead = lookahead
+        self.smoothing = smoothing
+        self.max_x = 0
+        self.x = 0.0 # Exact position, kept between frames for smooth easing
+        self.scroll = 0 # Position snapped to whole pixels, used for drawing
+
+    def set_bounds(self, level_width):
+        """Limits scrolling to a level of the given width in pixels."""
+        self.max_x = max(0, level_width - self.view_width)
+
+    def jump_to(self, x):
+        """Moves the camera straight to a position, e.g. after restoring a snapshot."""
+        self.x = max(0, min(x, self.max_x))
+        self.scroll = round(self.x)
+
+    def update(self, target_rect, facing_right=True):
+        """Eases the camera towards the target and snaps the scroll for this frame."""
+        focus = target_rect.centerx + (self.lookahead if facing_right else -self.lookahead)
+        center = self.x + self.view_width / 2
+        half_zone = self.dead_zone / 2
+        # Only the part of the offset outside the dead-zone moves the camera
+        if focus > center + half_zone:
+            desired = self.x + focus - (center + half_zone)
+        elif focus < center - half_zone:
+            desired = self.x + focus - (center - half_zone)
+        else:
+            desired = self.x
+        self.jump_to(self.x + (desired - self.x) * self.smoothing)
+
+    def visible_rect(self, margin=0):
+        """The part of the level on screen this frame, widened by `margin` on each side."""
+        return pygame.Rect(self.scroll - margin, -margin, self.view_width + margin * 2, self.view_height + margin * 2)
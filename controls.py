@@ -0,0 +1,217 @@
+# =============================================================================
+# Platformer: The Mysterious Path - Controls
+#
+# Turns keyboard and controller events into a compact per-tick ActionState,
+# so the simulation never polls pygame itself and can be fed by bots or the
+# network just as well. Controllers are opened and closed as they are
+# plugged in and out, bindings can be changed and saved with the settings,
+# and the time from an input event to the physics tick that consumes it is
+# measured (and shown with --diagnostics).
+# =============================================================================
+
+import collections
+
+import pygame
+
+ACTIONS = ("left", "right", "jump", "interact", "rewind", "quicksave", "quickload")
+# Bit of each action in ActionState.held and ActionState.pressed
+LEFT, RIGHT, JUMP, INTERACT, REWIND, QUICKSAVE, QUICKLOAD = (1 << i for i in range(len(ACTIONS)))
+ACTION_BITS = {name: 1 << i for i, name in enumerate(ACTIONS)}
+
+# Key names as given by pygame.key.name()
+DEFAULT_KEY_BINDINGS = {
+    "left": ["a", "left"],
+    "right": ["d", "right"],
+    "jump": ["w", "up", "space"],
+    "interact": ["e"],
+    "rewind": ["r"],
+    "quicksave": ["f5"],
+    "quickload": ["f9"],
+}
+# Controller button numbers: A (bottom face) jumps, X (left face) interacts
+DEFAULT_BUTTON_BINDINGS = {
+    "jump": [0],
+    "interact": [2],
+}
+STICK_AXIS = 0 # Horizontal axis of the left stick
+STICK_DEADZONE = 0.2
+LATENCY_SAMPLES = 240 # Recent event-to-tick latencies kept for latency_stats()
+
+
+class ActionState:
+    """What one player does during one tick, independent of the input device.
+
+    `held` and `pressed` are bitmasks of the action bits; `pressed` has the
+    actions that went down since the previous tick. `move_x` is the
+    horizontal movement from -1 (full left) to 1 (full right).
+    """
+    __slots__ = ("held", "pressed", "move_x")
+
+    def __init__(self, held=0, pressed=0, move_x=None):
+        self.held = held
+        self.pressed = pressed
+        if move_x is None:
+            # Digital movement; right wins if both directions are held
+            move_x = 1.0 if held & RIGHT else -1.0 if held & LEFT else 0.0
+        self.move_x = move_x
+
+    def __repr__(self):
+        return f"ActionState(held={self.held:#x}, pressed={self.pressed:#x}, move_x={self.move_x})"
+
+IDLE = ActionState()
+
+
+class Controller:
+    """A connected controller and the inputs currently held on it."""
+    def __init__(self, joystick):
+        self.joystick = joystick
+        self.buttons = set()
+        self.stick_x = 0.0
+
+
+class InputManager:
+    """Collects input events and hands out one ActionState per player per tick.
+
+    The keyboard always belongs to player 0. With one player every controller
+    drives that player too; with more, controllers are handed to players 1, 2,
+    ... in the order they were connected (wrapping back round to player 0).
+    """
+    def __init__(self, key_bindings=None, button_bindings=None, players=1):
+        # Copied, since rebind() edits the lists in place
+        self.key_bindings = {action: list(names) for action, names
+                             in {**DEFAULT_KEY_BINDINGS, **(key_bindings or {})}.items()}
+        self.button_bindings = {action: list(buttons) for action, buttons
+                                in {**DEFAULT_BUTTON_BINDINGS, **(button_bindings or {})}.items()}
+        self.players = players
+        self.keys_down = set()
+        self.controllers = {} # Instance id -> Controller, in connection order
+        self.pending = [0] * players # Actions pressed since each player's last poll
+        self.press_times = [[] for _ in range(players)] # When those presses happened, in pygame ticks (ms)
+        self.latencies = collections.deque(maxlen=LATENCY_SAMPLES)
+        self.pumped_at = self.previous_pump = 0 # Ticks when the event queue was last read, and the time before
+        self.update_lookups()
+
+    def update_lookups(self):
+        """Rebuilds the key and button -> action bit tables from the bindings."""
+        self.key_actions = collections.defaultdict(int)
+        for action, names in self.key_bindings.items():
+            for name in names:
+                try:
+                    self.key_actions[pygame.key.key_code(name)] |= ACTION_BITS[action]
+                except (ValueError, KeyError):
+                    print(f"Ignoring unknown key binding {action}: {name}")
+        self.button_actions = collections.defaultdict(int)
+        for action, buttons in self.button_bindings.items():
+            for button in buttons:
+                self.button_actions[button] |= ACTION_BITS.get(action, 0)
+
+    def set_players(self, players):
+        """Changes how many players input is split between."""
+        self.players = players
+        self.pending = [0] * players
+        self.press_times = [[] for _ in range(players)]
+
+    def player_of(self, instance_id):
+        """The player a connected controller belongs to."""
+        if self.players == 1:
+            return 0
+        return (list(self.controllers).index(instance_id) + 1) % self.players
+
+    def begin_events(self):
+        """Call right before reading the event queue; presses are timed from the previous read."""
+        self.previous_pump, self.pumped_at = self.pumped_at, pygame.time.get_ticks()
+
+    def handle_event(self, event):
+        """Updates the input state from a pygame event; other events are ignored."""
+        if event.type == pygame.KEYDOWN:
+            self.keys_down.add(event.key)
+            self.press(0, self.key_actions.get(event.key, 0), event)
+        elif event.type == pygame.KEYUP:
+            self.keys_down.discard(event.key)
+        elif event.type == pygame.JOYDEVICEADDED:
+            # Also posted at startup for controllers that are already plugged in
+            joystick = pygame.joystick.Joystick(event.device_index)
+            self.controllers[joystick.get_instance_id()] = Controller(joystick)
+        elif event.type == pygame.JOYDEVICEREMOVED:
+            self.controllers.pop(event.instance_id, None)
+        elif event.type in (pygame.JOYBUTTONDOWN, pygame.JOYBUTTONUP, pygame.JOYAXISMOTION):
+            controller = self.controllers.get(event.instance_id)
+            if controller is None:
+                return
+            if event.type == pygame.JOYBUTTONDOWN:
+                controller.buttons.add(event.button)
+                self.press(self.player_of(event.instance_id), self.button_actions.get(event.button, 0), event)
+            elif event.type == pygame.JOYBUTTONUP:
+                controller.buttons.discard(event.button)
+            elif event.axis == STICK_AXIS:
+                controller.stick_x = event.value
+
+    def press(self, player, bits, event):
+        """Records actions going down for a player's next poll.
+
+        The press is timed from the event's own timestamp where pygame has
+        one (pygame-ce). pygame itself doesn't, so then it is timed from the
+        previous read of the event queue, the earliest it can have been
+        queued; latencies are then upper bounds, at most a frame too long.
+        """
+        if bits:
+            self.pending[player] |= bits
+            self.press_times[player].append(getattr(event, "timestamp", self.previous_pump))
+
+    def poll(self, player=0):
+        """Returns the player's ActionState for this tick. Call once per physics tick."""
+        held = 0
+        if player == 0:
+            for key in self.keys_down:
+                held |= self.key_actions.get(key, 0)
+        stick_x = 0.0
+        for instance_id, controller in self.controllers.items():
+            if self.player_of(instance_id) == player:
+                for button in controller.buttons:
+                    held |= self.button_actions.get(button, 0)
+                if abs(controller.stick_x) > abs(stick_x):
+                    stick_x = controller.stick_x
+
+        # A tap shorter than a frame still counts as held for one tick
+        pressed, self.pending[player] = self.pending[player], 0
+        actions = ActionState(held | pressed, pressed)
+        if abs(stick_x) > STICK_DEADZONE:
+            actions.move_x = stick_x
+
+        now = pygame.time.get_ticks()
+        self.latencies.extend(now - t for t in self.press_times[player])
+        self.press_times[player].clear()
+        return actions
+
+    def latency_stats(self):
+        """Returns (samples, mean ms, max ms) of recent press-to-tick latencies (see press())."""
+        if not self.latencies:
+            return 0, 0.0, 0.0
+        return len(self.latencies), sum(self.latencies) / len(self.latencies), max(self.latencies)
+
+    def latency_report(self):
+        """latency_stats() as a line of text."""
+        samples, mean, longest = self.latency_stats()
+        return f"input latency: {samples} presses, mean {mean:.1f} ms, longest {longest} ms"
+
+    # --- Rebinding ---
+
+    def rebind(self, action, key):
+        """Makes `key` (a pygame key code) the only key for an action."""
+        name = pygame.key.name(key)
+        # A key can only do one thing
+        for names in self.key_bindings.values():
+            if name in names:
+                names.remove(name)
+        self.key_bindings[action] = [name]
+        self.update_lookups()
+
+    def describe(self, action):
+        """The keys bound to an action, for display."""
+        return " / ".join(name.upper() if len(name) == 1 else name.title()
+                          for name in self.key_bindings[action]) or "Unbound"
+
+    def save(self, settings):
+        """Stores the bindings in a settings dict (see settings.save_settings)."""
+        settings["key_bindings"] = {action: list(names) for action, names in self.key_bindings.items()}
+        settings["button_bindings"] = {action: list(buttons) for action, buttons in self.button_bindings.items()}
@@ -0,0 +1,230 @@
+# =============================================================================
+# Platformer: The Mysterious Path - Memory Diagnostics
+#
+# Finds what the game loop allocates and how long the garbage collector
+# stops it for. With diagnostics on, every garbage collection is timed
+# through gc.callbacks, and each subsystem of a frame (simulation, drawing,
+# HUD, ...) runs inside a section that measures, with tracemalloc, how much
+# memory it still holds at its end and how high its temporaries peaked.
+# Every so often one frame is sampled: a tracemalloc snapshot is taken
+# around each section and the source lines that allocated the most blocks
+# are listed. A steady state that allocates nothing shows zero everywhere
+# and no gen 0 collections.
+#
+# Separately, freeze_after_load() moves everything alive after a level has
+# loaded (the level, its sprites and every asset) into the collector's
+# permanent generation, so later collections don't walk it again.
+#
+# tracemalloc slows the game down noticeably, and sampled frames take tens
+# of milliseconds, so diagnostics are off unless asked for.
+#
+# Usage:
+#   python -m platformer --diagnostics  # Play, printing a report every few seconds
+#   python diagnostics.py               # Headless: play a level scripted, with and without gc.freeze()
+# =============================================================================
+
+import collections
+import contextlib
+import gc
+import time
+import tracemalloc
+
+# Frames between sampled frames, and between printed reports
+SAMPLE_EVERY = 120
+REPORT_EVERY = 600
+TOP_LINES = 5 # Allocating source lines listed per section
+
+
+class Section:
+    """One subsystem's share of a frame; use as a with-block.
+
+    Kept and reused rather than built per frame, so measuring doesn't
+    allocate anything itself. Sections must not be nested.
+    """
+    __slots__ = ("diagnostics", "name", "frames", "held", "peak", "start", "before", "lines")
+
+    def __init__(self, diagnostics, name):
+        self.diagnostics = diagnostics
+        self.name = name
+        self.frames = 0
+        self.held = 0 # Bytes still allocated at the end of the section, summed over frames
+        self.peak = 0 # Highest temporary use above the start, summed over frames
+        self.start = 0
+        self.before = None
+        self.lines = [] # (count, bytes, "file:line") from the last sampled frame
+
+    def __enter__(self):
+        if self.diagnostics.sampling:
+            self.before = self.diagnostics.snapshot()
+        tracemalloc.reset_peak()
+        self.start = tracemalloc.get_traced_memory()[0]
+
+    def __exit__(self, *exc_info):
+        current, peak = tracemalloc.get_traced_memory()
+        self.frames += 1
+        self.held += current - self.start
+        self.peak += peak - self.start
+        if self.before is not None:
+            after = self.diagnostics.snapshot()
+            self.lines = [(stat.count_diff, stat.size_diff, str(stat.traceback))
+                          for stat in after.compare_to(self.before, "lineno")[:TOP_LINES] if stat.count_diff > 0]
+            self.before = None
+
+
+class Diagnostics:
+    """Allocation and garbage collection statistics for the game loop.
+
+    Wrap each subsystem in section(name) and call begin_frame() and
+    end_frame() around every frame. While disabled, section() hands back
+    a shared do-nothing context and nothing is measured.
+    """
+    def __init__(self, report_every=REPORT_EVERY):
+        self.report_every = report_every
+        self.enabled = False
+        self.sampling = False
+        self.frames = 0
+        self.sections = {}
+        self.gc_started = 0.0
+        self.reporters = [] # Callables returning a line each for every report, e.g. input latency
+        self.reset_gc()
+        self.idle = contextlib.nullcontext()
+
+    def start(self):
+        """Turns diagnostics on."""
+        if not self.enabled:
+            self.enabled = True
+            tracemalloc.start()
+            gc.callbacks.append(self.on_gc)
+
+    def stop(self):
+        """Turns diagnostics off."""
+        if self.enabled:
+            self.enabled = self.sampling = False
+            gc.callbacks.remove(self.on_gc)
+            tracemalloc.stop()
+
+    def reset(self):
+        """Starts counting from zero again."""
+        self.frames = 0
+        self.sections = {}
+        self.reset_gc()
+
+    def reset_gc(self):
+        # Per generation: [collections, seconds, longest pause, objects collected]
+        self.collections = [[0, 0.0, 0.0, 0] for _ in range(3)]
+
+    def on_gc(self, phase, info):
+        """gc.callbacks hook: times each collection."""
+        if phase == "start":
+            self.gc_started = time.perf_counter()
+            return
+        pause = time.perf_counter() - self.gc_started
+        stats = self.collections[info["generation"]]
+        stats[0] += 1
+        stats[1] += pause
+        stats[2] = max(stats[2], pause)
+        stats[3] += info["collected"]
+
+    def snapshot(self):
+        """A tracemalloc snapshot without diagnostics' own allocations."""
+        return tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+        ))
+
+    def section(self, name):
+        """The with-block measuring one subsystem for this frame."""
+        if not self.enabled:
+            return self.idle
+        section = self.sections.get(name)
+        if section is None:
+            section = self.sections[name] = Section(self, name)
+        return section
+
+    def begin_frame(self):
+        if self.enabled:
+            self.sampling = self.frames % SAMPLE_EVERY == SAMPLE_EVERY - 1
+
+    def end_frame(self):
+        """Counts the frame, printing and restarting the report every `report_every` frames."""
+        if not self.enabled:
+            return
+        self.sampling = False
+        self.frames += 1
+        if self.frames >= self.report_every:
+            print(self.report())
+            self.reset()
+
+    def report(self):
+        """The statistics so far, as text."""
+        lines = [f"--- {self.frames} frames ---"]
+        for section in self.sections.values():
+            frames = section.frames or 1
+            lines.append(f"{section.name:12} held {section.held / frames:8.0f} B/frame, "
+                         f"temporary peak {section.peak / frames:8.0f} B/frame")
+            for count, size, where in section.lines:
+                lines.append(f"    {count:5} blocks {size:7} B  {where}")
+        for generation, (count, seconds, longest, collected) in enumerate(self.collections):
+            lines.append(f"gc gen {generation}: {count} collections, {seconds * 1000:.2f} ms total, "
+                         f"longest {longest * 1000:.2f} ms, {collected} objects collected")
+        lines.extend(reporter() for reporter in self.reporters)
+        return "\n".join(lines)
+
+
+def freeze_after_load():
+    """Moves everything alive now into the collector's permanent generation.
+
+    Call once a level has loaded. Whatever was frozen after the previous
+    level is unfrozen and collected first, so levels that are done with
+    don't stay in memory.
+    """
+    gc.unfreeze()
+    gc.collect()
+    gc.freeze()
+
+
+def main():
+    """Plays the first level with scripted input and reports, without and with gc.freeze()."""
+    import argparse
+    import os
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    import platformer
+    from controls import ActionState, JUMP, RIGHT
+
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("--frames", type=int, default=1200)
+    args = parser.parse_args()
+
+    game_module = platformer.game
+    diagnostics = game_module.frame_diagnostics
+    diagnostics.report_every = args.frames + 1 # One report at the end
+    for freeze in (False, True):
+        game = platformer.Game()
+        game.start()
+        game_module.audio_manager.set_sound_on(False)
+        game_module.game_settings["gc_freeze"] = freeze
+        scene = game_module.PlayingScene(game)
+        game.scenes = [scene]
+        # Run right, jumping now and then, as a player would
+        actions = collections.deque([ActionState(RIGHT)] * 50 + [ActionState(RIGHT | JUMP, JUMP)] * 10)
+        game_module.input_manager.poll = lambda player=0: actions[0]
+        # Settle in before measuring
+        for _ in range(60):
+            scene.update(1000 / platformer.FPS)
+            scene.draw(game_module.renderer)
+        diagnostics.start()
+        diagnostics.reset()
+        for _ in range(args.frames):
+            diagnostics.begin_frame()
+            actions.rotate()
+            scene.update(1000 / platformer.FPS)
+            scene.draw(game_module.renderer)
+            diagnostics.end_frame()
+        print(f"gc.freeze() {'on' if freeze else 'off'}, {gc.get_freeze_count()} objects frozen")
+        print(diagnostics.report())
+        diagnostics.stop()
+        gc.unfreeze()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,279 @@
+# =============================================================================
+# Platformer: The Mysterious Path - Heatmaps
+#
+# Adds up telemetry files (see telemetry.py) from any number of sessions into
+# per-tile totals for every level: how long players spent on each tile
+# (from the position the game logs every POSITION_SAMPLE_MS), where they
+# were hit by enemies and where they fell out of the world. Each is drawn
+# as a heatmap over the level's layout, built from the same world_maps the
+# game plays.
+#
+# Files are read one event at a time and coordinates are binned a chunk at
+# a time with numpy, so memory stays flat however big the files are. Files
+# are shared out among worker processes in small batches, and only a few
+# batches are in flight at once, so the same holds for the number of files.
+# Damaged files (e.g. from a crash mid-write) count up to where they break,
+# and events without a usable position are skipped.
+#
+# Usage:
+#   python heatmap.py telemetry --out heatmaps
+#   python heatmap.py /data/telemetry-2025-* --workers 16
+# =============================================================================
+
+import argparse
+import concurrent.futures
+import itertools
+import multiprocessing
+import os
+import time
+import zlib
+
+import numpy as np
+
+import telemetry
+
+KINDS = ("time", "hits", "falls")
+EVENT_KINDS = {"position": "time", "damage": "hits", "fall": "falls"} # The events each kind adds up
+CHUNK_EVENTS = 1 << 16 # Coordinates buffered per level and kind before they are binned
+FILES_PER_JOB = 32 # Files a worker adds up before handing back its totals
+JOBS_PER_WORKER = 2 # Batches queued per worker at most
+CELL_SIZE = 16 # Pixels per tile in the rendered heatmaps
+
+# Layout colours by map character; anything else is empty space
+BACKGROUND_COLOR = (24, 24, 36)
+LAYOUT_COLORS = {
+    "X": (110, 110, 120), # Terrain
+    "s": (230, 200, 60), # Part
+    "G": (60, 200, 90), # Goal
+    "P": (70, 120, 230), # Player start
+}
+HEAT_OPACITY = 0.85 # Of the hottest tile over the layout
+
+
+def _is_int(value):
+    """Whether a JSON value is an integer; JSON's true and false aren't, though Python's bools are ints."""
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+class Heatmaps:
+    """Per-tile totals for every level, added up from telemetry events.
+
+    `shapes` holds each level's (rows, columns) and `bottom` the y of the
+    bottom of every map, which sits at the bottom of the screen (see
+    parse_map). `counts[kind][level]` is a rows x columns array: position
+    samples for "time", and events for "hits" and "falls". Falls are
+    counted in the bottom row, since players fall out of the world there.
+    """
+    def __init__(self, shapes, tile_size, bottom):
+        self.shapes = shapes
+        self.tile_size = tile_size
+        self.bottom = bottom
+        self.counts = {kind: [np.zeros(shape, np.int64) for shape in shapes] for kind in KINDS}
+        self.plays = [0] * len(shapes) # Times each level was started
+        self.files = self.events = self.damaged = 0
+        self.pending = {} # (kind, level) -> ([x], [y]) waiting to be binned
+
+    def add_file(self, path):
+        """Adds every event in one telemetry file."""
+        self.files += 1
+        try:
+            for record in telemetry.read_events(path):
+                self.add_event(record)
+        except (OSError, EOFError, ValueError, zlib.error) as e:
+            # Cut short, e.g. by a crash; what was read before still counts
+            print(f"Damaged telemetry file {path}: {e}")
+            self.damaged += 1
+        self.flush()
+
+    def add_event(self, record):
+        self.events += 1
+        if not isinstance(record, dict):
+            return # Valid JSON, but not an event
+        name = record.get("event")
+        level = record.get("level")
+        if not _is_int(level) or not 0 <= level < len(self.shapes):
+            return # Before any level, or a level this build doesn't have
+        if name == "level_start":
+            self.plays[level] += 1
+            return
+        kind = EVENT_KINDS.get(name)
+        if kind is None:
+            return
+        x = record.get("x")
+        y = self.bottom - 1 if kind == "falls" else record.get("y")
+        if _is_int(x) and _is_int(y): # Missing e.g. in events from other builds
+            self.add_point(kind, level, x, y)
+
+    def add_point(self, kind, level, x, y):
+        key = (kind, level)
+        points = self.pending.get(key)
+        if points is None:
+            points = self.pending[key] = ([], [])
+        points[0].append(x)
+        points[1].append(y)
+        if len(points[0]) >= CHUNK_EVENTS:
+            self.bin(kind, level, *self.pending.pop(key))
+
+    def flush(self):
+        """Bins every buffered coordinate."""
+        for (kind, level), (xs, ys) in self.pending.items():
+            self.bin(kind, level, xs, ys)
+        self.pending.clear()
+
+    def bin(self, kind, level, xs, ys):
+        """Adds world coordinates to the level's tile counts, clamped to the map."""
+        rows, columns = self.shapes[level]
+        top = self.bottom - rows * self.tile_size
+        column = np.clip(np.asarray(xs) // self.tile_size, 0, columns - 1)
+        row = np.clip((np.asarray(ys) - top) // self.tile_size, 0, rows - 1)
+        counts = np.bincount(row * columns + column, minlength=rows * columns)
+        self.counts[kind][level] += counts.reshape(rows, columns)
+
+    def merge(self, other):
+        """Adds another Heatmaps' totals to these."""
+        for kind in KINDS:
+            for totals, counts in zip(self.counts[kind], other.counts[kind]):
+                totals += counts
+        self.plays = [a + b for a, b in zip(self.plays, other.plays)]
+        self.files += other.files
+        self.events += other.events
+        self.damaged += other.damaged
+
+
+def level_geometry():
+    """The (rows, columns) of every level in world_maps, the tile size and the map bottom."""
+    from platformer import core
+    shapes = [(len(world_map), len(world_map[0])) for world_map in core.world_maps]
+    return shapes, core.TILE_SIZE, core.SCREEN_HEIGHT
+
+
+def find_files(paths):
+    """Yields the telemetry files given, and those under the directories given."""
+    for path in paths:
+        if not os.path.isdir(path):
+            yield path
+            continue
+        for directory, _, names in os.walk(path):
+            for name in names:
+                if name.endswith(".jsonl.gz"):
+                    yield os.path.join(directory, name)
+
+
+def batches(iterable, size):
+    """Yields lists of up to `size` items, taking them from `iterable` as needed."""
+    iterator = iter(iterable)
+    while batch := list(itertools.islice(iterator, size)):
+        yield batch
+
+
+def _add_files(geometry, paths):
+    """Worker: adds up one batch of files. Returns its Heatmaps."""
+    heatmaps = Heatmaps(*geometry)
+    for path in paths:
+        heatmaps.add_file(path)
+    return heatmaps
+
+
+def aggregate(paths, workers=None):
+    """Adds up every telemetry file under `paths` on a pool of worker processes."""
+    geometry = level_geometry()
+    totals = Heatmaps(*geometry)
+    workers = workers or os.cpu_count()
+    context = multiprocessing.get_context("spawn")
+    with concurrent.futures.ProcessPoolExecutor(workers, mp_context=context) as pool:
+        # Keep only a few batches in flight, so millions of files don't pile up as queued jobs
+        running = set()
+        for batch in batches(find_files(paths), FILES_PER_JOB):
+            if len(running) >= workers * JOBS_PER_WORKER:
+                done, running = concurrent.futures.wait(running, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    totals.merge(future.result())
+            running.add(pool.submit(_add_files, geometry, batch))
+        for future in concurrent.futures.as_completed(running):
+            totals.merge(future.result())
+    return totals
+
+
+def layout_colors(world_map):
+    """The level's map as a rows x columns x 3 array of colours."""
+    colors = np.empty((len(world_map), len(world_map[0]), 3), np.uint8)
+    colors[:] = BACKGROUND_COLOR
+    for row_index, row in enumerate(world_map):
+        for col_index, char in enumerate(row):
+            if char in LAYOUT_COLORS:
+                colors[row_index, col_index] = LAYOUT_COLORS[char]
+    return colors
+
+
+def heat_colors(counts, layout):
+    """Blends counts over the layout: black through red and yellow to white, on a log scale."""
+    heat = np.log1p(counts.astype(np.float64))
+    if heat.max() > 0:
+        heat /= heat.max()
+    # Red rises first, then green, then blue
+    color = np.stack([np.clip(heat * 3 - channel, 0, 1) for channel in range(3)], axis=-1) * 255
+    opacity = (heat * HEAT_OPACITY)[..., None]
+    opacity[counts == 0] = 0 # Leave the layout visible where nothing happened
+    return (layout * (1 - opacity) + color * opacity).astype(np.uint8)
+
+
+def render(heatmaps, out_dir):
+    """Saves a heatmap image per level and kind to out_dir. Returns the paths."""
+    import pygame
+    from platformer import core
+    os.makedirs(out_dir, exist_ok=True)
+    paths = []
+    for level, world_map in enumerate(core.world_maps):
+        layout = layout_colors(world_map)
+        for kind in KINDS:
+            pixels = heat_colors(heatmaps.counts[kind][level], layout)
+            pixels = pixels.repeat(CELL_SIZE, axis=0).repeat(CELL_SIZE, axis=1)
+            # surfarray wants columns first
+            surface = pygame.surfarray.make_surface(pixels.transpose(1, 0, 2))
+            path = os.path.join(out_dir, f"level_{level + 1}_{kind}.png")
+            pygame.image.save(surface, path)
+            paths.append(path)
+    return paths
+
+
+def report(heatmaps, sample_ms):
+    """A text summary per level, with the tiles where most players died."""
+    lines = []
+    for level, plays in enumerate(heatmaps.plays):
+        seconds = heatmaps.counts["time"][level].sum() * sample_ms / 1000
+        hits = heatmaps.counts["hits"][level]
+        falls = heatmaps.counts["falls"][level]
+        per_play = max(plays, 1)
+        lines.append(f"Level {level + 1}: {plays} plays, {seconds / 60:.0f} min played, "
+                     f"{hits.sum()} hits ({hits.sum() / per_play:.2f}/play), "
+                     f"{falls.sum()} falls ({falls.sum() / per_play:.2f}/play)")
+        deaths = hits + falls
+        columns = deaths.shape[1]
+        for index in np.argsort(deaths, axis=None)[::-1][:3]:
+            if deaths.flat[index]:
+                row, column = divmod(int(index), columns)
+                lines.append(f"    column {column}, row {row}: {deaths.flat[index]} lives lost")
+    return "\n".join(lines)
+
+
+def main():
+    """Adds up telemetry files, prints a summary and saves the heatmaps."""
+    from platformer import core
+    parser = argparse.ArgumentParser(description="Build per-tile heatmaps from telemetry files.")
+    parser.add_argument("paths", nargs="*", default=[telemetry.TELEMETRY_DIR],
+                        help="telemetry files or directories of them")
+    parser.add_argument("--out", default="heatmaps", help="directory to save the images to")
+    parser.add_argument("--workers", type=int, default=None, help="number of worker processes")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    heatmaps = aggregate(args.paths, args.workers)
+    elapsed = time.perf_counter() - start
+    print(f"{heatmaps.files} files ({heatmaps.damaged} damaged), {heatmaps.events} events in {elapsed:.2f}s: "
+          f"{heatmaps.events / max(elapsed, 1e-9):.0f} events/s")
+    print(report(heatmaps, core.POSITION_SAMPLE_MS))
+    paths = render(heatmaps, args.out)
+    print(f"Saved {len(paths)} heatmaps to {args.out}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,384 @@
+# =============================================================================
+# Platformer: The Mysterious Path - Level Generator
+#
+# Builds levels from a seed in the same text format as the hand-made
+# world_maps, so parse_map() reads them unchanged. A level is a chain of
+# one-tile-thick ledges joined by steps and pits. Step heights and pit
+# widths are checked against the player's own jump arc, with a tile to
+# spare, so every level can be finished. Columns are produced one at a time
+# from a few variables of state, so memory stays flat however long the
+# level is.
+#
+# Usage:
+#   python levelgen.py level --seed 7 --columns 200
+#   python levelgen.py level --seed 7 --columns 10000000 --out long.txt
+#   python levelgen.py batch --count 1000 --columns 512 --out levels
+# =============================================================================
+
+import argparse
+import bisect
+import collections
+import itertools
+import multiprocessing
+import os
+import random
+import sys
+import time
+
+# Levels can be streamed to stdout, so keep pygame's greeting out of them
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+# The player's own movement, so jumps are checked against the game's physics
+from platformer.core import GRAVITY, JUMP_STRENGTH, MAX_FALL_SPEED, PLAYER_SPEED, PLAYER_WIDTH, TILE_SIZE
+
+ROWS = 12 # Same height as the hand-made levels
+
+MIN_HEIGHT, MAX_HEIGHT = 1, 6 # Ledge heights, in tiles above the bottom of the map
+MIN_LEDGE, MAX_LEDGE = 3, 8 # Ledge widths in tiles
+MIN_COLUMNS = 24
+REQUIRED_PARTS = 3 # Parts needed at the goal
+CHUNK_COLUMNS = 4096 # Columns per block when writing a level to a file
+MAP_CHARS = set(" XPsGNtE")
+
+
+def jump_reach():
+    """Widest pit the player can jump across, in tiles, for each change in height.
+
+    Returns {rise: tiles}, with rise in tiles (negative for a drop). Found
+    by stepping a running jump tick by tick the way Player.move() does, from
+    the last pixel of one ledge. The player may brush the far wall on the
+    way up, as the game's collision lets them slide up it.
+    """
+    reach = {}
+    for rise in range(MIN_HEIGHT - MAX_HEIGHT, MAX_HEIGHT - MIN_HEIGHT + 1):
+        gap = 0
+        while _lands(rise, gap):
+            gap += 1
+        if gap:
+            reach[rise] = gap - 1
+    return reach
+
+
+def _lands(rise, gap):
+    """Whether a running jump from a ledge's edge reaches a ledge `gap` tiles on and `rise` tiles up."""
+    left = gap * TILE_SIZE # Near edge of the landing ledge, relative to the take-off edge
+    top = rise * TILE_SIZE
+    x, height, velocity = -1, 0.0, -JUMP_STRENGTH
+    while height >= top or velocity < 0:
+        velocity = min(velocity + GRAVITY, MAX_FALL_SPEED)
+        height -= velocity
+        x += PLAYER_SPEED
+        if x + PLAYER_WIDTH > left:
+            if height >= top:
+                return True
+            x = left - PLAYER_WIDTH # Against the wall below the ledge
+    return False
+
+
+def safe_reach():
+    """jump_reach() with a tile of slack, for the generator to stay well inside."""
+    return {rise: gap - 1 for rise, gap in jump_reach().items() if gap >= 1}
+
+
+# --- Generation ---
+
+def _column(height=0, marker=" ", ledge=0, ledge_marker=" "):
+    """One column, top row first: a ledge tile at `height` with `marker` standing on it.
+
+    `ledge` adds a second, higher ledge tile (a bonus platform) with
+    `ledge_marker` on top. A column without a ledge is a pit.
+    """
+    cells = [" "] * ROWS
+    if height:
+        cells[ROWS - height] = "X"
+        cells[ROWS - height - 1] = marker
+    else:
+        cells[ROWS - 1] = "t"
+    if ledge:
+        cells[ROWS - ledge] = "X"
+        cells[ROWS - ledge - 1] = ledge_marker
+    return "".join(cells)
+
+
+def generate_columns(seed, columns=256, difficulty=0.5):
+    """Yields a level's columns (strings of ROWS characters, top first) left to right.
+
+    `difficulty` from 0 to 1 widens pits, raises steps and adds enemies.
+    Only the current ledge is held in memory, so this can stream levels of
+    any length.
+    """
+    if columns < MIN_COLUMNS:
+        raise ValueError(f"Levels need at least {MIN_COLUMNS} columns")
+    rng = random.Random(seed)
+    reach = safe_reach()
+    longest_pit = max(reach.values())
+    # Parts are spread through the level so collecting them means crossing it
+    targets = collections.deque(columns * (i + 1) // (REQUIRED_PARTS + 1) for i in range(REQUIRED_PARTS))
+
+    column = 0
+    height = rng.randint(MIN_HEIGHT, 3)
+    while True:
+        remaining = columns - column
+        start = column == 0
+        length = rng.randint(5 if start else MIN_LEDGE, MAX_LEDGE)
+        # The last ledge takes whatever is left and holds the goal
+        final = remaining - length < MIN_LEDGE + 1 + longest_pit
+        if final:
+            length = remaining
+
+        markers = [" "] * length
+        if start:
+            markers[1] = "P"
+        if final:
+            markers[-3] = "G"
+        # Ledges of four or more tiles get an enemy unless marked 'N'. The
+        # last one runs to the end of the row, which parse_map never checks.
+        elif length >= 4 and (start or rng.random() >= difficulty * 0.6):
+            markers[0] = "N"
+        # Parts go in the middle of the ledge, or either side if it's taken
+        due = sum(1 for target in targets if target < column + length) or (rng.random() < 0.05)
+        for i in sorted(range(length), key=lambda i: abs(i - length // 2)):
+            if due and markers[i] == " ":
+                markers[i] = "s"
+                due -= 1
+                if targets and targets[0] < column + length:
+                    targets.popleft()
+
+        # Now and then a short platform two tiles up, clear of the ledge's ends
+        bonus = range(0)
+        if length >= 7 and height + 2 <= MAX_HEIGHT and rng.random() < 0.3:
+            first = rng.randint(2, length - 4)
+            bonus = range(first, first + 2)
+        for i, marker in enumerate(markers):
+            if i in bonus:
+                yield _column(height, marker, height + 2, "s" if i == bonus[0] and rng.random() < 0.5 else " ")
+            else:
+                yield _column(height, marker)
+        column += length
+        if final:
+            return
+
+        if rng.random() < 0.35 + difficulty * 0.4:
+            # A pit, landing on a ledge up to two tiles higher or lower
+            rises = [rise for rise in reach if abs(rise) <= 2 and MIN_HEIGHT <= height + rise <= MAX_HEIGHT]
+            rise = rng.choice(rises)
+            widest = max(1, round(reach[rise] * (0.5 + difficulty / 2)))
+            for _ in range(rng.randint(1, widest)):
+                yield _column()
+                column += 1
+            height += rise
+        else:
+            # A one tile step, which the player can walk down or hop up
+            height += rng.choice([rise for rise in (-1, 1) if MIN_HEIGHT <= height + rise <= MAX_HEIGHT])
+
+
+def columns_to_rows(columns):
+    """Turns a sequence of columns into world_map rows."""
+    return ["".join(row) for row in zip(*columns)]
+
+
+def generate_level(seed, columns=256, difficulty=0.5):
+    """Returns a whole level as a world_map (a list of row strings)."""
+    return columns_to_rows(generate_columns(seed, columns, difficulty))
+
+
+def write_level(file, seed, columns=256, difficulty=0.5, chunk=CHUNK_COLUMNS):
+    """Streams a level to a text file; returns the number of columns written.
+
+    Rows are written a block of `chunk` columns at a time, blocks separated
+    by a blank line, so only one block is ever in memory. read_level()
+    joins them back together.
+    """
+    stream = generate_columns(seed, columns, difficulty)
+    written = 0
+    while True:
+        block = list(itertools.islice(stream, chunk))
+        if not block:
+            return written
+        if written:
+            file.write("\n")
+        file.write("\n".join(columns_to_rows(block)) + "\n")
+        written += len(block)
+
+
+def read_level(path):
+    """Loads a level written by write_level() as a world_map."""
+    rows = [""] * ROWS
+    with open(path) as file:
+        block = []
+        for line in itertools.chain(file, [""]):
+            line = line.rstrip("\n")
+            if line:
+                block.append(line)
+                continue
+            if block:
+                rows = [row + part for row, part in zip(rows, block)]
+                block = []
+    return rows
+
+
+# --- Validation ---
+
+def _ledges(world_map):
+    """Every run of cells the player can stand in, as (row, first column, last column)."""
+    ledges = []
+    for row_index in range(len(world_map) - 1):
+        row, below = world_map[row_index], world_map[row_index + 1]
+        first = None
+        for col_index in range(len(row) + 1):
+            standable = col_index < len(row) and row[col_index] != "X" and below[col_index] == "X"
+            if standable and first is None:
+                first = col_index
+            elif not standable and first is not None:
+                ledges.append((row_index, first, col_index - 1))
+                first = None
+    return ledges
+
+
+def _reaches(a, b, reach):
+    """Whether the player can get from ledge a to ledge b (ceilings are not considered)."""
+    rise = a[0] - b[0]
+    if b[1] > a[2]:
+        gap = b[1] - a[2] - 1
+    elif a[1] > b[2]:
+        gap = a[1] - b[2] - 1
+    elif rise > 0:
+        # A ledge overhead: jump up past its end from beside it
+        return rise in reach and (a[1] < b[1] or a[2] > b[2])
+    else:
+        # A ledge underneath: walk off the end of this one onto it
+        return b[1] < a[1] or b[2] > a[2]
+    return gap <= reach.get(rise, -1)
+
+
+def _standing_ledge(world_map, ledges, row, col):
+    """The ledge something at (row, col) falls onto, or None over a pit."""
+    for below in range(row, len(world_map) - 1):
+        if world_map[below + 1][col] == "X":
+            for ledge in ledges:
+                if ledge[0] == below and ledge[1] <= col <= ledge[2]:
+                    return ledge
+            return None
+    return None
+
+
+def validate(world_map, reach=None):
+    """Checks a world_map can be loaded and finished; returns a list of problems.
+
+    The player must be able to get from 'P' to 'G' while collecting
+    REQUIRED_PARTS parts, using the jumps in jump_reach(). Ceilings are not
+    taken into account.
+    """
+    reach = jump_reach() if reach is None else reach
+    problems = []
+    # parse_map() allows ragged rows, as do the hand-made levels
+    width = max(map(len, world_map))
+    world_map = [row.ljust(width) for row in world_map]
+    for char in set("".join(world_map)) - MAP_CHARS:
+        problems.append(f"unknown character {char!r}")
+    cells = {char: [(r, c) for r, row in enumerate(world_map) for c, x in enumerate(row) if x == char]
+             for char in "PGs"}
+    if len(cells["P"]) != 1 or len(cells["G"]) != 1:
+        problems.append("needs exactly one 'P' and one 'G'")
+        return problems
+
+    ledges = _ledges(world_map)
+    start = _standing_ledge(world_map, ledges, *cells["P"][0])
+    if start is None:
+        problems.append("'P' is over a pit")
+        return problems
+    # Search outwards. With ledges sorted by their first column, only those
+    # starting within a jump (plus the widest ledge) can be in reach.
+    by_column = sorted(ledges, key=lambda ledge: ledge[1])
+    firsts = [ledge[1] for ledge in by_column]
+    jump = max(reach.values()) + 1
+    widest = max(last - first + 1 for _, first, last in ledges)
+    reached, frontier = {start}, [start]
+    while frontier:
+        ledge = frontier.pop()
+        low = bisect.bisect_left(firsts, ledge[1] - jump - widest)
+        high = bisect.bisect_right(firsts, ledge[2] + jump)
+        for other in by_column[low:high]:
+            if other not in reached and _reaches(ledge, other, reach):
+                reached.add(other)
+                frontier.append(other)
+
+    # Reached ledges by row, sorted, to find what's under a part quickly
+    rows = collections.defaultdict(list)
+    for ledge in sorted(reached, key=lambda ledge: ledge[1]):
+        rows[ledge[0]].append(ledge)
+    starts = {row: [ledge[1] for ledge in row_ledges] for row, row_ledges in rows.items()}
+    max_rise = max(reach)
+    def collectable(row, col):
+        # Standing on a reached ledge, or within a jump above one
+        for below in range(row, row + max_rise + 1):
+            index = bisect.bisect_right(starts.get(below, ()), col + 1) - 1
+            if index >= 0 and rows[below][index][2] >= col - 1:
+                return True
+        return False
+    if not collectable(*cells["G"][0]):
+        problems.append("'G' can't be reached")
+    parts = sum(collectable(*cell) for cell in cells["s"])
+    if parts < REQUIRED_PARTS:
+        problems.append(f"only {parts} of the {REQUIRED_PARTS} parts needed can be reached")
+    return problems
+
+
+# --- Command Line ---
+
+def _make_level(job):
+    """Batch worker: generates, checks and saves one level. Returns (seed, columns, problems)."""
+    seed, columns, difficulty, out_dir = job
+    rows = generate_level(seed, columns, difficulty)
+    problems = validate(rows)
+    if out_dir:
+        with open(os.path.join(out_dir, f"level_{seed}.txt"), "w") as file:
+            file.write("\n".join(rows) + "\n")
+    return seed, columns, problems
+
+
+def main():
+    """Generates one (possibly enormous) level, or a pack of levels on every core."""
+    parser = argparse.ArgumentParser(description="Generate platformer levels from a seed.")
+    modes = parser.add_subparsers(dest="mode", required=True)
+    level_args = modes.add_parser("level", help="stream one level to stdout or a file")
+    level_args.add_argument("--seed", type=int, default=0)
+    level_args.add_argument("--out", help="file to write instead of stdout")
+    batch_args = modes.add_parser("batch", help="generate and check a pack of levels")
+    batch_args.add_argument("--count", type=int, default=1000, help="number of levels")
+    batch_args.add_argument("--first-seed", type=int, default=0, help="seed of the first level")
+    batch_args.add_argument("--workers", type=int, default=None, help="number of worker processes")
+    batch_args.add_argument("--out", help="directory to write the levels to (default: only check them)")
+    for mode_args in (level_args, batch_args):
+        mode_args.add_argument("--columns", type=int, default=256, help="level width in tiles")
+        mode_args.add_argument("--difficulty", type=float, default=0.5, help="0 (easy) to 1 (hard)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    if args.mode == "level":
+        if args.out:
+            with open(args.out, "w") as file:
+                columns = write_level(file, args.seed, args.columns, args.difficulty)
+        else:
+            columns = write_level(sys.stdout, args.seed, args.columns, args.difficulty)
+        elapsed = time.perf_counter() - start
+        print(f"{columns} columns in {elapsed:.2f}s ({columns / elapsed:.0f} columns/s)", file=sys.stderr)
+        return
+
+    if args.out:
+        os.makedirs(args.out, exist_ok=True)
+    jobs = [(seed, args.columns, args.difficulty, args.out)
+            for seed in range(args.first_seed, args.first_seed + args.count)]
+    workers = args.workers or os.cpu_count()
+    columns = failed = 0
+    with multiprocessing.get_context("spawn").Pool(workers) as pool:
+        for seed, width, problems in pool.imap_unordered(_make_level, jobs, chunksize=16):
+            columns += width
+            if problems:
+                failed += 1
+                print(f"Level {seed}: {'; '.join(problems)}")
+    elapsed = time.perf_counter() - start
+    print(f"{args.count} levels ({columns} columns) in {elapsed:.2f}s on {workers} workers: "
+          f"{columns / elapsed:.0f} columns/s, {args.count / elapsed:.0f} levels/s, {failed} failed checks")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,534 @@
+# =============================================================================
+# Platformer: The Mysterious Path - Network Play
+#
+# Optional online multiplayer. A headless, authoritative server runs the
+# game simulation for any number of sessions at a fixed tick; clients only
+# send their inputs and receive world snapshots (see snapshot.py) over UDP.
+# Snapshots are sent as the compressed XOR against the last snapshot the
+# client acknowledged, so a typical update is a few dozen bytes.
+#
+# Clients predict their own player by applying their inputs immediately.
+# When a snapshot arrives, the world is reset to the server's state and the
+# inputs the server hasn't processed yet are replayed on top
+# (reconciliation). Every input packet repeats the last few inputs, so a
+# lost packet rarely loses an input.
+#
+# Usage:
+#   python net.py server --port 7777
+#   python net.py client 127.0.0.1:7777
+#   python net.py loopback --sessions 8 --clients 4 --latency 80 --loss 0.05
+# =============================================================================
+
+import argparse
+import asyncio
+import collections
+import contextlib
+import math
+import random
+import socket
+import struct
+import threading
+import time
+import zlib
+
+import controls
+import snapshot
+
+DEFAULT_PORT = 7777
+TICK_RATE = 60
+SNAPSHOT_INTERVAL = 2 # Ticks between snapshots sent to each client (30 per second)
+HISTORY_TICKS = 64 # Snapshots kept as delta baselines
+REDUNDANT_INPUTS = 8 # Unacknowledged inputs repeated in every input packet
+MAX_INPUT_BUFFER = 4 # Inputs a client may run ahead before the server skips forward
+CLIENT_TIMEOUT = 5.0 # Seconds of silence before a client is dropped
+MAX_PACKET = 2048
+MAX_STATE = 1 << 16 # Bytes a snapshot may decompress to at most
+
+# --- Packets ---
+JOIN, INPUT, STATE, LEAVE = range(4)
+NONE = 0xFFFFFFFF # No tick / input sequence yet
+
+_TYPE = struct.Struct("<B")
+_INPUT = struct.Struct("<BIIB") # type, acknowledged state tick, first input sequence, input count
+_ACTION = struct.Struct("<BBb") # held, pressed, move_x * 127
+_STATE = struct.Struct("<BIIIB") # type, tick, baseline tick, last processed input, player index
+
+
+def encode_actions(actions):
+    """Packs an ActionState into three bytes."""
+    return _ACTION.pack(actions.held, actions.pressed, round(actions.move_x * 127))
+
+
+def decode_actions(data, offset):
+    held, pressed, move_x = _ACTION.unpack_from(data, offset)
+    return controls.ActionState(held, pressed, move_x / 127)
+
+
+# --- Server ---
+
+class RemoteClient:
+    """A client connected to the server and the inputs it has sent."""
+    def __init__(self, address):
+        self.address = address
+        self.inputs = {} # Sequence -> ActionState waiting for its tick
+        self.next_seq = 0
+        self.last_seq = NONE # Last input simulated
+        self.last_actions = controls.IDLE
+        self.ack_tick = NONE # Newest snapshot the client has confirmed
+        self.last_heard = time.monotonic()
+        self.missed = 0 # Ticks simulated without a fresh input
+
+    def add_inputs(self, first_seq, inputs):
+        for i, actions in enumerate(inputs):
+            if first_seq + i >= self.next_seq:
+                self.inputs[first_seq + i] = actions
+
+    def next_input(self):
+        """Returns the input for this tick, repeating the last one if it hasn't arrived."""
+        if len(self.inputs) > MAX_INPUT_BUFFER:
+            # Fell behind (or an input was lost for good); catch up
+            self.next_seq = max(self.inputs) - MAX_INPUT_BUFFER + 1
+            self.inputs = {seq: a for seq, a in self.inputs.items() if seq >= self.next_seq}
+        actions = self.inputs.pop(self.next_seq, None)
+        if actions is None:
+            self.missed += 1
+            return controls.ActionState(self.last_actions.held & ~self.last_actions.pressed, 0,
+                                        self.last_actions.move_x)
+        self.last_seq = self.next_seq
+        self.next_seq += 1
+        self.last_actions = actions
+        return actions
+
+
+class Session:
+    """One shared game; each client controls one of its world's players."""
+    def __init__(self, name, make_world, level_count, step_ms):
+        self.name = name
+        self.world = make_world(0)
+        self.level_count = level_count
+        self.step_ms = step_ms
+        self.clients = [] # Client i controls world.players[i]
+        self.tick_count = 0
+        self.history = collections.OrderedDict() # Tick -> snapshot
+
+    def join(self, client):
+        if self.clients:
+            self.world.set_player_count(len(self.clients) + 1)
+        self.clients.append(client)
+
+    def leave(self, client):
+        index = self.clients.index(client)
+        del self.clients[index]
+        if self.clients:
+            self.world.remove_player(index)
+
+    def tick(self):
+        """Runs one simulation tick and returns the new snapshot."""
+        world = self.world
+        actions = [client.next_input() for client in self.clients]
+        result = world.update(actions, self.step_ms)
+        if result == "game_over":
+            world.load(world.level_index)
+        elif result == "respawned":
+            world.respawn_at_checkpoint()
+        elif any(a.pressed & controls.INTERACT for a in actions) and world.collected_parts() >= 3 and \
+                world.goal and any(p.rect.colliderect(world.goal) for p in world.players):
+            world.load((world.level_index + 1) % self.level_count)
+
+        self.tick_count += 1
+        state = snapshot.save(world)
+        self.history[self.tick_count] = state
+        if len(self.history) > HISTORY_TICKS:
+            self.history.popitem(last=False)
+        return state
+
+    def state_packet(self, client, state):
+        """Builds a snapshot packet, delta encoded against the client's last acknowledged state."""
+        baseline = self.history.get(client.ack_tick)
+        if baseline is not None and len(baseline) == len(state):
+            payload, baseline_tick = snapshot.xor_bytes(state, baseline), client.ack_tick
+        else:
+            payload, baseline_tick = state, NONE
+        return _STATE.pack(STATE, self.tick_count, baseline_tick, client.last_seq,
+                           self.clients.index(client)) + zlib.compress(payload, 1)
+
+
+class Server:
+    """Authoritative server running every session on one fixed-rate tick."""
+    def __init__(self, make_world, level_count, tick_rate=TICK_RATE):
+        self.make_world = make_world
+        self.level_count = level_count
+        self.tick_rate = tick_rate
+        self.sessions = {}
+        self.clients = {} # Address -> (session, RemoteClient)
+        self.transport = None
+        self.stats = collections.Counter()
+
+    def receive(self, data, address):
+        if not data:
+            return
+        kind = data[0]
+        entry = self.clients.get(address)
+        if kind == JOIN and entry is None:
+            name = data[1:].decode(errors="replace") or "default"
+            session = self.sessions.get(name)
+            if session is None:
+                session = self.sessions[name] = Session(name, self.make_world, self.level_count,
+                                                        1000 / self.tick_rate)
+            client = RemoteClient(address)
+            session.join(client)
+            self.clients[address] = (session, client)
+        elif entry is None:
+            return
+        elif kind == INPUT and len(data) >= _INPUT.size:
+            client = entry[1]
+            client.last_heard = time.monotonic()
+            _, ack_tick, first_seq, count = _INPUT.unpack_from(data, 0)
+            client.ack_tick = ack_tick
+            offset = _INPUT.size
+            inputs = [decode_actions(data, offset + i * _ACTION.size) for i in range(count)
+                      if offset + (i + 1) * _ACTION.size <= len(data)]
+            client.add_inputs(first_seq, inputs)
+        elif kind == LEAVE:
+            self.disconnect(address)
+
+    def disconnect(self, address):
+        session, client = self.clients.pop(address)
+        session.leave(client)
+        if not session.clients:
+            del self.sessions[session.name]
+
+    def tick(self):
+        """Advances every session and sends the snapshots that are due."""
+        now = time.monotonic()
+        for address, (_, client) in list(self.clients.items()):
+            if now - client.last_heard > CLIENT_TIMEOUT:
+                self.disconnect(address)
+        for session in self.sessions.values():
+            state = session.tick()
+            if session.tick_count % SNAPSHOT_INTERVAL == 0:
+                for client in session.clients:
+                    packet = session.state_packet(client, state)
+                    self.transport.sendto(packet, client.address)
+                    self.stats["packets"] += 1
+                    self.stats["bytes"] += len(packet)
+
+    async def run(self, stop=None):
+        """Ticks at the fixed rate until `stop` (an asyncio or threading Event) is set."""
+        interval = 1 / self.tick_rate
+        next_tick = time.perf_counter()
+        while stop is None or not stop.is_set():
+            start = time.perf_counter()
+            self.tick()
+            self.stats["ticks"] += 1
+            self.stats["tick_time"] += time.perf_counter() - start
+            next_tick += interval
+            # Skip ticks rather than spiral if the server ever falls far behind
+            next_tick = max(next_tick, time.perf_counter() - interval * 4)
+            await asyncio.sleep(max(0.0, next_tick - time.perf_counter()))
+
+
+class ServerProtocol(asyncio.DatagramProtocol):
+    def __init__(self, server):
+        self.server = server
+
+    def connection_made(self, transport):
+        self.server.transport = transport
+
+    def datagram_received(self, data, address):
+        self.server.receive(data, address)
+
+
+# --- Client ---
+
+class Client:
+    """Client side of a session: predicts the local player and reconciles with the server.
+
+    Sends nothing itself; the caller moves the packets (see Connection and
+    the loopback test). `make_world` builds a World for a level index and
+    `quiet` is a context manager that silences sounds and effects while
+    inputs are replayed.
+    """
+    def __init__(self, make_world, step_ms, session="default", quiet=contextlib.nullcontext):
+        self.make_world = make_world
+        self.session = session
+        self.step_ms = step_ms
+        self.quiet = quiet
+        self.world = None # Created when the first snapshot arrives
+        self.player_index = 0
+        self.seq = 0
+        self.pending = collections.deque() # (sequence, ActionState) not yet simulated by the server
+        self.states = collections.OrderedDict() # Tick -> snapshot, baselines for deltas
+        self.latest_tick = NONE
+        self.last_state_time = 0.0
+        self.stats = collections.Counter()
+
+    @property
+    def player(self):
+        return self.world.players[self.player_index]
+
+    def leave_packet(self):
+        return _TYPE.pack(LEAVE)
+
+    def update(self, actions):
+        """Applies this tick's input to the local player and returns the packets to send."""
+        # Keep asking to join until snapshots show it worked, and again if the
+        # server has gone quiet long enough to have dropped us
+        joined = self.world is not None and time.monotonic() - self.last_state_time < CLIENT_TIMEOUT
+        packets = [] if joined else [_TYPE.pack(JOIN) + self.session.encode()]
+        if self.world is not None:
+            self.predict(actions)
+        self.pending.append((self.seq, actions))
+        self.seq += 1
+        if len(self.pending) > TICK_RATE * 2:
+            self.pending.popleft() # The server is clearly not listening
+
+        inputs = list(self.pending)[-REDUNDANT_INPUTS:]
+        packets.append(_INPUT.pack(INPUT, self.latest_tick, inputs[0][0], len(inputs))
+                       + b"".join(encode_actions(a) for _, a in inputs))
+        return packets
+
+    def predict(self, actions):
+        """Moves the local player as the server will once it gets the input."""
+        player = self.player
+        player.move(actions, self.world.tiles)
+        player.update_timers(self.step_ms)
+        # The clock runs on with the prediction so the player's animation does too
+        world = self.world
+        world.time += self.step_ms
+        player.set_state(world.time)
+
+    def receive(self, data):
+        """Handles a packet from the server; packets that don't decode are dropped."""
+        if len(data) < _STATE.size or data[0] != STATE:
+            return
+        _, tick, baseline_tick, last_seq, player_index = _STATE.unpack_from(data, 0)
+        if self.latest_tick != NONE and tick <= self.latest_tick:
+            self.stats["stale"] += 1 # Arrived out of order
+            return
+        try:
+            decompressor = zlib.decompressobj()
+            payload = decompressor.decompress(data[_STATE.size:], MAX_STATE)
+        except zlib.error:
+            self.stats["malformed"] += 1
+            return
+        if baseline_tick != NONE:
+            baseline = self.states.get(baseline_tick)
+            if baseline is None or len(baseline) != len(payload):
+                self.stats["undecodable"] += 1
+                return
+            state = snapshot.xor_bytes(payload, baseline)
+        else:
+            state = payload
+
+        if self.world is None:
+            self.world = self.make_world(0)
+            predicted = None
+        else:
+            predicted = self.player.rect.topleft
+        # Reset to the server's world, then replay the inputs it hasn't seen yet
+        try:
+            snapshot.restore(self.world, state)
+            if player_index >= len(self.world.players):
+                raise ValueError(f"No player {player_index}")
+        except (struct.error, ValueError, IndexError):
+            # Garbage that happened to decompress; the next good snapshot puts the world right
+            self.stats["malformed"] += 1
+            return
+        self.stats["deltas" if baseline_tick != NONE else "full"] += 1
+        self.states[tick] = state
+        while len(self.states) > HISTORY_TICKS:
+            self.states.popitem(last=False)
+        self.latest_tick = tick
+        self.last_state_time = time.monotonic()
+        self.player_index = player_index
+        while self.pending and last_seq != NONE and self.pending[0][0] <= last_seq:
+            self.pending.popleft()
+        with self.quiet():
+            for _, actions in self.pending:
+                self.predict(actions)
+        if predicted is not None:
+            error = math.dist(predicted, self.player.rect.topleft)
+            self.stats["corrections"] += error > 0
+            self.stats["error"] += error
+            self.stats["states"] += 1
+
+
+class Connection:
+    """Non-blocking UDP socket for a client polled from the game loop."""
+    def __init__(self, address):
+        self.address = address
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.socket.setblocking(False)
+
+    def send(self, data):
+        try:
+            self.socket.sendto(data, self.address)
+        except OSError as e:
+            print(f"Could not send to {self.address}: {e}")
+
+    def receive_all(self):
+        """Returns every packet that has arrived since the last call."""
+        packets = []
+        while True:
+            try:
+                data, _ = self.socket.recvfrom(MAX_PACKET)
+            except (BlockingIOError, InterruptedError):
+                return packets
+            except OSError:
+                return packets # e.g. the server's port was closed
+            packets.append(data)
+
+    def close(self):
+        self.socket.close()
+
+
+# --- Loopback Testing ---
+
+class SimulatedLink:
+    """Delays and drops packets to imitate a real network."""
+    def __init__(self, latency_ms=0, jitter_ms=0, loss=0.0, seed=0):
+        self.latency = latency_ms / 1000
+        self.jitter = jitter_ms / 1000
+        self.loss = loss
+        self.rng = random.Random(seed)
+        self.loop = asyncio.get_running_loop()
+
+    def deliver(self, callback, *args):
+        """Calls callback(*args) after the simulated one-way delay, unless the packet is lost."""
+        if self.rng.random() < self.loss:
+            return
+        delay = max(0.0, self.latency + self.rng.uniform(-self.jitter, self.jitter))
+        self.loop.call_later(delay, callback, *args)
+
+
+class BotClientProtocol(asyncio.DatagramProtocol):
+    """A loopback client playing random moves through a simulated link."""
+    def __init__(self, client, link):
+        self.client = client
+        self.link = link
+        self.transport = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, address):
+        self.link.deliver(self.client.receive, data)
+
+    def send(self, data):
+        self.link.deliver(self.transport.sendto, data)
+
+
+async def run_bot(protocol, actions, rng, stop):
+    """Sends a random input every tick until stopped."""
+    client = protocol.client
+    action = actions[0]
+    next_tick = time.perf_counter()
+    while not stop.is_set():
+        if rng.random() < 0.05:
+            action = rng.choice(actions)
+        for packet in client.update(action):
+            protocol.send(packet)
+            client.stats["sent_bytes"] += len(packet)
+        next_tick = max(next_tick + 1 / TICK_RATE, time.perf_counter() - 4 / TICK_RATE)
+        await asyncio.sleep(max(0.0, next_tick - time.perf_counter()))
+    protocol.transport.sendto(client.leave_packet())
+
+
+async def loopback(game, args):
+    """Runs a server and bot clients on localhost and reports what happened."""
+    import bot_env
+    loop = asyncio.get_running_loop()
+    server = Server(game.World, len(game.world_maps))
+    # The server gets its own thread and event loop, as a real one would have
+    # its own machine. Sharing a loop with dozens of busy bots starves it: a
+    # datagram socket is read once per loop iteration and drops the rest.
+    server_ready, server_stop, address = threading.Event(), threading.Event(), []
+    async def serve():
+        server_loop = asyncio.get_running_loop()
+        transport, _ = await server_loop.create_datagram_endpoint(lambda: ServerProtocol(server),
+                                                                  local_addr=("127.0.0.1", 0))
+        address.append(transport.get_extra_info("sockname"))
+        server_ready.set()
+        await server.run(server_stop)
+        transport.close()
+    server_thread = threading.Thread(target=asyncio.run, args=(serve(),))
+    server_thread.start()
+    server_ready.wait()
+    stop = asyncio.Event()
+
+    bots, tasks = [], []
+    for i in range(args.sessions * args.clients):
+        client = Client(game.World, 1000 / TICK_RATE, f"session-{i % args.sessions}", game.quiet)
+        link = SimulatedLink(args.latency / 2, args.jitter / 2, args.loss, seed=i)
+        _, protocol = await loop.create_datagram_endpoint(lambda: BotClientProtocol(client, link),
+                                                          remote_addr=address[0])
+        bots.append(protocol)
+        tasks.append(asyncio.create_task(run_bot(protocol, bot_env.ACTIONS, random.Random(i), stop)))
+    await asyncio.sleep(args.seconds)
+    stop.set()
+    await asyncio.gather(*tasks)
+    server_stop.set()
+    server_thread.join()
+
+    stats = server.stats
+    totals = collections.Counter()
+    for protocol in bots:
+        totals.update(protocol.client.stats)
+    clients = len(bots)
+    print(f"{args.sessions} sessions x {args.clients} clients, {args.latency} ms RTT, "
+          f"{args.loss:.0%} loss, {args.seconds} s")
+    print(f"Server: {stats['ticks'] / args.seconds:.1f} ticks/s, "
+          f"{stats['tick_time'] / max(1, stats['ticks']) * 1000:.3f} ms per tick for all sessions")
+    print(f"Downstream: {stats['bytes'] / max(1, stats['packets']):.0f} bytes per snapshot, "
+          f"{stats['bytes'] / clients / args.seconds / 1024:.1f} KiB/s per client "
+          f"({totals['deltas']} deltas, {totals['full']} full, {totals['undecodable']} undecodable, {totals['malformed']} malformed)")
+    print(f"Upstream: {totals['sent_bytes'] / clients / args.seconds / 1024:.1f} KiB/s per client")
+    print(f"Prediction: {totals['corrections']} of {totals['states']} snapshots corrected the local player, "
+          f"mean error {totals['error'] / max(1, totals['states']):.2f} px")
+
+
+def main():
+    """Runs a server, a windowed client or the loopback test."""
+    parser = argparse.ArgumentParser(description="Online multiplayer for the platformer.")
+    modes = parser.add_subparsers(dest="mode", required=True)
+    server_args = modes.add_parser("server", help="run a headless authoritative server")
+    server_args.add_argument("--host", default="0.0.0.0")
+    server_args.add_argument("--port", type=int, default=DEFAULT_PORT)
+    client_args = modes.add_parser("client", help="play on a server")
+    client_args.add_argument("address", help="server HOST:PORT")
+    client_args.add_argument("--session", default="default", help="session to join")
+    test_args = modes.add_parser("loopback", help="run a server and bots over localhost")
+    test_args.add_argument("--sessions", type=int, default=8)
+    test_args.add_argument("--clients", type=int, default=2, help="clients per session")
+    test_args.add_argument("--latency", type=float, default=100, help="simulated round trip in ms")
+    test_args.add_argument("--jitter", type=float, default=20, help="simulated round trip jitter in ms")
+    test_args.add_argument("--loss", type=float, default=0.05, help="fraction of packets dropped each way")
+    test_args.add_argument("--seconds", type=float, default=10)
+    args = parser.parse_args()
+
+    # The server and bots only need the simulation core, which opens no window
+    import platformer
+
+    if args.mode == "client":
+        host, _, port = args.address.rpartition(":")
+        game = platformer.Game()
+        game.start()
+        game.scenes = [platformer.game.NetPlayingScene(game, (host, int(port)), args.session)]
+        game.run()
+        return
+
+    if args.mode == "loopback":
+        asyncio.run(loopback(platformer, args))
+        return
+
+    async def serve():
+        server = Server(platformer.World, len(platformer.world_maps))
+        loop = asyncio.get_running_loop()
+        await loop.create_datagram_endpoint(lambda: ServerProtocol(server), local_addr=(args.host, args.port))
+        print(f"Serving on {args.host}:{args.port}")
+        await server.run()
+    asyncio.run(serve())
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,288 @@
+# =============================================================================
+# Platformer: The Mysterious Path - Particle Effects
+#
+# Sparks and dust for part pickups, hits, jumps and landings. Particles are
+# rows in preallocated NumPy arrays (position, velocity, lifetime, gravity,
+# colour) rather than Python objects, so the pool has a fixed capacity and
+# updating or drawing tens of thousands of them is a handful of array
+# operations. Live particles are kept packed at the front of the arrays:
+# each update moves the survivors into a second, equally sized set of
+# arrays and swaps the two, so nothing is allocated from frame to frame.
+#
+# Particles are drawn as small squares written straight into the pixels of
+# the world's surface. The GPU renderer has no surface to write into, so
+# there they go into a transparent layer that is uploaded once per frame.
+#
+# NumPy is optional: without it create_pool() returns a pool that ignores
+# everything, and the game simply has no effects.
+#
+# Usage (benchmark):
+#   python particles.py
+# =============================================================================
+
+import collections
+import contextlib
+
+import pygame
+
+numpy = None # Imported by the first ParticlePool, so importing this module doesn't load NumPy
+
+DEFAULT_CAPACITY = 65536
+PARTICLE_SIZE = 3 # Side of a particle's square in logical pixels
+
+# Colours particles can have; effects pick from these by index
+PALETTE = (
+    (255, 236, 140), (255, 200, 60), (255, 255, 255), # Sparkle
+    (200, 40, 40), (255, 90, 70), # Hurt
+    (150, 120, 90), (190, 170, 140), (110, 95, 80), # Dust
+)
+
+# `speed` in px/ms, `angle` the (direction, spread) in degrees with 90 up,
+# `life` in ms and `gravity` in px/ms^2
+Effect = collections.namedtuple("Effect", "count colors speed angle life gravity")
+EFFECTS = {
+    "pickup": Effect(48, (0, 1, 2), (0.05, 0.25), (90, 360), (400, 900), 0.0004),
+    "hurt": Effect(32, (3, 4), (0.08, 0.3), (90, 360), (300, 600), 0.0008),
+    "jump": Effect(12, (5, 6, 7), (0.03, 0.12), (90, 140), (200, 400), 0.0006),
+    "land": Effect(20, (5, 6, 7), (0.05, 0.18), (90, 160), (250, 450), 0.0008),
+}
+
+_FIELDS = ("position", "velocity", "life", "gravity", "color")
+
+
+class ParticlePool:
+    """A fixed number of particle slots; emitting into a full pool drops the new particles.
+
+    Positions are in level coordinates and time is in milliseconds.
+    """
+    def __init__(self, capacity=DEFAULT_CAPACITY, seed=None):
+        global numpy
+        import numpy # Effects are optional; see create_pool()
+        self.capacity = capacity
+        self.enabled = True # Off for headless simulation, where nobody sees them
+        self.count = 0 # Live particles, in slots 0..count-1
+        self.dropped = 0 # Particles that didn't fit
+        self.rng = numpy.random.default_rng(seed)
+        self.spare = {}
+        for name in _FIELDS:
+            arrays = [self.new_array(name) for _ in range(2)]
+            setattr(self, name, arrays[0])
+            self.spare[name] = arrays[1]
+        # Scratch space for update() and draw()
+        self.step = numpy.zeros((capacity, 2), numpy.float32)
+        self.scratch = numpy.zeros(capacity, numpy.float32)
+        self.alive = numpy.zeros(capacity, bool)
+        self.inside = numpy.zeros(capacity, bool)
+        self.screen = numpy.zeros((capacity, 2), numpy.int32)
+        self.picked = numpy.zeros((capacity, 2), numpy.int32)
+        self.offset = numpy.zeros((capacity, 2), numpy.int32)
+        self.picked_colors = numpy.zeros(capacity, numpy.uint8)
+        self.pixels = numpy.zeros(capacity, numpy.uint32)
+        self.mapped = numpy.zeros(len(PALETTE), numpy.uint32) # PALETTE in the target's pixel format
+        self.layer = None # Drawn into for the GPU renderer
+        self.layer_dirty = None # Area of the layer drawn into last frame
+
+    def new_array(self, name):
+        """A zeroed array with a slot for every particle."""
+        if name in ("position", "velocity"):
+            return numpy.zeros((self.capacity, 2), numpy.float32)
+        if name == "color":
+            return numpy.zeros(self.capacity, numpy.uint8) # Index into PALETTE
+        return numpy.zeros(self.capacity, numpy.float32)
+
+    @contextlib.contextmanager
+    def muted(self):
+        """Drops effects emitted inside the with-block, e.g. while re-simulating."""
+        enabled, self.enabled = self.enabled, False
+        try:
+            yield
+        finally:
+            self.enabled = enabled
+
+    def emit(self, name, x, y):
+        """Starts one of the EFFECTS at level position (x, y)."""
+        if not self.enabled:
+            return
+        effect = EFFECTS[name]
+        start = self.count
+        n = min(effect.count, self.capacity - start)
+        self.dropped += effect.count - n
+        if n <= 0:
+            return
+        end, rng = start + n, self.rng
+        direction, spread = effect.angle
+        angle = numpy.radians(rng.uniform(direction - spread / 2, direction + spread / 2, n))
+        speed = rng.uniform(*effect.speed, n)
+        self.position[start:end] = (x, y)
+        self.velocity[start:end, 0] = numpy.cos(angle) * speed
+        self.velocity[start:end, 1] = -numpy.sin(angle) * speed # Screen y points down
+        self.life[start:end] = rng.uniform(*effect.life, n)
+        self.gravity[start:end] = effect.gravity
+        self.color[start:end] = rng.choice(effect.colors, n)
+        self.count = end
+
+    def clear(self):
+        """Removes every particle, e.g. when a level starts."""
+        self.count = 0
+
+    def update(self, dt):
+        """Moves every particle on by `dt` ms and drops the ones that have burnt out."""
+        n = self.count
+        if not n:
+            return
+        life, velocity, position = self.life[:n], self.velocity[:n], self.position[:n]
+        numpy.subtract(life, dt, out=life)
+        numpy.multiply(self.gravity[:n], dt, out=self.scratch[:n])
+        numpy.add(velocity[:, 1], self.scratch[:n], out=velocity[:, 1])
+        numpy.multiply(velocity, dt, out=self.step[:n])
+        numpy.add(position, self.step[:n], out=position)
+
+        alive = numpy.greater(life, 0, out=self.alive[:n])
+        live = int(numpy.count_nonzero(alive))
+        if live == n:
+            return
+        # Pack the survivors into the spare arrays, which become the live ones
+        for name in _FIELDS:
+            array, spare = getattr(self, name), self.spare[name]
+            numpy.compress(alive, array[:n], axis=0, out=spare[:live])
+            setattr(self, name, spare)
+            self.spare[name] = array
+        self.count = live
+
+    def draw(self, view, scroll):
+        """Draws the particles into a render.WorldView as seen from `scroll`."""
+        n = self.count
+        if not n and not self.layer_dirty:
+            return
+        target = view.target
+        if isinstance(target, pygame.Surface): # The view's low-resolution surface
+            self.draw_pixels(target, view.pixel_scale, scroll, view)
+        elif target.surface is not None:
+            self.draw_pixels(target.surface, 1, scroll, view)
+        else:
+            # The GPU renderer scales the layer to the viewport itself
+            if self.layer is None or self.layer.get_size() != view.logical_size:
+                self.layer = pygame.Surface(view.logical_size, pygame.SRCALPHA)
+            if self.layer_dirty:
+                self.layer.fill((0, 0, 0, 0), self.layer_dirty)
+            self.layer_dirty = self.draw_pixels(self.layer, 1, scroll, view)
+            target.blit_changing(self.layer, (0, 0))
+
+    def draw_pixels(self, surface, scale, scroll, view):
+        """Writes the visible particles into the surface's pixels.
+
+        Returns the rectangle drawn into, or None if nothing was visible.
+        """
+        n = self.count
+        size = max(1, round(PARTICLE_SIZE * scale))
+        screen = self.screen[:n]
+        # Level to surface pixels; the squares are centred on the particles
+        numpy.subtract(self.position[:n], (scroll + PARTICLE_SIZE / 2, PARTICLE_SIZE / 2), out=self.step[:n])
+        numpy.multiply(self.step[:n], scale, out=self.step[:n])
+        numpy.floor(self.step[:n], out=self.step[:n])
+        numpy.copyto(screen, self.step[:n], casting="unsafe")
+
+        # Only squares that fit entirely on the surface are drawn
+        shown, inside = self.alive[:n], self.inside[:n]
+        numpy.greater_equal(screen[:, 0], 0, out=shown)
+        numpy.greater_equal(screen[:, 1], 0, out=inside)
+        shown &= inside
+        for axis, limit in enumerate(surface.get_size()):
+            numpy.less_equal(screen[:, axis], limit - size, out=inside)
+            shown &= inside
+        visible = int(numpy.count_nonzero(shown))
+        if not visible:
+            return None
+        picked, colors, pixels = self.picked[:visible], self.picked_colors[:visible], self.pixels[:visible]
+        numpy.compress(shown, screen, axis=0, out=picked)
+        numpy.compress(shown, self.color[:n], out=colors)
+        for i, color in enumerate(PALETTE):
+            self.mapped[i] = surface.map_rgb(color) & 0xFFFFFFFF # Signed for some formats
+        numpy.take(self.mapped, colors, out=pixels)
+
+        offset = self.offset[:visible]
+        target = pygame.surfarray.pixels2d(surface)
+        try:
+            for dx in range(size):
+                numpy.add(picked[:, 0], dx, out=offset[:, 0])
+                for dy in range(size):
+                    numpy.add(picked[:, 1], dy, out=offset[:, 1])
+                    target[offset[:, 0], offset[:, 1]] = pixels
+        finally:
+            del target # Unlocks the surface
+        view.calls += 1
+        view.sprites += visible
+        if surface is not self.layer:
+            return None
+        left, top = picked.min(axis=0)
+        right, bottom = picked.max(axis=0)
+        return pygame.Rect(int(left), int(top), int(right - left) + size, int(bottom - top) + size)
+
+
+class NoParticles:
+    """Stands in for the pool when NumPy is missing; every method does nothing."""
+    enabled = False
+    count = 0
+    dropped = 0
+
+    @contextlib.contextmanager
+    def muted(self):
+        yield
+
+    def emit(self, name, x, y): pass
+    def clear(self): pass
+    def update(self, dt): pass
+    def draw(self, view, scroll): pass
+
+
+def create_pool(capacity=DEFAULT_CAPACITY):
+    """Returns a ParticlePool, or a NoParticles if NumPy isn't installed."""
+    try:
+        return ParticlePool(capacity)
+    except ImportError:
+        print("NumPy not found, particle effects are off")
+        return NoParticles()
+
+
+def main():
+    """Measures update and draw time with the pool full of particles."""
+    import os
+    import time
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    import platformer
+    import render
+
+    platformer.Game().start() # Opens the window
+    view = render.WorldView((platformer.SCREEN_WIDTH, platformer.SCREEN_HEIGHT))
+    pool = ParticlePool(seed=0)
+    frames = 300
+    for live in (1000, 10000, 50000):
+        pool.clear()
+        while pool.count < live:
+            pool.emit("pickup", pool.rng.uniform(0, platformer.SCREEN_WIDTH), pool.rng.uniform(0, platformer.SCREEN_HEIGHT))
+        pool.life[:pool.count] = 1e9 # Keep them all alive for the measurement
+        update_time = draw_time = 0.0
+        for _ in range(frames):
+            start = time.perf_counter()
+            pool.update(1000 / platformer.FPS)
+            update_time += time.perf_counter() - start
+            view.begin(platformer.game.renderer)
+            start = time.perf_counter()
+            pool.draw(view, 0)
+            draw_time += time.perf_counter() - start
+        print(f"{pool.count} particles: update {update_time / frames * 1000:.3f} ms, "
+              f"draw {draw_time / frames * 1000:.3f} ms")
+
+    # Bursts coming and going, as in play
+    pool.clear()
+    start = time.perf_counter()
+    for frame in range(frames):
+        for _ in range(20):
+            pool.emit("land", pool.rng.uniform(0, platformer.SCREEN_WIDTH), platformer.SCREEN_HEIGHT / 2)
+        pool.update(1000 / platformer.FPS)
+    print(f"Bursts: {pool.count} live at the end, "
+          f"{(time.perf_counter() - start) / frames * 1000:.3f} ms per frame to emit and update")
+
+if __name__ == "__main__":
+    main()
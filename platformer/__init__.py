@@ -0,0 +1,34 @@
+# =============================================================================
+# Platformer: The Mysterious Path
+#
+# Author: The Benn/BMKoscak
+# Version: 1.0.0
+#
+# A simple platformer game built with Pygame.
+# The player must navigate through levels, collect parts, avoid enemies,
+# and reach the goal to repair their plane.
+#
+# The package is split so that importing it is cheap and does nothing:
+#   core    the level simulation (maps, player, enemies, World), imported here
+#   assets  images, sounds and fonts, loaded on demand by Game.start()
+#   game    the window, scenes and main loop; imported the first time
+#           platformer.game, Game or main is used
+#
+# Usage:
+#   python -m platformer                # Play
+#   python -m platformer --diagnostics  # Play, printing memory statistics (see diagnostics.py)
+# =============================================================================
+
+import importlib
+
+from .core import (FPS, SCREEN_HEIGHT, SCREEN_WIDTH, TILE_SIZE, Enemy, Part, Player, World,
+                   parse_map, quiet, reset_game_state, update_playing, world_maps)
+
+# Name -> submodule it comes from, imported on first use
+_LAZY = {"assets": None, "game": None, "Game": "game", "main": "game"}
+
+def __getattr__(name):
+    if name not in _LAZY:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module = importlib.import_module(f".{_LAZY[name] or name}", __name__)
+    return getattr(module, name) if _LAZY[name] else module
@@ -0,0 +1,146 @@
+# =============================================================================
+# Platformer: The Mysterious Path - Assets
+#
+# Every image, sound, font and animation clip the game draws or plays. They
+# are loaded by load(), which Game.start() calls once the window is open
+# (images are converted to the display's pixel format as they load), so
+# importing this module does nothing; until then the names below are None.
+#
+# Images come from the pre-decoded bundle or the sprite atlas when those
+# have been built (see bundle.py and atlas.py), otherwise from the files.
+# =============================================================================
+
+import functools
+
+import pygame
+
+import animation
+import atlas
+import autotile
+import bundle
+
+from . import core
+
+# Pre-decoded images and sounds, if the bundle has been built (see bundle.py)
+asset_bundle = None
+# Every image the game loads is recorded here (atlas key -> loader args) so
+# the offline atlas packer and bundle builder know what to pack; see atlas.py.
+sprite_manifest = {}
+sprite_atlas = None
+# Every sound the game loads is recorded here so bundle.py knows what to bake
+sound_manifest = []
+
+# --- Loaded by load() ---
+terrain_variants = None # A tile image per neighbour mask (see autotile.py)
+bg_images = None # Parallax background layers, back to front
+goal_image = life_image = intro_bg = None
+part_images = None # core.PART_VARIANTS of them
+player_clips = enemy_clips = None # Name -> animation.Clip
+hurt_sound = parts_sound = jump_sound = ambiance_sound = walk_sound = None
+font = large_font = title_font = None
+
+# --- Load Sound Effects ---
+class DummySound:
+    """Stands in for a sound that failed to load so the game doesn't crash."""
+    def play(self): pass
+
+def load_sound(path):
+    """Loads a sound effect, falling back to a silent dummy if it is missing."""
+    sound_manifest.append(path)
+    sound = asset_bundle and asset_bundle.sound(path)
+    if sound:
+        return sound
+    try:
+        return pygame.mixer.Sound(path)
+    except (pygame.error, FileNotFoundError) as e:
+        print(f"Error loading sound {path}: {e}")
+        return DummySound()
+
+# --- Load Image Assets ---
+# Consecutive frames cut from the same spritesheet share a single decode
+@functools.lru_cache(maxsize=1)
+def decode_image(path, alpha=True):
+    """Decodes an image file and converts it for fast blitting."""
+    image = pygame.image.load(path)
+    return image.convert_alpha() if alpha else image.convert()
+
+def load_image_file(path, size, area=None, alpha=True):
+    """Loads an image from disk and scales it.
+
+    `size` is either a (width, height) tuple or an integer scale factor, and
+    `area` optionally selects a single frame from a spritesheet.
+    """
+    image = decode_image(path, alpha)
+    if area:
+        image = image.subsurface(area)
+    if isinstance(size, int):
+        size = (image.get_width() * size, image.get_height() * size)
+    return pygame.transform.scale(image, size)
+
+# Using a function to load and scale images can reduce code repetition.
+def load_and_scale_image(path, size, area=None, alpha=True):
+    """Loads an image at its in-game size, from the bundle or atlas if built."""
+    key = atlas.sprite_key(path, size, area)
+    sprite_manifest[key] = (path, size, area, alpha)
+    image = (asset_bundle and asset_bundle.image(key)) or (sprite_atlas and sprite_atlas.get(key))
+    if image:
+        return image
+    try:
+        return load_image_file(path, size, area, alpha)
+    except (pygame.error, FileNotFoundError) as e:
+        print(f"Error loading image {path}: {e}")
+        # Return a placeholder surface if the image is missing
+        if isinstance(size, int):
+            size = (area[2] * size, area[3] * size) if area else (core.TILE_SIZE, core.TILE_SIZE)
+        placeholder = pygame.Surface(size)
+        placeholder.fill((255, 0, 255)) # Use a bright color to easily spot missing assets
+        return placeholder
+
+def load():
+    """Loads every asset; needs the display mode set and the mixer started."""
+    global asset_bundle, sprite_atlas, terrain_variants, bg_images, goal_image, life_image, intro_bg
+    global part_images, player_clips, enemy_clips, font, large_font, title_font
+    global hurt_sound, parts_sound, jump_sound, ambiance_sound, walk_sound
+    tile_size, screen_size = core.TILE_SIZE, (core.SCREEN_WIDTH, core.SCREEN_HEIGHT)
+    asset_bundle = bundle.load_bundle()
+    sprite_atlas = atlas.load_atlas()
+
+    hurt_sound = load_sound("assets/sounds/hurt.wav")
+    parts_sound = load_sound("assets/sounds/parts.wav")
+    jump_sound = load_sound("assets/sounds/jump.wav")
+    ambiance_sound = load_sound("assets/sounds/Ambiance_Wind_Calm_Loop_Stereo.wav")
+    walk_sound = load_sound("assets/sounds/walk.wav")
+
+    # Load terrain tileset, at its own resolution, and make a variant of the tile
+    # for every combination of solid neighbours (see autotile.py)
+    terrain_variants = autotile.make_variants(load_and_scale_image("assets/terrain/tilesets.png", 1),
+                                              (tile_size, tile_size))
+
+    # Load parallax background images
+    bg_images = [load_and_scale_image(f"assets/background/plx-{i}.png", screen_size) for i in range(1, 6)]
+
+    # Load other game assets
+    goal_image = load_and_scale_image("assets/goal/checkpoint.png", (int(tile_size * 1.5), int(tile_size * 1.5)))
+    life_image = load_and_scale_image("assets/life/life.png", (tile_size // 2, tile_size // 2))
+    part_images = [load_and_scale_image(f"assets/parts/part_{i}.png", (tile_size, tile_size))
+                   for i in range(1, core.PART_VARIANTS + 1)]
+    player_clips = animation.load_clips("player", load_and_scale_image)
+    enemy_clips = animation.load_clips("enemy", load_and_scale_image)
+
+    # --- Intro Screen Assets ---
+    intro_bg = load_and_scale_image("assets/intro/intro-bg.jpg", screen_size, alpha=False)
+
+    # --- Font Initialization ---
+    pygame.font.init()
+    # Using a single font file path variable makes it easy to change fonts later
+    try:
+        font_path = "assets/fonts/PixelifySans-Regular.ttf"
+        bold_font_path = "assets/fonts/PixelifySans-Bold.ttf"
+        font = pygame.font.Font(font_path, 36)
+        large_font = pygame.font.Font(font_path, 72)
+        title_font = pygame.font.Font(bold_font_path, 72)
+    except FileNotFoundError:
+        print("Font files not found, using default Pygame font.")
+        font = pygame.font.Font(None, 36)
+        large_font = pygame.font.Font(None, 72)
+        title_font = pygame.font.Font(None, 80)
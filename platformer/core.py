@@ -0,0 +1,604 @@
+# =============================================================================
+# Platformer: The Mysterious Path - Simulation Core
+#
+# The level simulation on its own: the maps, the player, enemies and parts,
+# and the World that steps them. Importing it opens no window, starts no
+# audio and loads no assets, so tools, bots and servers can use it cheaply.
+# Entities hold no images; what they look like is looked up in `assets`
+# only when they are drawn.
+#
+# The simulation triggers sounds and effects through `audio_manager` and
+# `particle_pool`, and logs hits, falls, pickups and where the players are
+# to `event_log`. All three do nothing until Game.start() puts the real ones in (see game.py),
+# so headless runs need no setup to stay silent. Game.start() likewise
+# puts the loaded assets module (see assets.py) in `assets`; until then
+# every sound is None, which audio ignores.
+# =============================================================================
+
+import contextlib
+import math
+import random
+
+import pygame
+
+import activity
+import animation
+import audio
+import autotile
+import controls
+import particles
+import snapshot
+import telemetry
+
+# --- Game Constants ---
+SCREEN_WIDTH, SCREEN_HEIGHT = 1280, 720
+TILE_SIZE = 64
+FPS = 60
+# Enemies and parts further than this from every player aren't simulated
+# (see activity.py); a screen and a bit, so everything on screen is awake
+WAKE_DISTANCE = SCREEN_WIDTH + 2 * TILE_SIZE
+PART_VARIANTS = 4 # Images a part may be drawn with, picked at random
+
+# --- Player Movement ---
+# levelgen.py checks every jump in a generated level against these
+PLAYER_WIDTH = int(TILE_SIZE * 0.8) # Hitbox slightly narrower than a tile
+PLAYER_SPEED = 7
+JUMP_STRENGTH = 22
+GRAVITY = 1.0
+MAX_FALL_SPEED = 18
+
+# --- Effects ---
+class NoAssets:
+    """Stands in for the assets module until the game loads it: every asset is None."""
+    def __getattr__(self, name):
+        return None
+
+# Sounds and sparks the simulation sets off, and the gameplay events it
+# logs; silent stand-ins until the game starts
+audio_manager = audio.NoAudio()
+particle_pool = particles.NoParticles()
+event_log = telemetry.NoTelemetry()
+assets = NoAssets() # The assets module (see assets.py), once Game.start() has loaded it
+LANDING_DUST_SPEED = 8 # Falling at least this fast kicks up dust on landing
+POSITION_SAMPLE_MS = 250 # World time between logged player positions (see heatmap.py)
+FOOTSTEP_INTERVAL = 300 # ms between a walking player's footsteps
+
+@contextlib.contextmanager
+def quiet():
+    """Silences sounds, effects and telemetry inside the with-block, e.g. while re-simulating."""
+    with audio_manager.muted(), particle_pool.muted(), event_log.muted():
+        yield
+
+# --- World Maps ---
+# 'P' = Player Start, 'X' = Tile, 'E' = Enemy (on platform above), 's' = Part
+# 'G' = Goal, 't' = Trap, 'N' = No enemy spawn zone above this point
+world_map_1 = [
+    '                                                                                                                                    ',
+    '                                                                                                                                    ',
+    '                                                                                                                                    ',
+    '                                                                                                                                    ',
+    '                                                                                                                                    ',
+    '                     s                                                                                                              ',
+    '               NNNN   XXXXXX                                                                                                        ',
+    '               XXXX                               s                                     s                                           ',
+    '                     XXXXX                                XXXXXXX                                     XXXXXXXXXXXXX                   ',
+    'P                                             E                                   XXXX       E                                     ',
+    '                                                                       E                                                    G       ',
+    'XXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXX',
+]
+
+world_map_2 = [
+    '                                                                                                                                    ',
+    '                                                                                                                                    ',
+    '                                                                                                                                    ',
+    '                           s                                                 s                                                      ',
+    '                     N    XXXXXXX                                          XXXXXXX                                                   ',
+    '                   XXXXXX                                           N    XXXXXX                                                     ',
+    '             N   XXXXX                   E                    N    XXXXX                                                           ',
+    '           XXXX           E                                  XXXXXX             E            s                                     ',
+    '     XXXXXX     X                                      XXXXXXX                                 XXXXXXXXXXXXXXX                       ',
+    'P       E     XX    X                         E     X                                    XX  XX                E                    ',
+    '             XXX     X                               XX                     E                                             G         ',
+    'XXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXX',
+]
+
+world_map_3 = [
+    '                                                                                                                                    ',
+    '                                                                                                                                    ',
+    '                                 s                                                                                                  ',
+    '                           N    XXXXXXX   N                                          s                                               ',
+    '                     N   XXXX        XXXX                                     N   XXXXXXX                                           ',
+    '                   XXXX              XXXX   N                             XXXX                                                      ',
+    '             N    XXXX       E              XXXX   N      N  XXXX       E                                                          ',
+    '           XXXXXX           E                      XXXX    XXXX                  s                                                 ',
+    '     XXXXXX   X                                            XXXX           E     XXXXXXXXXXXXX                                     ',
+    'P       E     XX      X                         E                                              E                                  ',
+    '             XXX       X                                         E                                                      G         ',
+    'XXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXX',
+]
+
+# List of all level maps for easy access
+world_maps = [world_map_1, world_map_2, world_map_3]
+
+class Enemy:
+    """Represents a moving enemy that patrols a platform."""
+    def __init__(self, x, y, platform_width):
+        # The enemy's visual size is larger than its hitbox for better aesthetics
+        self.rect = pygame.Rect(x, y, TILE_SIZE * 1.5, TILE_SIZE * 1.5)
+        self.direction = 1  # 1 for right, -1 for left
+        self.speed = 2
+        self.platform_width = platform_width
+        self.start_x = x
+        # Offsets the animation by where the enemy started, so neighbours don't run in step
+        self.phase = x
+
+    def move(self):
+        """Moves the enemy and reverses its direction at platform edges."""
+        self.rect.x += self.speed * self.direction
+        if self.rect.left <= self.start_x or self.rect.right >= self.start_x + self.platform_width:
+            self.direction *= -1
+
+    def advance(self, ticks):
+        """Moves the enemy to where `ticks` calls to move() would leave it, in one step.
+
+        The patrol is a cycle: `steps` moves out to the far edge of the
+        platform, then `steps` back to the start.
+        """
+        steps = max(1, math.ceil((self.platform_width - self.rect.width) / self.speed))
+        moved = (self.rect.x - self.start_x) // self.speed
+        phase = ((moved if self.direction == 1 else 2 * steps - moved) + ticks) % (2 * steps)
+        if phase < steps:
+            self.rect.x, self.direction = self.start_x + phase * self.speed, 1
+        else:
+            self.rect.x, self.direction = self.start_x + (2 * steps - phase) * self.speed, -1
+
+    def sprite(self, scroll_x, clock):
+        """Returns the (image, position) to draw at world time `clock` (ms)."""
+        # Use the mirrored frames based on the direction the enemy is facing
+        image = assets.enemy_clips["run"].frame(clock + self.phase, self.direction == 1)
+        # Adjust vertical position to align enemy's feet with the platform
+        return image, (self.rect.x - scroll_x, self.rect.y + TILE_SIZE - image.get_height())
+
+    def draw(self, surface, scroll_x, clock):
+        """Draws the enemy."""
+        surface.blit(*self.sprite(scroll_x, clock))
+
+class Part:
+    """Represents a collectible part that the player needs to find."""
+    def __init__(self, x, y):
+        self.rect = pygame.Rect(x, y, TILE_SIZE, TILE_SIZE)
+        self.variant = random.randrange(PART_VARIANTS) # Which of assets.part_images it's drawn with
+        self.float_range = 5
+        self.float_period = 700 # ms to float up and down once
+        # Offset by position, so parts don't all bob in step
+        self.phase = -x
+
+    def float_offset(self, clock):
+        """How far the part has floated from its place at world time `clock` (ms)."""
+        return self.float_range * animation.ping_pong(clock + self.phase, self.float_period)
+
+    def sprite(self, scroll_x, clock):
+        """Returns the (image, position) to draw at world time `clock` (ms)."""
+        return assets.part_images[self.variant], (self.rect.x - scroll_x, self.rect.y + self.float_offset(clock))
+
+    def draw(self, surface, scroll_x, clock):
+        """Draws the part on the screen."""
+        surface.blit(*self.sprite(scroll_x, clock))
+
+class Player:
+    """Represents the player character."""
+    def __init__(self, x, y):
+        # Physics and state variables
+        self.rect = pygame.Rect(x, y, PLAYER_WIDTH, TILE_SIZE)
+        self.velocity = [0, 0]
+        self.on_ground = False
+        self.lives = 3
+        self.collected_parts = 0
+        self.spawn_point = (x, y)
+
+        # Player attributes
+        self.speed = PLAYER_SPEED
+        self.jump_strength = JUMP_STRENGTH
+        self.gravity = GRAVITY
+        self.max_fall_speed = MAX_FALL_SPEED
+
+        # Invulnerability state after taking damage
+        self.invulnerable = False
+        self.invulnerable_duration = 2000 # in milliseconds
+        self.invulnerable_timer = 0
+
+        # Animation state machine; the frame shown follows from the world
+        # clock and when the current state began
+        self.state = "idle"
+        self.state_time = 0 # World time (ms) the state began
+        self.facing_right = True
+        self.hurt_timer = 0
+        self.step_timer = 0 # ms until the next footstep sound while walking
+
+    def set_state(self, clock):
+        """Determines the player's animation state based on their actions, at world time `clock` (ms)."""
+        # Hurt state takes priority
+        if self.hurt_timer > 0:
+            new_state = "hurt"
+        # Then check for aerial states
+        elif not self.on_ground:
+            new_state = "jump" if self.velocity[1] < 0 else "fall"
+        # Then ground states
+        else:
+            new_state = "walk" if abs(self.velocity[0]) > 0 else "idle"
+
+        # If the state has changed, start its animation from the first frame
+        if new_state != self.state:
+            self.state = new_state
+            self.state_time = clock
+
+    def sprite(self, scroll, clock):
+        """Returns the (image, position) to draw at world time `clock` (ms), or None while blinking."""
+        # Frames are pre-scaled; use the mirrored set if facing left
+        scaled_image = assets.player_clips[self.state].frame(clock - self.state_time, not self.facing_right)
+
+        # Center the scaled image over the player's hitbox
+        x = self.rect.x - scroll - (scaled_image.get_width() - self.rect.width) // 2
+        y = self.rect.bottom - scaled_image.get_height()
+
+        # Make player semi-transparent when invulnerable for visual feedback
+        if self.invulnerable and (clock // 100) % 2 == 0:
+            # This creates a blinking effect
+            return None # Don't draw the player to make them "blink"
+        return scaled_image, (x, y)
+
+    def draw(self, surface, scroll, clock):
+        """Draws the player on the screen."""
+        sprite = self.sprite(scroll, clock)
+        if sprite:
+            surface.blit(*sprite)
+
+
+    def move(self, actions, tiles):
+        """Moves the player according to this tick's controls.ActionState."""
+        # --- Horizontal Movement ---
+        # move_x is -1..1; analog sticks give values in between
+        dx = self.speed * actions.move_x
+        if dx != 0: # Only change direction if there's movement
+            self.facing_right = dx > 0
+
+        self.velocity[0] = dx
+
+        # --- Vertical Movement (Jumping) ---
+        if actions.held & controls.JUMP and self.on_ground:
+            self.velocity[1] = -self.jump_strength
+            self.on_ground = False
+            audio_manager.play(assets.jump_sound)
+            particle_pool.emit("jump", self.rect.centerx, self.rect.bottom)
+
+        # --- Apply Gravity ---
+        self.velocity[1] += self.gravity
+        # Clamp falling speed to prevent excessive velocity
+        if self.velocity[1] > self.max_fall_speed:
+            self.velocity[1] = self.max_fall_speed
+
+        dy = self.velocity[1]
+
+        # --- Collision Handling ---
+        self.handle_collision(tiles, self.velocity[0], dy)
+        self.check_on_ground(tiles)
+        if self.on_ground and dy >= LANDING_DUST_SPEED:
+            particle_pool.emit("land", self.rect.centerx, self.rect.bottom)
+
+    def handle_collision(self, tiles, dx, dy):
+        """Handles collision with solid tiles."""
+        # Move horizontally and check for collisions
+        self.rect.x += dx
+        for tile in tiles:
+            if self.rect.colliderect(tile['rect']):
+                if dx > 0: # Moving right
+                    self.rect.right = tile['rect'].left
+                elif dx < 0: # Moving left
+                    self.rect.left = tile['rect'].right
+
+        # Move vertically and check for collisions
+        self.rect.y += dy
+        for tile in tiles:
+            if self.rect.colliderect(tile['rect']):
+                if dy > 0: # Moving down
+                    self.rect.bottom = tile['rect'].top
+                    self.velocity[1] = 0
+                    self.on_ground = True
+                elif dy < 0: # Moving up
+                    self.rect.top = tile['rect'].bottom
+                    self.velocity[1] = 0
+
+    def check_on_ground(self, tiles):
+        """Checks if the player is standing on a solid tile."""
+        # Temporarily move the player down 1 pixel to check for ground
+        self.rect.y += 1
+        on_ground = False
+        for tile in tiles:
+            if self.rect.colliderect(tile['rect']):
+                on_ground = True
+                break
+        self.rect.y -= 1
+        self.on_ground = on_ground
+
+    def update_timers(self, dt):
+        """Updates all time-based states for the player."""
+        if self.invulnerable:
+            self.invulnerable_timer -= dt
+            if self.invulnerable_timer <= 0:
+                self.invulnerable = False
+        
+        if self.hurt_timer > 0:
+            self.hurt_timer = max(0, self.hurt_timer - dt)
+
+    def respawn(self):
+        """Resets the player to their spawn point after losing a life."""
+        self.rect.topleft = self.spawn_point
+        self.velocity = [0, 0]
+        self.invulnerable = True
+        self.invulnerable_timer = self.invulnerable_duration
+
+    def take_damage(self):
+        """Handles the logic for when the player takes damage."""
+        if not self.invulnerable:
+            self.lives -= 1
+            self.invulnerable = True
+            self.invulnerable_timer = self.invulnerable_duration
+            self.hurt_timer = 300 # Duration of the hurt animation
+            audio_manager.play(assets.hurt_sound)
+            particle_pool.emit("hurt", *self.rect.center)
+            event_log.event("damage", lives=self.lives, x=self.rect.centerx, y=self.rect.centery)
+            if self.lives <= 0:
+                return "game_over"
+        return "none"
+
+# --- Game Functions ---
+
+def parse_map(world_map):
+    """Parses the string-based map into lists of game objects.
+
+    Each tile is a dict of its 'rect' and its 'variant', the neighbour mask
+    that picks its image from assets.terrain_variants.
+    """
+    tiles, traps, parts, enemies = [], [], [], []
+    goal = None
+    # Which neighbours of each tile are solid picks its variant
+    masks = autotile.tile_masks(world_map)
+
+    for row_index, row in enumerate(world_map):
+        platform_start = None
+        for col_index, char in enumerate(row):
+            x = col_index * TILE_SIZE
+            y = SCREEN_HEIGHT - (len(world_map) - row_index) * TILE_SIZE
+            
+            if char == 'X':
+                tiles.append({'rect': pygame.Rect(x, y, TILE_SIZE, TILE_SIZE), 'variant': masks[row_index][col_index]})
+                if platform_start is None:
+                    platform_start = col_index
+            elif char != 'X' and platform_start is not None:
+                # End of a platform, check if an enemy should spawn
+                platform_end = col_index
+                platform_width_tiles = platform_end - platform_start
+                
+                # Check for 'N' (no-spawn) marker in the row above
+                no_spawn = False
+                if row_index > 0 and platform_width_tiles >= 4:
+                    for i in range(platform_start, platform_end):
+                        if world_map[row_index - 1][i] == 'N':
+                            no_spawn = True
+                            break
+                
+                if not no_spawn and platform_width_tiles >= 4:
+                    enemy_x = platform_start * TILE_SIZE
+                    enemy_y = y - TILE_SIZE
+                    enemies.append(Enemy(enemy_x, enemy_y, platform_width_tiles * TILE_SIZE))
+
+                platform_start = None
+
+            elif char == 't':
+                traps.append(pygame.Rect(x, y, TILE_SIZE, TILE_SIZE))
+            elif char == 's':
+                parts.append(Part(x, y))
+            elif char == 'G':
+                goal = pygame.Rect(x, y, TILE_SIZE, TILE_SIZE)
+            elif char == 'P':
+                player_start_pos = (x, y)
+
+    return tiles, traps, parts, goal, enemies, player_start_pos
+
+def update_playing(players, tiles, enemies, parts, actions, dt, collected=None, fallen=None):
+    """Advances the level simulation by one tick.
+
+    `actions` holds each player's controls.ActionState for the tick. All
+    players share the level's tiles, enemies and parts. This holds no
+    references to the display or input devices, so it can also be driven
+    headlessly (see bot_env.py). Returns "game_over" once a player has run
+    out of lives, "respawned" if one fell out of the world and was sent back
+    to the spawn point (World.respawn_at_checkpoint() then puts them back at
+    the last checkpoint instead), otherwise "none". Parts that are picked up
+    are removed from `parts` and added to `collected`, and players who fell
+    are added to `fallen`, if given.
+    """
+    result = "none"
+    for player, player_actions in zip(players, actions):
+        player.move(player_actions, tiles)
+        player.update_timers(dt)
+        if player.on_ground and player.velocity[0] != 0:
+            player.step_timer -= dt
+            if player.step_timer <= 0:
+                player.step_timer = FOOTSTEP_INTERVAL
+                audio_manager.play(assets.walk_sound, "footsteps")
+        else:
+            player.step_timer = 0 # The first step sounds as soon as they start walking
+
+    for enemy in enemies:
+        enemy.move()
+
+    # --- Handle Collisions and Events ---
+    for player in players:
+        # Check for falling out of the world
+        if player.rect.top > SCREEN_HEIGHT:
+            player.lives -= 1
+            event_log.event("fall", lives=player.lives, x=player.rect.centerx)
+            if player.lives > 0:
+                player.respawn()
+                if fallen is not None:
+                    fallen.append(player)
+                if result != "game_over":
+                    result = "respawned"
+            else:
+                result = "game_over"
+
+        # Check for collision with enemies
+        for enemy in enemies:
+            if player.rect.colliderect(enemy.rect):
+                if player.take_damage() == "game_over":
+                    result = "game_over"
+
+        # Check for collision with parts, without copying the list to remove from it
+        index = player.rect.collidelist(parts)
+        while index != -1:
+            part_obj = parts.pop(index)
+            player.collected_parts += 1
+            audio_manager.play(assets.parts_sound)
+            particle_pool.emit("pickup", *part_obj.rect.center)
+            event_log.event("part_pickup", parts=player.collected_parts, x=part_obj.rect.centerx,
+                            y=part_obj.rect.centery)
+            if collected is not None:
+                collected.append(part_obj)
+            index = player.rect.collidelist(parts)
+
+    return result
+
+def reset_game_state(level_index):
+    """Resets the game to the start of a specific level."""
+    tiles, traps, parts, goal, enemies, player_pos = parse_map(world_maps[level_index])
+    player = Player(player_pos[0], player_pos[1])
+    return player, tiles, traps, parts, goal, enemies
+
+class World:
+    """The simulated state of one level: the player and the level's objects.
+
+    `all_parts` keeps every part the level started with, so snapshots can
+    restore collected parts without rebuilding the level. Local players
+    share one world; `player` is the first of `players`.
+
+    `time` is the world clock in milliseconds, which animations are
+    evaluated from (see animation.py); it only advances while the world is
+    simulated.
+
+    Only enemies and parts near a player are simulated (see activity.py).
+    Sleeping ones are out of date until sync() is called, so anything
+    reading every enemy's position should call it first; snapshot.save()
+    does.
+
+    A checkpoint snapshot is taken when the level starts and whenever a
+    part is picked up. When update() reports "respawned", whatever drives
+    the world calls respawn_at_checkpoint(). That puts the players who fell
+    back where they were at the checkpoint, and when nobody else is still
+    playing (always, alone) rewinds the enemies and the rest of the world
+    too. Other players are never moved by someone else's fall.
+    """
+    def __init__(self, level_index, state=None, players=1):
+        self.player_count = players
+        self.load(level_index, state)
+
+    def load(self, level_index, state=None):
+        """Starts the level, from a prepared reset_game_state() result if given."""
+        self.level_index = level_index
+        self.player, self.tiles, self.traps, self.parts, self.goal, self.enemies = state or reset_game_state(level_index)
+        # The other players start at the same spawn point
+        self.players = [self.player] + [Player(*self.player.spawn_point) for _ in range(self.player_count - 1)]
+        self.all_parts = list(self.parts)
+        self.width = len(world_maps[level_index][0]) * TILE_SIZE
+        self.ticks = 0
+        self.time = 0.0
+        self.collected = [] # Parts picked up this tick; reused every tick
+        self.fallen = [] # Players who fell out of the world this tick; reused every tick
+        self.enemy_activity = activity.ActivitySet(
+            self.enemies, lambda enemy: (enemy.start_x, enemy.start_x + enemy.platform_width), WAKE_DISTANCE)
+        # Parts don't move, so there's nothing to catch up on when they wake
+        self.part_activity = activity.ActivitySet(
+            self.parts, lambda part: (part.rect.left, part.rect.right), WAKE_DISTANCE, catch_up=False)
+        self.save_checkpoint()
+
+    def set_player_count(self, count):
+        """Adds players at the spawn point, or removes the last ones, until there are `count`."""
+        self.player_count = count
+        del self.players[count:]
+        while len(self.players) < count:
+            self.players.append(Player(*self.player.spawn_point))
+        # The checkpoint has to have the same players, or respawning would add or drop some
+        self.save_checkpoint()
+
+    def remove_player(self, index):
+        """Removes one player, e.g. when a network client leaves."""
+        del self.players[index]
+        self.player_count -= 1
+        if self.players:
+            self.player = self.players[0]
+            self.save_checkpoint()
+
+    def collected_parts(self):
+        """Parts collected by all players together."""
+        return sum(player.collected_parts for player in self.players)
+
+    def sync(self):
+        """Brings sleeping enemies and parts up to date."""
+        self.enemy_activity.sync(self.ticks)
+        self.part_activity.sync(self.ticks)
+
+    def reset_activity(self):
+        """Re-decides what is awake after enemies and parts were changed from outside, e.g. restored."""
+        self.enemy_activity.reset(self.enemies, self.ticks)
+        self.part_activity.reset(self.parts, self.ticks)
+
+    def save_checkpoint(self):
+        """Makes the world as it is now the one falling out of it goes back to."""
+        self.checkpoint = snapshot.save(self)
+
+    def respawn_at_checkpoint(self):
+        """Puts the players who fell this tick back at the last checkpoint, keeping the lives lost since.
+
+        If every player fell, the whole world rewinds to the checkpoint;
+        otherwise only the fallen players do, keeping the parts they hold.
+        """
+        fallen = self.fallen
+        if len(fallen) == len(self.players):
+            lives = [player.lives for player in self.players]
+            snapshot.restore(self, self.checkpoint)
+            for player, player_lives in zip(self.players, lives):
+                player.lives = player_lives
+        else:
+            for player in fallen:
+                lives, parts = player.lives, player.collected_parts
+                snapshot.restore_player(self, self.checkpoint, self.players.index(player))
+                player.lives, player.collected_parts = lives, parts
+        for player in fallen:
+            player.invulnerable = True
+            player.invulnerable_timer = player.invulnerable_duration
+
+    def update(self, actions, dt):
+        """Advances the simulation by one tick with one ActionState per player; see update_playing()."""
+        xs = [player.rect.centerx for player in self.players]
+        self.enemy_activity.update(xs, self.ticks)
+        self.part_activity.update(xs, self.ticks)
+        collected = self.collected
+        self.fallen.clear()
+        result = update_playing(self.players, self.tiles, self.enemy_activity.awake, self.part_activity.awake,
+                                actions, dt, collected, self.fallen)
+        for part in collected:
+            self.part_activity.remove(part)
+            self.parts.remove(part)
+        self.ticks += 1
+        previous_time, self.time = self.time, self.time + dt
+        for player in self.players:
+            player.set_state(self.time)
+        if collected:
+            collected.clear()
+            # Not while a player is below the world, or they'd fall again on every respawn
+            if result == "none":
+                self.save_checkpoint()
+        if self.time // POSITION_SAMPLE_MS != previous_time // POSITION_SAMPLE_MS:
+            for index, player in enumerate(self.players):
+                event_log.event("position", player=index, x=player.rect.centerx, y=player.rect.centery)
+        return result
\ No newline at end of file
@@ -0,0 +1,778 @@
+# =============================================================================
+# Platformer: The Mysterious Path - Game
+#
+# The playable game around the simulation core: the window and renderer,
+# input, audio, the menus and every other scene, and the main loop.
+# Importing it only defines things; Game.start() opens the window, starts
+# the mixer, loads the settings and assets and shows the main menu.
+# =============================================================================
+
+import argparse
+import concurrent.futures
+import functools
+import random
+import sys
+
+import pygame
+from pygame.locals import *
+
+import audio
+import camera
+import controls
+import diagnostics
+import net
+import particles
+import render
+import rewind
+import settings
+import snapshot
+import telemetry
+
+from . import assets, core
+from .core import FPS, SCREEN_HEIGHT, SCREEN_WIDTH, TILE_SIZE, World, quiet, reset_game_state, world_maps
+
+# --- Game Constants ---
+RENDER_SCALES = (1.0, 0.5) # World render resolutions offered in the menu (integer upscales)
+REWIND_SECONDS = 10 # How far back holding R can rewind time
+CAMERA_DEAD_ZONE = 160 # Width of the band the player moves in without scrolling
+CAMERA_LOOKAHEAD = 96 # How far ahead of the player the camera looks
+MAX_PLAYERS = 4 # Local split-screen players
+
+# --- Colors ---
+WHITE = (255, 255, 255)
+BLACK = (0, 0, 0)
+RED = (255, 0, 0)
+GREEN = (0, 255, 0)
+BLUE = (0, 0, 255)
+
+# --- Music and Sound Settings ---
+INTRO_MUSIC = "assets/music/intro.ogg"
+GAME_MUSIC = "assets/music/glasba_ozadje.mp3"
+
+# Allocation and garbage collection statistics, off unless started with --diagnostics
+frame_diagnostics = diagnostics.Diagnostics()
+
+# --- Set up by initialize() ---
+game_settings = None
+# All drawing goes through the renderer: software blits onto the display
+# surface, or SDL textures when the "gpu" renderer is selected in the settings
+renderer = None
+# The world can be rendered below window resolution and scaled up
+world_view = None
+# Turns key and controller events into per-tick actions, with the player's bindings
+input_manager = None
+clock = None
+audio_manager = None
+# Sparks and dust, emitted by the simulation like sounds (see particles.py)
+particle_pool = None
+# Gameplay events and frame times, written out in the background (see telemetry.py)
+event_log = None
+
+def initialize():
+    """Starts pygame, opens the window and loads the settings, audio and assets; only the first call does anything."""
+    global game_settings, renderer, world_view, input_manager, clock, audio_manager, particle_pool, event_log
+    if renderer is not None:
+        return
+    pygame.init()
+    pygame.mixer.init() # Initialize the mixer for sound effects
+    # Initialize the joystick module to handle game controllers; connected
+    # controllers are opened by the input manager as their JOYDEVICEADDED
+    # events arrive
+    pygame.joystick.init()
+
+    game_settings = settings.load_settings()
+    renderer = render.create_renderer(game_settings["renderer"], (SCREEN_WIDTH, SCREEN_HEIGHT),
+                                      "Platformer: The Mysterious Path")
+    world_view = render.WorldView((SCREEN_WIDTH, SCREEN_HEIGHT), game_settings["render_scale"])
+    input_manager = controls.InputManager(game_settings["key_bindings"], game_settings["button_bindings"])
+    frame_diagnostics.reporters.append(input_manager.latency_report)
+    clock = pygame.time.Clock()
+    # Images are converted for the display as they load, so the window comes first
+    assets.load()
+
+    # Reserved channels per category and the minimum gap (ms) before the same
+    # sound may be retriggered
+    audio_manager = audio.AudioManager({
+        "sfx": (4, 50),
+        "footsteps": (1, 0), # Paced by each player's step timer (see core.update_playing)
+        "ambient": (1, 0),
+    })
+    particle_pool = particles.create_pool()
+    event_log = telemetry.Telemetry() if game_settings["telemetry"] else telemetry.NoTelemetry()
+    # The simulation plays its sounds and effects, and logs its events, through these from now on
+    core.audio_manager, core.particle_pool, core.event_log = audio_manager, particle_pool, event_log
+    core.assets = assets
+
+
+# --- Game Classes ---
+
+class Button:
+    """A simple clickable button class for UI elements."""
+    def __init__(self, text, x, y, width, height, color, text_color, hover_color, font):
+        self.rect = pygame.Rect(x, y, width, height)
+        self.color = color
+        self.text_color = text_color
+        self.hover_color = hover_color
+        self.text = text
+        self.font = font
+        self.is_hovered = False
+        self.render_text()
+
+    def render_text(self):
+        """Renders the button's text to a surface."""
+        self.txt_surface = self.font.render(self.text, True, self.text_color)
+
+    def draw(self, renderer):
+        """Draws the button with the given renderer."""
+        # Change color on hover for better user feedback
+        current_color = self.hover_color if self.is_hovered else self.color
+        renderer.draw_rect(current_color, self.rect, border_radius=10)
+        text_rect = self.txt_surface.get_rect(center=self.rect.center)
+        renderer.blit(self.txt_surface, text_rect)
+
+    def check_hover(self, pos):
+        """Checks if the mouse position is over the button."""
+        self.is_hovered = self.rect.collidepoint(pos)
+
+    def is_clicked(self, pos):
+        """Checks if the button was clicked at the given position."""
+        return self.rect.collidepoint(pos)
+
+    def update_text(self, new_text):
+        """Updates the button's text and re-renders it."""
+        self.text = new_text
+        self.render_text()
+
+@functools.lru_cache(maxsize=64)
+def render_text(text, color=WHITE):
+    """Renders a line of text in the HUD font, once per text and colour.
+
+    HUD and message text is drawn every frame but rarely changes, so it's
+    kept rather than rendered again each time.
+    """
+    return assets.font.render(text, True, color)
+
+@functools.lru_cache(maxsize=16)
+def render_message(text, color=WHITE):
+    """Renders a message on its semi-transparent background, once per text and colour."""
+    message = render_text(text, color)
+    # Add a semi-transparent background for readability
+    background = pygame.Surface(message.get_rect().inflate(20, 20).size, pygame.SRCALPHA)
+    background.fill((0, 0, 0, 150))
+    background.blit(message, (10, 10))
+    return background
+
+def draw_message(renderer, text, color=WHITE):
+    """Draws a message overlay on the game screen, typically a hint."""
+    message = render_message(text, color)
+    # Position message above the center
+    renderer.blit(message, message.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 - 100)))
+
+class LevelPreloader:
+    """Prepares levels on a background thread so switching to them is instant.
+
+    Levels are plain simulation objects that hold no images (see core.py),
+    so the worker never touches the display or the disk.
+    """
+    def __init__(self):
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="level-preload")
+        self.pending = {} # Level index -> Future with reset_game_state's result
+
+    def preload(self, level_index):
+        """Starts preparing a level in the background, if it isn't already."""
+        if level_index not in self.pending:
+            self.pending[level_index] = self.executor.submit(reset_game_state, level_index)
+
+    def take(self, level_index):
+        """Returns a fresh state for the level, preloaded if possible.
+
+        Each preloaded state is handed out once; without one the level is
+        built synchronously.
+        """
+        future = self.pending.pop(level_index, None)
+        if future is None:
+            return reset_game_state(level_index)
+        return future.result() # Normally long finished, so this doesn't wait
+
+level_preloader = LevelPreloader()
+
+# draw_background()'s blits() sequence, two copies of each layer side by
+# side as (image, [x, y]); built once, then only its positions change
+background_blits = None
+
+def draw_background(surface, scroll):
+    """Draws the parallax scrolling background."""
+    global background_blits
+    if background_blits is None:
+        background_blits = [(bg, [0, 0]) for bg in assets.bg_images for _ in range(2)]
+    for i in range(len(assets.bg_images)):
+        # Each layer scrolls at a different speed to create depth
+        speed = 0.2 * (i + 1)
+        # The modulo operator creates a seamless loop
+        offset = int(-(scroll * speed)) % SCREEN_WIDTH
+        background_blits[2 * i][1][0] = offset - SCREEN_WIDTH
+        background_blits[2 * i + 1][1][0] = offset
+    surface.blits(background_blits)
+
+def draw_hud(surface, lives, collected_parts, current_level_num):
+    """Draws the Heads-Up Display (lives, parts, level)."""
+    # Draw lives
+    life_image = assets.life_image
+    for i in range(lives):
+        surface.blit(life_image, (10 + i * (life_image.get_width() + 5), 10))
+    
+    # Draw collected parts text
+    parts_text = render_text(f"Parts: {collected_parts}/3")
+    surface.blit(parts_text, (10, 50))
+    
+    # Draw current level text
+    level_text = render_text(f"Level: {current_level_num}")
+    surface.blit(level_text, (10, 90))
+
+
+# --- Scenes ---
+# Every screen of the game is a scene on a stack. The main loop pumps events,
+# updates and draws only the top scene, so no screen ever runs a loop of its
+# own or waits; timed messages are scenes too.
+
+class Scene:
+    """Base class for a screen driven by the main loop."""
+    def __init__(self, game):
+        self.game = game
+
+    def handle_event(self, event):
+        """Reacts to a single pygame event."""
+        pass
+
+    def update(self, dt):
+        """Advances the scene by dt milliseconds."""
+        pass
+
+    def draw(self, renderer):
+        """Draws the scene with the given renderer."""
+        pass
+
+class IntroScene(Scene):
+    """The main menu with its buttons."""
+    def __init__(self, game):
+        super().__init__(game)
+        # Button layout
+        button_width, button_height, button_spacing = 300, 60, 12
+        start_x = SCREEN_WIDTH // 2 - button_width // 2
+        start_y = SCREEN_HEIGHT // 2 - 100
+        step = button_height + button_spacing
+
+        self.start_button = Button("Start Game", start_x, start_y, button_width, button_height, (0, 100, 0), WHITE, (0, 150, 0), assets.font)
+        self.players_button = Button("", start_x, start_y + step, button_width, button_height, (100, 180, 255), BLACK, (150, 200, 255), assets.font)
+        self.music_button = Button("", start_x, start_y + 2 * step, button_width, button_height, (100, 180, 255), BLACK, (150, 200, 255), assets.font)
+        self.sound_button = Button("", start_x, start_y + 3 * step, button_width, button_height, (100, 180, 255), BLACK, (150, 200, 255), assets.font)
+        self.resolution_button = Button("", start_x, start_y + 4 * step, button_width, button_height, (100, 180, 255), BLACK, (150, 200, 255), assets.font)
+        self.controls_button = Button("Controls", start_x, start_y + 5 * step, button_width, button_height, (100, 180, 255), BLACK, (150, 200, 255), assets.font)
+        self.buttons = [self.start_button, self.players_button, self.music_button, self.sound_button,
+                        self.resolution_button, self.controls_button]
+        self.update_toggle_labels()
+
+        # Draw title with a shadow for better visibility
+        title_text = "The Mysterious Path"
+        self.title_shadow = assets.title_font.render(title_text, True, (0, 0, 0, 128))
+        self.title = assets.title_font.render(title_text, True, WHITE)
+
+    def update_toggle_labels(self):
+        """Refreshes the settings button texts from the current settings."""
+        self.players_button.update_text(f"Players: {self.game.players}")
+        self.music_button.update_text("Music: ON" if audio_manager.music_on else "Music: OFF")
+        self.sound_button.update_text("Sound FX: ON" if audio_manager.sound_on else "Sound FX: OFF")
+        width, height = world_view.render_size()
+        self.resolution_button.update_text(f"Resolution: {width}x{height}")
+
+    def cycle_render_scale(self):
+        """Switches to the next world render resolution and saves it."""
+        current = game_settings["render_scale"]
+        index = RENDER_SCALES.index(current) if current in RENDER_SCALES else -1
+        game_settings["render_scale"] = RENDER_SCALES[(index + 1) % len(RENDER_SCALES)]
+        world_view.set_scale(game_settings["render_scale"])
+        settings.save_settings(game_settings)
+        self.update_toggle_labels()
+
+    def handle_event(self, event):
+        if event.type != MOUSEBUTTONDOWN:
+            return
+        if self.start_button.is_clicked(event.pos):
+            audio_manager.play_music(GAME_MUSIC)
+            audio_manager.play(assets.ambiance_sound, "ambient", loops=-1)
+            audio_manager.preload_music(INTRO_MUSIC)
+            self.game.replace(PlayingScene(self.game, players=self.game.players))
+        elif self.players_button.is_clicked(event.pos):
+            self.game.players = self.game.players % MAX_PLAYERS + 1
+            self.update_toggle_labels()
+        elif self.music_button.is_clicked(event.pos):
+            audio_manager.set_music_on(not audio_manager.music_on)
+            self.update_toggle_labels()
+        elif self.sound_button.is_clicked(event.pos):
+            audio_manager.set_sound_on(not audio_manager.sound_on)
+            self.update_toggle_labels()
+        elif self.resolution_button.is_clicked(event.pos):
+            self.cycle_render_scale()
+        elif self.controls_button.is_clicked(event.pos):
+            self.game.push(ControlsScene(self.game))
+
+    def draw(self, renderer):
+        renderer.blit(assets.intro_bg, (0, 0))
+
+        shadow_offset = 4
+        renderer.blit(self.title_shadow, (SCREEN_WIDTH // 2 - self.title_shadow.get_width() // 2 + shadow_offset, SCREEN_HEIGHT // 4 - self.title_shadow.get_height() // 2 + shadow_offset))
+        renderer.blit(self.title, (SCREEN_WIDTH // 2 - self.title.get_width() // 2, SCREEN_HEIGHT // 4 - self.title.get_height() // 2))
+
+        # Check for hover and draw buttons
+        mouse_pos = pygame.mouse.get_pos()
+        for button in self.buttons:
+            button.check_hover(mouse_pos)
+            button.draw(renderer)
+
+class ControlsScene(Scene):
+    """Lists the controls and lets keys be rebound; ESC returns to the menu.
+
+    Up/Down selects an action and Enter waits for the key to bind to it.
+    Bindings are saved to the settings file straight away.
+    """
+    ACTION_LABELS = {
+        "left": "Move left",
+        "right": "Move right",
+        "jump": "Jump",
+        "interact": "Interact",
+        "rewind": "Rewind time (hold)",
+        "quicksave": "Quicksave",
+        "quickload": "Quickload",
+    }
+
+    def __init__(self, game):
+        super().__init__(game)
+        self.selected = 0
+        self.waiting = False # Whether the next key press rebinds the selected action
+        self.header = assets.font.render("=== Keyboard ===", True, WHITE)
+        footer = [
+            "",
+            "=== Controller ===",
+            "Left Stick - Move",
+            "A Button (Bottom Face) - Jump",
+            "X Button (Left Face) - Interact",
+            "",
+            "Up/Down and Enter to change a key, ESC to return to menu"
+        ]
+        self.footer = [assets.font.render(line, True, WHITE) for line in footer]
+        self.render_bindings()
+
+    def render_bindings(self):
+        """Re-renders the keyboard lines after the selection or a binding changed."""
+        self.bindings = []
+        for i, action in enumerate(controls.ACTIONS):
+            keys = "Press a key..." if self.waiting and i == self.selected else input_manager.describe(action)
+            color = GREEN if i == self.selected else WHITE
+            self.bindings.append(assets.font.render(f"{keys} - {self.ACTION_LABELS[action]}", True, color))
+
+    def handle_event(self, event):
+        if event.type != KEYDOWN:
+            return
+        if self.waiting:
+            # ESC cancels instead of being bound
+            if event.key != K_ESCAPE:
+                input_manager.rebind(controls.ACTIONS[self.selected], event.key)
+                input_manager.save(game_settings)
+                settings.save_settings(game_settings)
+            self.waiting = False
+        elif event.key == K_ESCAPE:
+            self.game.pop()
+            return
+        elif event.key in (K_UP, K_DOWN):
+            step = -1 if event.key == K_UP else 1
+            self.selected = (self.selected + step) % len(controls.ACTIONS)
+        elif event.key == K_RETURN:
+            self.waiting = True
+        self.render_bindings()
+
+    def draw(self, renderer):
+        renderer.fill(BLACK)
+        y_offset = SCREEN_HEIGHT // 8
+        for text in [self.header, *self.bindings, *self.footer]:
+            renderer.blit(text, text.get_rect(center=(SCREEN_WIDTH // 2, y_offset)))
+            y_offset += 40
+
+class TransitionScene(Scene):
+    """Shows a centered message on a black screen, then calls on_finish."""
+    def __init__(self, game, text, duration_ms, on_finish):
+        super().__init__(game)
+        self.message = assets.large_font.render(text, True, WHITE)
+        self.remaining = duration_ms
+        self.on_finish = on_finish
+
+    def update(self, dt):
+        self.remaining -= dt
+        if self.remaining <= 0:
+            self.on_finish()
+
+    def draw(self, renderer):
+        renderer.fill(BLACK)
+        renderer.blit(self.message, self.message.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2)))
+
+class FinalChallengeScene(Scene):
+    """A simple reaction-based mini-game for the end."""
+    def __init__(self, game):
+        super().__init__(game)
+        self.number = random.randint(0, 9)
+        self.prompt = assets.large_font.render(f"Press the number {self.number} to fix the plane!", True, BLACK)
+        self.remaining = 3000 # 3 seconds
+
+    def handle_event(self, event):
+        if event.type == KEYDOWN and event.unicode == str(self.number):
+            event_log.event("final_challenge", result="escaped", reaction_ms=3000 - self.remaining)
+            self.game.replace(TransitionScene(self.game, "Congratulations! You've escaped!", 2000,
+                                              self.game.return_to_menu))
+
+    def update(self, dt):
+        self.remaining -= dt
+        if self.remaining <= 0:
+            event_log.event("final_challenge", result="failed")
+            self.game.replace(TransitionScene(self.game, "Repair failed! The apes caught you!", 2000,
+                                              self.game.game_over))
+
+    def draw(self, renderer):
+        renderer.fill(WHITE)
+        renderer.blit(self.prompt, self.prompt.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2)))
+
+class PlayingScene(Scene):
+    """The level being played: owns the world and a camera per player.
+
+    A player who falls out of the world goes back to the last checkpoint
+    (see World.respawn_at_checkpoint). F5 quicksaves and F9 quickloads.
+    Every tick is also recorded into a rewind buffer; holding R plays it
+    backwards one tick per frame.
+
+    With more than one local player the window is split into one viewport
+    per player. Each shows the same field of view at half size, rendered
+    from the level's shared, pre-rendered tile layer.
+    """
+    def __init__(self, game, level_index=0, players=1):
+        super().__init__(game)
+        self.quicksave = None
+        self.rewind = rewind.RewindBuffer(REWIND_SECONDS, FPS)
+        self.set_up_views(players)
+        self.load_level(level_index)
+
+    def set_up_views(self, players):
+        """Makes a camera and viewport per player, and what draw_world() draws them with."""
+        self.pass_stats = render.PassStats() # Blit calls and time per render pass
+        self.cameras = [camera.Camera((SCREEN_WIDTH, SCREEN_HEIGHT), CAMERA_DEAD_ZONE, CAMERA_LOOKAHEAD)
+                        for _ in range(players)]
+        if players == 1:
+            self.view, self.viewports = world_view, [None]
+        else:
+            # One view drawn into every viewport in turn, so its shrunken sprites are shared
+            self.view = render.WorldView((SCREEN_WIDTH, SCREEN_HEIGHT), game_settings["render_scale"], 0.5)
+            self.viewports = split_viewports(players)
+        input_manager.set_players(players)
+
+    def load_level(self, level_index):
+        """Resets the scene to the start of a level."""
+        self.world = World(level_index, level_preloader.take(level_index), len(self.cameras))
+        self.terrain = render.TileLayer(self.world.tiles, assets.terrain_variants)
+        particle_pool.clear()
+        for cam in self.cameras:
+            cam.set_bounds(self.world.width)
+            cam.jump_to(0)
+        self.rewind.clear()
+        event_log.set_context(level=level_index)
+        event_log.event("level_start", players=len(self.cameras))
+        # Get the next level ready while this one is being played
+        if level_index < len(world_maps) - 1:
+            level_preloader.preload(level_index + 1)
+        if game_settings["gc_freeze"]:
+            # The level and every asset live until the next load
+            diagnostics.freeze_after_load()
+
+    def player_at_goal(self):
+        """The first player standing at the goal, or None."""
+        world = self.world
+        if world.goal:
+            return next((player for player in world.players if player.rect.colliderect(world.goal)), None)
+        return None
+
+    def restore(self, data):
+        """Restores a world snapshot and puts the cameras back where they were."""
+        level_index = self.world.level_index
+        scroll = snapshot.restore(self.world, data)
+        if self.world.level_index != level_index:
+            # The snapshot was of another level, e.g. a quicksave made before moving on
+            self.terrain = render.TileLayer(self.world.tiles, assets.terrain_variants)
+            particle_pool.clear()
+            event_log.set_context(level=self.world.level_index)
+        # Only the first camera is saved; the others are centred on their players
+        for i, (cam, player) in enumerate(zip(self.cameras, self.world.players)):
+            cam.set_bounds(self.world.width)
+            cam.jump_to(scroll if i == 0 else player.rect.centerx - SCREEN_WIDTH / 2)
+
+    def respawn_at_checkpoint(self):
+        """Sends the fallen players back to the last checkpoint and centres their cameras on them again."""
+        self.world.respawn_at_checkpoint()
+        for cam, player in zip(self.cameras, self.world.players):
+            if player in self.world.fallen:
+                cam.jump_to(player.rect.centerx - SCREEN_WIDTH / 2)
+
+    def update(self, dt):
+        with frame_diagnostics.section("input"):
+            actions = [input_manager.poll(i) for i in range(len(self.cameras))]
+            # Saving, loading, rewinding and moving on work for every player
+            held = pressed = 0
+            for player_actions in actions:
+                held |= player_actions.held
+                pressed |= player_actions.pressed
+        with frame_diagnostics.section("effects"):
+            particle_pool.update(dt)
+        if pressed & controls.QUICKSAVE:
+            self.quicksave = snapshot.save(self.world, self.cameras[0].x)
+        elif pressed & controls.QUICKLOAD and self.quicksave:
+            self.restore(self.quicksave)
+
+        # Interacting at the goal with every part moves on
+        if pressed & controls.INTERACT and self.player_at_goal() and self.world.collected_parts() >= 3:
+            event_log.event("level_complete", time_ms=round(self.world.time),
+                            lives=[player.lives for player in self.world.players])
+            if self.world.level_index < len(world_maps) - 1:
+                # Move to the next level
+                self.load_level(self.world.level_index + 1)
+            else:
+                # Final level completed, start the mini-game
+                self.game.replace(FinalChallengeScene(self.game))
+                return
+
+        world = self.world
+        if held & controls.REWIND:
+            # Scrub backwards instead of simulating while R is held
+            data = self.rewind.pop()
+            if data:
+                self.restore(data)
+            return
+
+        with frame_diagnostics.section("simulation"):
+            result = world.update(actions, dt)
+        if result == "game_over":
+            event_log.event("game_over", time_ms=round(world.time))
+            self.game.game_over()
+            return
+        if result == "respawned":
+            self.respawn_at_checkpoint()
+
+        with frame_diagnostics.section("camera"):
+            for cam, player in zip(self.cameras, world.players):
+                cam.update(player.rect, player.facing_right)
+        with frame_diagnostics.section("rewind"):
+            self.rewind.record(world, self.cameras[0].x)
+
+    def draw_world(self, renderer, cam):
+        """Draws the world as seen by one camera, through the scene's view."""
+        world, goal = self.world, self.world.goal
+        # Animations are evaluated at the world clock, so every viewport shows the same frame
+        clock = world.time
+        # Whole pixels, so every sprite is blitted on the pixel grid
+        scroll = cam.scroll
+        # Sprites can be drawn a little outside their hitboxes
+        visible = cam.visible_rect(TILE_SIZE)
+        # The world goes through the view, which may render it at a lower
+        # resolution; the HUD is drawn on the window afterwards so text stays sharp
+        view = self.view
+        view.begin(renderer)
+        # Each pass is submitted as one blits() call
+        stats = self.pass_stats
+        stats.views += 1
+        with stats.measure("background", view):
+            draw_background(view, scroll)
+        with stats.measure("terrain", view):
+            self.terrain.draw(view, scroll, visible)
+
+        with stats.measure("enemies", view):
+            view.blits([enemy.sprite(scroll, clock) for enemy in world.enemies if enemy.rect.colliderect(visible)])
+
+        with stats.measure("parts", view):
+            view.blits([part_obj.sprite(scroll, clock) for part_obj in world.parts if part_obj.rect.colliderect(visible)])
+
+        with stats.measure("players", view):
+            sprites = []
+            if goal and goal.colliderect(visible):
+                goal_image = assets.goal_image
+                sprites.append((goal_image, (goal.x - scroll - TILE_SIZE * 0.25, goal.y - goal_image.get_height() + TILE_SIZE)))
+            for player in world.players:
+                if player.rect.colliderect(visible):
+                    sprites.append(player.sprite(scroll, clock))
+            view.blits([sprite for sprite in sprites if sprite])
+
+        with stats.measure("effects", view):
+            particle_pool.draw(view, scroll)
+        view.present(renderer)
+
+    def draw(self, renderer):
+        world = self.world
+        if len(self.viewports) > 1:
+            renderer.fill(BLACK) # Viewports don't cover the whole window
+        for cam, player, viewport in zip(self.cameras, world.players, self.viewports):
+            renderer.set_viewport(viewport)
+            with frame_diagnostics.section("draw"):
+                self.draw_world(renderer, cam)
+            with frame_diagnostics.section("hud"):
+                draw_hud(renderer, player.lives, world.collected_parts(), world.level_index + 1)
+        renderer.set_viewport(None)
+
+        # Display interaction prompts
+        with frame_diagnostics.section("hud"):
+            if self.player_at_goal():
+                if world.collected_parts() >= 3:
+                    if world.level_index < len(world_maps) - 1:
+                        draw_message(renderer, f"Press E to proceed to Level {world.level_index + 2}!")
+                    else:
+                        draw_message(renderer, "Press E for the final challenge!")
+                else:
+                    draw_message(renderer, "You need to collect all the parts first!")
+
+class NetPlayingScene(PlayingScene):
+    """A level played on a multiplayer server (see net.py).
+
+    The server runs the simulation; this scene sends the local input every
+    frame, predicts the local player and draws the world the server sent.
+    """
+    def __init__(self, game, address, session="default"):
+        Scene.__init__(self, game)
+        self.client = net.Client(World, 1000 / FPS, session, quiet)
+        self.connection = net.Connection(address)
+        self.set_up_views(1)
+        self.world = None
+        audio_manager.play_music(GAME_MUSIC)
+
+    def handle_event(self, event):
+        if event.type == KEYDOWN and event.key == K_ESCAPE:
+            self.connection.send(self.client.leave_packet())
+            self.connection.close()
+            self.game.return_to_menu()
+
+    def update(self, dt):
+        particle_pool.update(dt)
+        client = self.client
+        for data in self.connection.receive_all():
+            client.receive(data)
+        for packet in client.update(input_manager.poll()):
+            self.connection.send(packet)
+        world = client.world
+        if world is None:
+            return # Still connecting
+        if world is not self.world or self.terrain_level != world.level_index:
+            self.world, self.terrain_level = world, world.level_index
+            self.terrain = render.TileLayer(world.tiles, assets.terrain_variants)
+            self.cameras[0].set_bounds(world.width)
+            self.cameras[0].jump_to(client.player.rect.centerx - SCREEN_WIDTH / 2)
+        self.cameras[0].update(client.player.rect, client.player.facing_right)
+
+    def draw(self, renderer):
+        if self.world is None:
+            renderer.fill(BLACK)
+            draw_message(renderer, "Connecting...")
+            return
+        player = self.client.player
+        self.draw_world(renderer, self.cameras[0])
+        draw_hud(renderer, player.lives, self.world.collected_parts(), self.world.level_index + 1)
+
+def split_viewports(players):
+    """Screen areas for each player's view: stacked for two, quarters for three or four."""
+    width, height = SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2
+    if players == 2:
+        return [pygame.Rect(width // 2, 0, width, height), pygame.Rect(width // 2, height, width, height)]
+    return [pygame.Rect(i % 2 * width, i // 2 * height, width, height) for i in range(players)]
+
+# --- Main Game Loop ---
+
+class Game:
+    """Owns the scene stack and runs the single main loop.
+
+    Making one does nothing else; start() sets up the window, audio and
+    assets and shows the main menu, and run() then plays until the window
+    is closed.
+    """
+    def __init__(self):
+        self.players = 1 # Local players for the next game, chosen in the menu
+        self.scenes = []
+        self.running = True
+
+    def start(self):
+        """Initializes the display, audio and assets (see initialize()) and shows the main menu."""
+        initialize()
+        audio_manager.play_music(INTRO_MUSIC) # Play intro music on a loop
+        # Read the gameplay track in the background so starting the game doesn't hit the disk
+        audio_manager.preload_music(GAME_MUSIC)
+        level_preloader.preload(0)
+        self.scenes = [IntroScene(self)]
+
+    def push(self, scene):
+        """Shows a scene on top of the current one."""
+        self.scenes.append(scene)
+
+    def pop(self):
+        """Returns to the scene below the top one."""
+        self.scenes.pop()
+
+    def replace(self, scene):
+        """Swaps the top scene for another."""
+        self.scenes[-1] = scene
+
+    def return_to_menu(self):
+        """Drops every scene and goes back to the main menu."""
+        audio_manager.stop("ambient")
+        audio_manager.play_music(INTRO_MUSIC)
+        level_preloader.preload(0)
+        self.scenes = [IntroScene(self)]
+
+    def game_over(self):
+        """Shows the game over message, then returns to the menu."""
+        self.replace(TransitionScene(self, "Game Over!", 2000, self.return_to_menu))
+
+    def run(self):
+        """Runs the game until the window is closed."""
+        while self.running:
+            frame_diagnostics.begin_frame()
+            # Delta time for frame-rate independent physics and animations
+            dt = clock.tick(FPS)
+            event_log.frame(dt)
+            audio_manager.update(dt)
+
+            # --- Event Handling ---
+            input_manager.begin_events()
+            for event in pygame.event.get():
+                # With the GPU renderer the game window isn't the only one,
+                # so closing it doesn't post QUIT by itself
+                if event.type in (QUIT, WINDOWCLOSE):
+                    self.running = False
+                else:
+                    # Input is tracked in every scene so held keys stay right
+                    input_manager.handle_event(event)
+                    self.scenes[-1].handle_event(event)
+
+            # A scene may switch scenes while updating, so draw whatever is on top afterwards
+            self.scenes[-1].update(dt)
+            self.scenes[-1].draw(renderer)
+            renderer.present()
+            frame_diagnostics.end_frame()
+
+def main():
+    """The main function that runs the game."""
+    parser = argparse.ArgumentParser(description="Platformer: The Mysterious Path")
+    parser.add_argument("--diagnostics", action="store_true",
+                        help="print allocation and garbage collection statistics while playing")
+    args = parser.parse_args()
+    if args.diagnostics:
+        frame_diagnostics.start()
+    game = Game()
+    game.start()
+    game.run()
+
+    # --- Shutdown ---
+    event_log.close() # Writes out the last events
+    pygame.quit()
+    sys.exit()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,382 @@
+# =============================================================================
+# Platformer: The Mysterious Path - Rendering
+#
+# The game world is drawn in logical screen coordinates (1280x720) with
+# sprites at their logical size. A WorldView can render that below the
+# window resolution: sprites are shrunk once and cached, blits land on a
+# smaller surface, and present() scales the result up to the window in a
+# single pass. Fill-rate-bound machines draw a fraction of the pixels while
+# the game logic never knows the difference.
+#
+# Everything is drawn through a renderer. SoftwareRenderer blits onto the
+# display surface as the game always has; GpuRenderer uploads each surface
+# to an SDL texture once and lets the GPU composite the frame. Drawing code
+# only calls blit(), so it works the same on either backend.
+#
+# Static level tiles are pre-rendered into a TileLayer of wide chunks once
+# per level, so drawing the terrain is a handful of large blits per view
+# however many views (split-screen players) there are.
+#
+# Each render pass (background, terrain, enemies, ...) collects its sprites
+# into one (image, position) list and hands it over with a single blits()
+# call, so the per-call cost of going from Python to SDL is paid once per
+# pass rather than once per sprite. PassStats counts calls and time per pass.
+#
+# Usage (benchmark, batched against one blit per sprite):
+#   python render.py
+# =============================================================================
+
+import collections
+import contextlib
+import math
+import time
+import weakref
+
+import pygame
+
+try:
+    from pygame._sdl2 import sdl2, video
+    _GPU_ERRORS = (pygame.error, sdl2.error)
+except ImportError: # _sdl2 is experimental and missing from some pygame builds
+    video = None
+    _GPU_ERRORS = (pygame.error,)
+
+RENDERERS = ("software", "gpu")
+
+
+def _blits(surface, sequence):
+    """Blits a sequence of (image, position) pairs in one call."""
+    if hasattr(surface, "fblits"): # pygame-ce's faster variant
+        surface.fblits(sequence)
+    else:
+        surface.blits(sequence, doreturn=False)
+
+
+class SoftwareRenderer:
+    """Draws with Surface.blit onto the display surface."""
+    name = "software"
+
+    def __init__(self, size, title):
+        # Use DOUBLEBUF for smoother rendering, especially with many moving elements
+        self.display = self.surface = pygame.display.set_mode(size, pygame.DOUBLEBUF)
+        pygame.display.set_caption(title)
+
+    def set_viewport(self, rect=None):
+        """Restricts drawing to `rect` of the window, with positions relative
+        to its corner; None draws to the whole window again."""
+        self.surface = self.display if rect is None else self.display.subsurface(rect)
+
+    def blit(self, image, pos):
+        self.surface.blit(image, pos)
+
+    def blits(self, sequence):
+        _blits(self.surface, sequence)
+
+    def blit_changing(self, image, pos):
+        self.surface.blit(image, pos)
+
+    def fill(self, color):
+        self.surface.fill(color)
+
+    def draw_rect(self, color, rect, border_radius=0):
+        pygame.draw.rect(self.surface, color, rect, border_radius=border_radius)
+
+    def present(self):
+        """Shows the finished frame."""
+        pygame.display.flip()
+
+
+class GpuRenderer:
+    """Draws surfaces as SDL textures through a hardware-accelerated renderer."""
+    name = "gpu"
+    surface = None # There is no software frame to draw into
+
+    def __init__(self, size, title):
+        if video is None:
+            raise pygame.error("pygame._sdl2 is not available")
+        # convert() and convert_alpha() need a display surface, so keep a
+        # hidden one around; the game itself is shown in a separate window
+        pygame.display.set_mode((1, 1), pygame.HIDDEN)
+        self.window = video.Window(title, size=size)
+        # SDL picks an accelerated driver when there is one and its software
+        # renderer otherwise, so the texture path also runs without a GPU
+        self.renderer = video.Renderer(self.window)
+        # Keyed weakly so a texture is freed with the surface it was made from
+        self.textures = weakref.WeakKeyDictionary()
+        self.streaming = weakref.WeakKeyDictionary() # Textures re-uploaded every frame
+
+    def texture(self, image):
+        """Returns the texture for a surface, uploading it on first use."""
+        texture = self.textures.get(image)
+        if texture is None:
+            texture = self.textures[image] = video.Texture.from_surface(self.renderer, image)
+        return texture
+
+    def set_viewport(self, rect=None):
+        """Restricts drawing to `rect` of the window, with positions relative
+        to its corner; None draws to the whole window again."""
+        self.renderer.set_viewport(rect)
+
+    def set_scale(self, scale):
+        """Scales everything drawn from now on, e.g. to fit a world view into a viewport."""
+        self.renderer.scale = (scale, scale)
+
+    def blit(self, image, pos):
+        width, height = image.get_size()
+        if not width or not height:
+            return # e.g. rendered empty text; SDL has no zero-sized textures
+        self.texture(image).draw(dstrect=(pos[0], pos[1], width, height))
+
+    def blits(self, sequence):
+        # One draw per texture; SDL batches the draw calls for the GPU itself
+        for image, pos in sequence:
+            self.blit(image, pos)
+
+    def blit_changing(self, image, pos):
+        """Blits a surface whose pixels change between frames, uploading them again."""
+        texture = self.streaming.get(image)
+        if texture is None:
+            texture = self.streaming[image] = video.Texture(self.renderer, image.get_size(), streaming=True)
+            texture.blend_mode = 1 # SDL_BLENDMODE_BLEND, so transparent pixels show what's behind
+        texture.update(image)
+        texture.draw(dstrect=(pos[0], pos[1], *image.get_size()))
+
+    def fill(self, color):
+        self.renderer.draw_color = pygame.Color(color)
+        self.renderer.clear()
+
+    def draw_rect(self, color, rect, border_radius=0):
+        # SDL can't round corners; square ones look close enough on buttons
+        self.renderer.draw_color = pygame.Color(color)
+        self.renderer.fill_rect(rect)
+
+    def present(self):
+        self.renderer.present()
+
+
+def create_renderer(backend, size, title):
+    """Opens the game window with the requested backend.
+
+    Falls back to the software renderer if the GPU one can't be created,
+    e.g. on machines without a GPU or with the SDL dummy video driver.
+    """
+    if backend == "gpu":
+        try:
+            return GpuRenderer(size, title)
+        except _GPU_ERRORS as e:
+            print(f"GPU renderer unavailable, using software rendering: {e}")
+    return SoftwareRenderer(size, title)
+
+
+class WorldView:
+    """Draw target for the game world, optionally rendered at a lower resolution.
+
+    `output_scale` is the size of the area the view is shown in relative to
+    the logical size, e.g. 0.5 for a quarter of the window in split-screen.
+    """
+    def __init__(self, logical_size, scale=1.0, output_scale=1.0):
+        self.logical_size = logical_size
+        self.output_scale = output_scale
+        self.batch = True # blits() in one call; off only to compare against
+        self.calls = 0 # Blit calls made, for PassStats
+        self.sprites = 0 # Images blitted
+        self.set_scale(scale)
+
+    def set_scale(self, scale):
+        """Changes the render scale; shrunken sprites are rebuilt lazily."""
+        self.scale = scale
+        # Logical pixels to rendered pixels
+        self.pixel_scale = scale * self.output_scale
+        # Keyed weakly so sprites that go away don't keep their copies alive
+        self.scaled_images = weakref.WeakKeyDictionary()
+        self.surface = None
+        if self.pixel_scale != 1:
+            width, height = self.logical_size
+            self.surface = pygame.Surface((round(width * self.pixel_scale), round(height * self.pixel_scale))).convert()
+        self.target = None
+
+    def render_size(self):
+        """The size in pixels the world is actually rendered at."""
+        return self.surface.get_size() if self.surface else self.logical_size
+
+    def begin(self, renderer):
+        """Starts a frame that will end up on `renderer`.
+
+        The GPU renderer scales textures for free, so the world is only
+        rendered below resolution for the software one.
+        """
+        if renderer.surface is None:
+            renderer.set_scale(self.output_scale)
+            self.target = renderer
+        else:
+            self.target = self.surface or renderer
+
+    def scaled(self, image):
+        """Returns the image shrunk to the render scale, scaling it on first use."""
+        scaled = self.scaled_images.get(image)
+        if scaled is None:
+            scale = self.pixel_scale
+            width, height = image.get_size()
+            scaled = pygame.transform.scale(image, (max(1, round(width * scale)), max(1, round(height * scale))))
+            self.scaled_images[image] = scaled
+        return scaled
+
+    def blit(self, image, pos):
+        """Blits a logical-size image at a logical position."""
+        self.calls += 1
+        self.sprites += 1
+        if self.target is not self.surface:
+            self.target.blit(image, pos)
+            return
+        scale = self.pixel_scale
+        # Floor rather than truncate so negative positions don't shift by a pixel
+        self.target.blit(self.scaled(image), (math.floor(pos[0] * scale), math.floor(pos[1] * scale)))
+
+    def blits(self, sequence):
+        """Blits a list of (image, logical position) pairs in one call."""
+        if not self.batch:
+            for image, pos in sequence:
+                self.blit(image, pos)
+            return
+        if not sequence:
+            return
+        self.calls += 1
+        self.sprites += len(sequence)
+        if self.target is not self.surface:
+            self.target.blits(sequence)
+            return
+        scale, floor = self.pixel_scale, math.floor
+        _blits(self.target, [(self.scaled(image), (floor(x * scale), floor(y * scale))) for image, (x, y) in sequence])
+
+    def present(self, renderer):
+        """Scales the low-resolution frame up onto the renderer's surface."""
+        if self.target is self.surface:
+            pygame.transform.scale(self.surface, renderer.surface.get_size(), renderer.surface)
+        elif renderer.surface is None:
+            renderer.set_scale(1)
+
+
+class TileLayer:
+    """A level's static tiles pre-rendered into vertical strips ("chunks").
+
+    Chunks are built the first time they come into view and cropped to the
+    tiles they hold. They are run-length encoded, so the empty space between
+    platforms costs next to nothing to blit. Each tile is drawn with the
+    image in `sprites` its 'variant' picks.
+
+    The blits() sequence for each run of chunks in view is built once and
+    kept; drawing only moves its positions by the scroll, so no list is
+    built per frame.
+    """
+    def __init__(self, tiles, sprites, chunk_width=512):
+        self.chunk_width = chunk_width
+        self.chunk_tiles = {} # Chunk index -> (sprite, rect) of the tiles overlapping it
+        for tile in tiles:
+            rect = tile['rect']
+            for index in range(rect.left // chunk_width, (rect.right - 1) // chunk_width + 1):
+                self.chunk_tiles.setdefault(index, []).append((sprites[tile['variant']], rect))
+        self.chunks = {} # Chunk index -> (surface, position in the level)
+        # (first, last) chunk in view -> ([(surface, [x, y])] for blits(), level x of each)
+        self.sequences = {}
+
+    def chunk(self, index):
+        """Returns the chunk's (surface, position), rendering it on first use."""
+        chunk = self.chunks.get(index)
+        if chunk is None:
+            tiles = self.chunk_tiles[index]
+            # Cropped to the tiles in it, and to the chunk's own strip
+            left = max(index * self.chunk_width, min(rect.left for _, rect in tiles))
+            right = min((index + 1) * self.chunk_width, max(rect.right for _, rect in tiles))
+            top = min(rect.top for _, rect in tiles)
+            bounds = pygame.Rect(left, top, right - left, max(rect.bottom for _, rect in tiles) - top)
+            surface = pygame.Surface(bounds.size, pygame.SRCALPHA).convert_alpha()
+            for sprite, rect in tiles:
+                surface.blit(sprite, (rect.x - bounds.x, rect.y - bounds.y))
+            surface.set_alpha(255, pygame.RLEACCEL)
+            chunk = self.chunks[index] = (surface, bounds.topleft)
+        return chunk
+
+    def draw(self, target, scroll, visible):
+        """Blits the chunks overlapping the `visible` level rect, scrolled by `scroll`."""
+        key = (visible.left // self.chunk_width, (visible.right - 1) // self.chunk_width)
+        cached = self.sequences.get(key)
+        if cached is None:
+            chunks = [self.chunk(index) for index in range(key[0], key[1] + 1) if index in self.chunk_tiles]
+            cached = self.sequences[key] = ([(surface, [x, y]) for surface, (x, y) in chunks],
+                                            [x for _, (x, _) in chunks])
+        sequence, xs = cached
+        for (_, position), x in zip(sequence, xs):
+            position[0] = x - scroll
+        target.blits(sequence)
+
+
+class PassStats:
+    """Blit calls, sprites and time per render pass, summed over the views drawn.
+
+    Wrap each pass in measure(); the calls and sprites come from the
+    WorldView's counters.
+    """
+    def __init__(self):
+        self.passes = collections.defaultdict(lambda: [0, 0, 0.0]) # Name -> [calls, sprites, seconds]
+        self.views = 0
+
+    def reset(self):
+        self.passes.clear()
+        self.views = 0
+
+    @contextlib.contextmanager
+    def measure(self, name, view):
+        calls, sprites, start = view.calls, view.sprites, time.perf_counter()
+        yield
+        totals = self.passes[name]
+        totals[0] += view.calls - calls
+        totals[1] += view.sprites - sprites
+        totals[2] += time.perf_counter() - start
+
+    def report(self):
+        """A line per pass with its calls, sprites and milliseconds per view."""
+        views = max(1, self.views)
+        return [f"{name:<12}{calls / views:7.1f} calls {sprites / views:7.1f} sprites {seconds / views * 1000:8.3f} ms"
+                for name, (calls, sprites, seconds) in self.passes.items()]
+
+
+def main():
+    """Draws a level with batched and unbatched blits and reports each pass."""
+    import os
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    import platformer
+
+    frames = 300
+    game = platformer.Game()
+    game.start()
+    scene = platformer.game.PlayingScene(game, 1)
+    game.scenes = [scene]
+    for _ in range(60):
+        scene.update(1000 / platformer.FPS)
+    view, renderer = platformer.game.world_view, platformer.game.renderer
+    cam = scene.cameras[0]
+    # A dense pass for comparison: the visible tiles one by one, as they were
+    # drawn before the TileLayer
+    visible = cam.visible_rect(platformer.TILE_SIZE)
+    tiles = [(platformer.assets.terrain_variants[tile['variant']], (tile['rect'].x - cam.scroll, tile['rect'].y))
+             for tile in scene.world.tiles if tile['rect'].colliderect(visible)]
+    for scale in platformer.game.RENDER_SCALES:
+        view.set_scale(scale)
+        for batch in (False, True):
+            view.batch = batch
+            for _ in range(30): # Warm the scaled sprite cache
+                scene.draw(renderer)
+            scene.pass_stats.reset()
+            for _ in range(frames):
+                scene.draw(renderer)
+                view.begin(renderer)
+                with scene.pass_stats.measure("tiles", view):
+                    view.blits(tiles)
+                view.present(renderer)
+            print(f"Render scale {scale}, {'batched' if batch else 'one blit per sprite'}:")
+            for line in scene.pass_stats.report():
+                print("  " + line)
+
+if __name__ == "__main__":
+    main()
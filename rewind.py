@@ -0,0 +1,267 @@
+# =============================================================================
+# Platformer: The Mysterious Path - Rewind Buffer
+#
+# Keeps the last few seconds of world snapshots (see snapshot.py) so time
+# can be scrubbed backwards. Only the newest frames are kept whole. Every
+# other frame is stored as the XOR of it and the frame after it, so
+# scrubbing back walks from the newest frame one XOR at a time and there
+# are no keyframes. Snapshots of a level have a fixed layout and little
+# changes from tick to tick, so the XORs are almost all zeros.
+#
+# The game saves each snapshot straight into a staging buffer. Every
+# GROUP_FRAMES frames the staged frames are turned into XORs in place and
+# deflated together by one long-lived compressor, and the compressed groups
+# are kept in one preallocated bytearray ring behind fixed-size headers. A
+# frame costs about 23 bytes, with no zlib stream or bytes object of its own.
+#
+# Recording allocates no buffers of its own. What it still allocates is
+# short-lived, and none of it is a container, so none of it counts towards
+# a garbage collection:
+# - every frame, about 250 bytes of ints and floats while the snapshot is
+#   packed;
+# - once a group, a few KiB of big ints for the XORs, and the 32 KiB output
+#   buffer zlib takes for each compress and flush call and frees before
+#   returning. The latter sets the peak in the diagnostics report
+#   (diagnostics.py); Python's zlib has no way to compress into a buffer of
+#   ours.
+#
+# Measured by the benchmark below (600 frames of level 2, 113-byte
+# snapshots, 6.6 KiB/s uncompressed): before, with a zlib-compressed bytes
+# object per frame against a keyframe every 60 frames, 6.0 KiB/s held;
+# now 1.4 KiB/s stored, in 26 KiB allocated up front for all 10 seconds
+# (2.6 KiB/s). Recording, including saving the snapshot, takes about
+# 12 us a frame; rewinding takes 2 us a frame instead of 13.
+#
+# Usage (benchmark):
+#   python rewind.py
+# =============================================================================
+
+import array
+import struct
+import sys
+import zlib
+
+import snapshot
+
+GROUP_FRAMES = 16 # Frames deflated together
+RING_BYTES_PER_FRAME = 32 # Starting ring size per frame of capacity; it grows if levels need more
+
+# kind, frames, frame size, payload size
+_BLOCK = struct.Struct("<BHHH")
+DELTAS, FULL = 0, 1 # A group of XORs, or one whole frame where the snapshot layout changed
+
+
+class RewindBuffer:
+    """The most recent snapshots, as XORs against the frame after each.
+
+    The newest frames are kept whole in `staging`, newest last. Before them
+    come compressed blocks of XORs in the `ring` bytearray. Blocks are
+    written at increasing byte positions, which wrap around the ring; a
+    block never straddles its end. `blocks` holds the positions of the live
+    blocks, oldest first, in a ring of its own. Whole blocks are evicted
+    once the frames after them make up `capacity`, so at least `capacity`
+    frames and at most a block more are kept.
+    """
+    def __init__(self, seconds=10, fps=60, group_frames=GROUP_FRAMES):
+        self.capacity = seconds * fps
+        self.group_frames = group_frames
+        self.ring = bytearray(self.capacity * RING_BYTES_PER_FRAME)
+        # Every block holds at least one frame
+        self.blocks = array.array("Q", bytes(8 * (self.capacity + group_frames + 1)))
+        self.staging = bytearray()
+        # Raw deflate, without zlib's header and checksum. A full flush ends
+        # every block, so each one inflates on its own
+        self.compressor = zlib.compressobj(6, zlib.DEFLATED, -11, 1)
+        self.clear()
+
+    def __len__(self):
+        return self.count
+
+    def clear(self):
+        """Forgets every recorded frame."""
+        self.count = 0
+        self.frame_size = 0
+        self.staged = 0 # Whole frames in staging
+        self.first_block = self.block_count = 0
+        self.start = self.end = 0 # Byte positions of the oldest block and past the newest
+
+    def push(self, data):
+        """Records a snapshot, evicting the oldest ones once there are more than capacity."""
+        offset = self.next_frame(len(data))
+        self.staging[offset:offset + len(data)] = data
+
+    def record(self, world, scroll=0.0):
+        """Records a snapshot of the world, saved straight into the staging buffer."""
+        offset = self.next_frame(snapshot.size(world))
+        snapshot.save_into(world, self.staging, offset, scroll)
+
+    def next_frame(self, size):
+        """Makes room for a new frame of `size` bytes and returns its offset in staging."""
+        if self.staged and size != self.frame_size:
+            # The layout changed (a new level): keep the previous frame whole
+            self.flush()
+            self.write(FULL, 1, self.frame_size, memoryview(self.staging)[:self.frame_size])
+            self.staged = 0
+        elif self.staged > self.group_frames:
+            self.flush()
+        if not self.staged:
+            self.frame_size = size
+            if len(self.staging) < (self.group_frames + 1) * size:
+                self.staging = bytearray((self.group_frames + 1) * size)
+        offset = self.staged * size
+        self.staged += 1
+        self.count += 1
+        while self.block_count and self.count - self.block_frames(0) >= self.capacity:
+            self.evict()
+        return offset
+
+    def pop(self):
+        """Removes and returns the most recent snapshot, or None if empty."""
+        if not self.count:
+            return None
+        size = self.frame_size
+        self.count -= 1
+        self.staged -= 1
+        data = bytes(memoryview(self.staging)[self.staged * size:(self.staged + 1) * size])
+        if not self.count:
+            self.clear()
+        elif not self.staged:
+            self.unpack_newest(data)
+        return data
+
+    def flush(self):
+        """Compresses every staged frame but the newest into a block, as XORs.
+
+        The newest frame, which the last XOR is against, moves to the start
+        of staging.
+        """
+        frames = self.staged - 1
+        if frames < 1:
+            return
+        size = self.frame_size
+        length = frames * size
+        with memoryview(self.staging) as view:
+            view[:length] = snapshot.xor_bytes(view[:length], view[size:length + size])
+            payload = self.compressor.compress(view[:length]) + self.compressor.flush(zlib.Z_FULL_FLUSH)
+            self.write(DELTAS, frames, size, payload)
+            view[:size] = view[length:length + size]
+        self.staged = 1
+
+    def unpack_newest(self, after):
+        """Takes the newest block off the ring into staging, undoing its XORs from the frame `after` it."""
+        self.block_count -= 1
+        position = self.blocks[(self.first_block + self.block_count) % len(self.blocks)]
+        offset = position % len(self.ring)
+        kind, frames, size, payload_size = _BLOCK.unpack_from(self.ring, offset)
+        payload = self.ring[offset + _BLOCK.size:offset + _BLOCK.size + payload_size]
+        self.end = position
+        self.frame_size = size
+        self.staged = frames
+        if len(self.staging) < (self.group_frames + 1) * size:
+            self.staging = bytearray((self.group_frames + 1) * size)
+        if kind == FULL:
+            self.staging[:size] = payload
+            return
+        data = zlib.decompressobj(-15).decompress(payload)
+        for index in reversed(range(frames)):
+            after = snapshot.xor_bytes(data[index * size:(index + 1) * size], after)
+            self.staging[index * size:(index + 1) * size] = after
+
+    def block_frames(self, index):
+        """Frames recorded in a live block, counting from the oldest."""
+        position = self.blocks[(self.first_block + index) % len(self.blocks)]
+        return _BLOCK.unpack_from(self.ring, position % len(self.ring))[1]
+
+    def evict(self):
+        """Drops the oldest block."""
+        self.count -= self.block_frames(0)
+        self.first_block = (self.first_block + 1) % len(self.blocks)
+        self.block_count -= 1
+        self.start = self.blocks[self.first_block] if self.block_count else self.end
+
+    def write(self, kind, frames, size, payload):
+        """Appends a block to the ring, making room for it first."""
+        length = _BLOCK.size + len(payload)
+        while True:
+            position = self.end
+            offset = position % len(self.ring)
+            if offset + length > len(self.ring):
+                position += len(self.ring) - offset # Skip to the start rather than straddle the end
+            if position + length - self.start <= len(self.ring):
+                break
+            if self.block_count and self.count - self.block_frames(0) >= self.capacity:
+                self.evict()
+            else:
+                self.grow(length)
+        offset = position % len(self.ring)
+        _BLOCK.pack_into(self.ring, offset, kind, frames, size, len(payload))
+        self.ring[offset + _BLOCK.size:offset + length] = payload
+        if not self.block_count:
+            self.start = position
+        self.blocks[(self.first_block + self.block_count) % len(self.blocks)] = position
+        self.block_count += 1
+        self.end = position + length
+
+    def grow(self, length):
+        """Doubles the ring (at least), moving the live blocks to its start."""
+        old, count = self.ring, len(self.ring)
+        self.ring = bytearray(max(2 * count, 2 * length))
+        position = 0
+        for i in range(self.block_count):
+            index = (self.first_block + i) % len(self.blocks)
+            offset = self.blocks[index] % count
+            block_length = _BLOCK.size + _BLOCK.unpack_from(old, offset)[3]
+            self.ring[position:position + block_length] = old[offset:offset + block_length]
+            self.blocks[index] = position
+            position += block_length
+        self.start, self.end = 0, position
+
+    def stored_bytes(self):
+        """Bytes of recorded frames: the live blocks and the staged frames."""
+        return self.end - self.start + self.staged * self.frame_size
+
+    def memory_used(self):
+        """Bytes allocated for the buffer, whether used yet or not."""
+        return sys.getsizeof(self.ring) + sys.getsizeof(self.blocks) + sys.getsizeof(self.staging)
+
+
+def main():
+    """Records random bot play and reports memory per second and rewind cost."""
+    import random
+    import time
+    import bot_env
+    import platformer
+
+    seconds, fps = 10, platformer.FPS
+    rng = random.Random(0)
+    env = bot_env.PlatformerEnv(level_index=1, max_steps=10 ** 9)
+    env.reset()
+    buffer = RewindBuffer(seconds, fps)
+
+    record_time = 0
+    recorded = []
+    for _ in range(seconds * fps):
+        env.step(rng.randrange(bot_env.NUM_ACTIONS))
+        recorded.append(snapshot.save(env.world))
+        start = time.perf_counter()
+        buffer.record(env.world)
+        record_time += time.perf_counter() - start
+    frames = len(buffer)
+    stored, allocated = buffer.stored_bytes(), buffer.memory_used()
+    raw = len(recorded[-1]) * frames
+
+    start = time.perf_counter()
+    rewound = []
+    while len(buffer):
+        rewound.append(buffer.pop())
+    rewind_time = time.perf_counter() - start
+    for data in rewound:
+        snapshot.restore(env.world, data)
+
+    print(f"Recorded {frames} frames ({seconds} s): {stored / seconds / 1024:.1f} KiB per second stored, "
+          f"{allocated / 1024:.1f} KiB allocated ({raw / seconds / 1024:.1f} KiB per second uncompressed)")
+    print(f"Record cost {record_time / frames * 1e6:.1f} us/frame, rewind cost {rewind_time / frames * 1e6:.1f} us/frame")
+    print(f"Rewound frames match: {rewound == recorded[::-1]}")
+
+if __name__ == "__main__":
+    main()
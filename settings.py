@@ -0,0 +1,50 @@
+# =============================================================================
+# Platformer: The Mysterious Path - Settings
+#
+# Player settings that persist between sessions, stored as JSON next to the
+# game. Missing or unreadable files fall back to the defaults.
+# =============================================================================
+
+import json
+
+SETTINGS_PATH = "settings.json"
+
+DEFAULT_SETTINGS = {
+    # Fraction of the window resolution the game world is rendered at
+    "render_scale": 1.0,
+    # Rendering backend, "software" or "gpu" (falls back to software if unavailable)
+    "renderer": "software",
+    # Move the loaded level and assets out of the garbage collector's way
+    # (see diagnostics.freeze_after_load)
+    "gc_freeze": False,
+    # Record gameplay events and frame times to compressed files in the
+    # telemetry folder of the directory the game is started from (see
+    # telemetry.py); off unless turned on
+    "telemetry": False,
+    # Changes to the default controls, action -> key names or controller
+    # buttons (see controls.py)
+    "key_bindings": {},
+    "button_bindings": {},
+}
+
+
+def load_settings(path=SETTINGS_PATH):
+    """Returns the saved settings merged over the defaults."""
+    settings = dict(DEFAULT_SETTINGS)
+    try:
+        with open(path) as f:
+            settings.update(json.load(f))
+    except FileNotFoundError:
+        pass
+    except (OSError, ValueError) as e:
+        print(f"Error loading settings {path}: {e}")
+    return settings
+
+
+def save_settings(settings, path=SETTINGS_PATH):
+    """Writes the settings to disk."""
+    try:
+        with open(path, "w") as f:
+            json.dump(settings, f, indent=4)
+    except OSError as e:
+        print(f"Error saving settings {path}: {e}")
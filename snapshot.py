@@ -0,0 +1,130 @@
+# =============================================================================
+# Platformer: The Mysterious Path - World Snapshots
+#
+# Serialises the complete state of a World (players, enemies, remaining
+# parts, world clock, camera scroll and level) into a compact binary blob and restores
+# it in place. Static level data (tiles, goal, traps) is never stored: it is
+# rebuilt from the level index, so a snapshot of a level always has the same
+# size and layout, which keeps deltas between snapshots small. Animation
+# frames aren't stored either: they follow from the world clock.
+#
+# Usage (benchmark):
+#   python snapshot.py
+# =============================================================================
+
+import struct
+
+VERSION = 3
+
+# Animation states are stored by index
+PLAYER_STATES = ("idle", "walk", "jump", "fall", "hurt", "win", "lose")
+
+_HEADER = struct.Struct("<BBddBHH") # version, level, scroll, world time, player count, enemy count, part count
+_PLAYER = struct.Struct("<iidd?bb?dd?Bd")
+_ENEMY = struct.Struct("<ib")
+
+
+def xor_bytes(a, b):
+    """XORs two equally long snapshots, e.g. to send or store one as a delta against the other."""
+    return (int.from_bytes(a, "little") ^ int.from_bytes(b, "little")).to_bytes(len(a), "little")
+
+
+def size(world):
+    """The size of a snapshot of the world, in bytes."""
+    return (_HEADER.size + len(world.players) * _PLAYER.size + len(world.enemies) * _ENEMY.size
+            + (len(world.all_parts) + 7) // 8)
+
+
+def save(world, scroll=0.0):
+    """Returns a snapshot of the world (and the camera scroll) as bytes."""
+    data = bytearray(size(world))
+    save_into(world, data, 0, scroll)
+    return bytes(data)
+
+
+def save_into(world, buffer, offset=0, scroll=0.0):
+    """Writes a snapshot of the world into a writable buffer at `offset`, e.g. one reused every frame."""
+    world.sync()
+    enemies, all_parts, parts = world.enemies, world.all_parts, world.parts
+    _HEADER.pack_into(buffer, offset, VERSION, world.level_index, scroll, world.time, len(world.players),
+                      len(enemies), len(all_parts))
+    offset += _HEADER.size
+    for p in world.players:
+        _PLAYER.pack_into(buffer, offset, p.rect.x, p.rect.y, p.velocity[0], p.velocity[1], p.on_ground, p.lives,
+                          p.collected_parts, p.invulnerable, p.invulnerable_timer, p.hurt_timer,
+                          p.facing_right, PLAYER_STATES.index(p.state), p.state_time)
+        offset += _PLAYER.size
+    for e in enemies:
+        _ENEMY.pack_into(buffer, offset, e.rect.x, e.direction)
+        offset += _ENEMY.size
+    for i in range((len(all_parts) + 7) // 8):
+        buffer[offset + i] = 0
+    # The remaining parts are in the same order as all_parts, so one pass finds them
+    remaining = 0
+    for i, part in enumerate(all_parts):
+        if remaining < len(parts) and parts[remaining] is part:
+            buffer[offset + i // 8] |= 1 << i % 8
+            remaining += 1
+
+
+def restore(world, data):
+    """Restores a snapshot into the world in place and returns the saved scroll.
+
+    If the snapshot belongs to another level the world loads that level
+    first, and players are added or removed to match the snapshot.
+    """
+    version, level_index, scroll, time, player_count, enemy_count, part_count = _HEADER.unpack_from(data, 0)
+    if version != VERSION:
+        raise ValueError(f"Unsupported snapshot version {version}")
+    if level_index != world.level_index:
+        world.load(level_index)
+    if player_count != len(world.players):
+        world.set_player_count(player_count)
+    world.time = time
+    offset = _HEADER.size
+
+    for p in world.players:
+        _restore_player(p, data, offset)
+        offset += _PLAYER.size
+
+    for e in world.enemies:
+        x, e.direction = _ENEMY.unpack_from(data, offset)
+        e.rect.x = x
+        offset += _ENEMY.size
+
+    mask_size = (part_count + 7) // 8
+    mask = int.from_bytes(data[offset:offset + mask_size], "little")
+    world.parts[:] = [part for i, part in enumerate(world.all_parts) if mask >> i & 1]
+    world.reset_activity()
+    return scroll
+
+
+def restore_player(world, data, index):
+    """Restores only the index'th player from a snapshot of the same level and players."""
+    _restore_player(world.players[index], data, _HEADER.size + index * _PLAYER.size)
+
+
+def _restore_player(p, data, offset):
+    (x, y, vx, vy, p.on_ground, p.lives, p.collected_parts, p.invulnerable, p.invulnerable_timer,
+     p.hurt_timer, p.facing_right, state, p.state_time) = _PLAYER.unpack_from(data, offset)
+    p.rect.x, p.rect.y = x, y
+    p.velocity = [vx, vy]
+    p.state = PLAYER_STATES[state]
+
+
+def main():
+    """Measures snapshot size and save/restore throughput for every level."""
+    import timeit
+    import platformer
+
+    for level_index in range(len(platformer.world_maps)):
+        world = platformer.World(level_index)
+        data = save(world, 100.0)
+        runs = 20000
+        save_time = timeit.timeit(lambda: save(world, 100.0), number=runs) / runs
+        restore_time = timeit.timeit(lambda: restore(world, data), number=runs) / runs
+        print(f"Level {level_index + 1}: {len(data)} bytes, save {save_time * 1e6:.1f} us "
+              f"({1 / save_time:.0f}/s), restore {restore_time * 1e6:.1f} us ({1 / restore_time:.0f}/s)")
+
+if __name__ == "__main__":
+    main()
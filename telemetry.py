@@ -0,0 +1,229 @@
+# =============================================================================
+# Platformer: The Mysterious Path - Telemetry
+#
+# Records what happens in play sessions: levels started and completed, hits,
+# falls, parts picked up, the final challenge and summaries of frame times.
+# Events are appended to an in-memory queue on the game thread, which costs
+# about a microsecond and never touches the disk. A background thread
+# drains the queue every second, turns the events into JSON Lines and
+# appends each batch to the current file as one gzip member, so a file is
+# readable with gzip.open() even if the game crashes halfway through it.
+# Files are rotated once they reach MAX_FILE_BYTES and only the newest
+# MAX_FILES are kept.
+#
+# Every record carries the session and the context (such as the level) it
+# was logged in, e.g.
+#   {"t": 1760000000.0, "session": "9f2c...", "level": 0, "event": "damage", "lives": 2, "x": 730, "y": 520}
+#
+# Usage (benchmark):
+#   python telemetry.py
+# =============================================================================
+
+import atexit
+import collections
+import contextlib
+import gzip
+import json
+import os
+import threading
+import time
+
+TELEMETRY_DIR = "telemetry"
+MAX_FILE_BYTES = 1 << 20 # Compressed size at which a new file is started
+MAX_FILES = 50 # Oldest files beyond this many are deleted
+FLUSH_INTERVAL = 1.0 # Seconds between writes
+MAX_QUEUED = 100000 # Events held in memory at most; more are dropped
+BATCH_EVENTS = 5000 # Events per gzip member at most
+FRAME_SUMMARY_MS = 10000 # Game time covered by each frame time summary
+
+
+class Telemetry:
+    """Queues events on the calling thread and writes them on a background one.
+
+    `context` is merged into every event logged after set_context(); it is
+    replaced rather than changed, so queued events keep the context they
+    were logged in. Call close() before exiting to write what is queued.
+    """
+    def __init__(self, directory=TELEMETRY_DIR, max_file_bytes=MAX_FILE_BYTES, max_files=MAX_FILES,
+                 flush_interval=FLUSH_INTERVAL, max_queued=MAX_QUEUED):
+        self.directory = directory
+        self.max_file_bytes = max_file_bytes
+        self.max_files = max_files
+        self.flush_interval = flush_interval
+        self.max_queued = max_queued
+        self.session = os.urandom(8).hex()
+        self.context = {"session": self.session}
+        self.enabled = True
+        self.queue = collections.deque() # (time, name, context, fields); appends and pops are thread-safe
+        self.stats = {"events": 0, "dropped": 0, "batches": 0, "bytes": 0}
+        self.frame_times = [] # ms of each frame since the last summary
+        self.frame_total = 0.0
+
+        # Writer state, only touched by the writer thread
+        self.file_index = 0
+        self.path = None
+
+        self.wake = threading.Event()
+        self.stopping = False
+        self.thread = threading.Thread(target=self.run, name="telemetry", daemon=True)
+        self.thread.start()
+        atexit.register(self.close) # Scripts that never call close() still keep their last events
+
+    def event(self, name, **fields):
+        """Queues one event; never blocks."""
+        if not self.enabled:
+            return
+        if len(self.queue) >= self.max_queued:
+            self.stats["dropped"] += 1 # The writer has fallen far behind, e.g. the disk is stuck
+            return
+        self.queue.append((time.time(), name, self.context, fields))
+
+    def set_context(self, **context):
+        """Adds fields, e.g. the level, to every event logged from now on."""
+        self.context = {**self.context, **context}
+
+    @contextlib.contextmanager
+    def muted(self):
+        """Drops events logged inside the with-block, e.g. while re-simulating."""
+        enabled, self.enabled = self.enabled, False
+        try:
+            yield
+        finally:
+            self.enabled = enabled
+
+    def frame(self, dt):
+        """Records one frame's time (ms), logging a "frames" summary every FRAME_SUMMARY_MS."""
+        self.frame_times.append(dt)
+        self.frame_total += dt
+        if self.frame_total >= FRAME_SUMMARY_MS:
+            times = sorted(self.frame_times)
+            count = len(times)
+            self.event("frames", frames=count, mean_ms=round(self.frame_total / count, 2),
+                       p50_ms=times[count // 2], p95_ms=times[int(count * 0.95)],
+                       p99_ms=times[int(count * 0.99)], max_ms=times[-1])
+            self.frame_times.clear()
+            self.frame_total = 0.0
+
+    def close(self):
+        """Writes whatever is still queued and stops the writer thread."""
+        self.enabled = False
+        self.stopping = True
+        self.wake.set()
+        self.thread.join()
+
+    # --- Writer thread ---
+
+    def run(self):
+        os.makedirs(self.directory, exist_ok=True)
+        self.prune()
+        while not self.stopping:
+            self.wake.wait(self.flush_interval)
+            self.drain()
+        self.drain()
+
+    def drain(self):
+        """Writes out the events queued so far, BATCH_EVENTS at a time.
+
+        Events queued meanwhile wait for the next call, so a busy game
+        can't keep the writer going indefinitely.
+        """
+        pending = len(self.queue)
+        while pending > 0:
+            count = min(pending, BATCH_EVENTS)
+            pending -= count
+            self.write_batch([self.queue.popleft() for _ in range(count)])
+
+    def write_batch(self, events):
+        """Appends the events to the current file as one gzip member."""
+        lines = [json.dumps({"t": round(t, 3), **context, "event": name, **fields}, separators=(",", ":"))
+                 for t, name, context, fields in events]
+        data = gzip.compress(("\n".join(lines) + "\n").encode(), 6)
+        if self.path is None:
+            self.path = self.file_path()
+        try:
+            with open(self.path, "ab") as f:
+                f.write(data)
+                size = f.tell()
+        except OSError as e:
+            print(f"Error writing telemetry {self.path}: {e}")
+            self.stats["dropped"] += len(lines)
+            return
+        self.stats["events"] += len(lines)
+        self.stats["batches"] += 1
+        self.stats["bytes"] += len(data)
+        if size >= self.max_file_bytes:
+            # Rotate: the next batch starts a new file
+            self.file_index += 1
+            self.path = None
+            self.prune()
+
+    def file_path(self):
+        return os.path.join(self.directory, f"{self.session}-{self.file_index:04d}.jsonl.gz")
+
+    def prune(self):
+        """Deletes the oldest telemetry files beyond max_files."""
+        try:
+            paths = [os.path.join(self.directory, name) for name in os.listdir(self.directory)
+                     if name.endswith(".jsonl.gz")]
+            paths.sort(key=os.path.getmtime)
+            for path in paths[:max(0, len(paths) - self.max_files)]:
+                os.remove(path)
+        except OSError as e:
+            print(f"Error pruning telemetry in {self.directory}: {e}")
+
+
+class NoTelemetry:
+    """Stands in for Telemetry where nothing is recorded; every method does nothing."""
+    enabled = False
+
+    @contextlib.contextmanager
+    def muted(self):
+        yield
+
+    def event(self, name, **fields): pass
+    def set_context(self, **context): pass
+    def frame(self, dt): pass
+    def close(self): pass
+
+
+def read_events(path):
+    """Yields the events in one telemetry file, one dict at a time."""
+    with gzip.open(path, "rt") as f:
+        for line in f:
+            yield json.loads(line)
+
+
+def main():
+    """Measures the cost of logging an event on the game thread, and the writer's throughput."""
+    import random
+    import tempfile
+    import timeit
+
+    runs = 200000
+    with tempfile.TemporaryDirectory() as directory:
+        log = Telemetry(directory, flush_interval=0.05, max_queued=runs * 10)
+        log.set_context(level=0)
+        rng = random.Random(0)
+        positions = [(rng.randrange(8448), rng.randrange(720)) for _ in range(1024)]
+        for name, target in (("Telemetry.event", log), ("NoTelemetry.event", NoTelemetry())):
+            calls = iter(range(runs))
+            def log_one():
+                x, y = positions[next(calls) % 1024]
+                target.event("damage", lives=2, x=x, y=y)
+            per_call = timeit.timeit(log_one, number=runs) / runs
+            print(f"{name}: {per_call * 1e6:.2f} us per event (including the benchmark's own loop)")
+        per_call = timeit.timeit(lambda: log.frame(16.7), number=runs) / runs
+        print(f"Telemetry.frame: {per_call * 1e6:.2f} us per frame")
+
+        start = time.perf_counter()
+        log.close()
+        elapsed = time.perf_counter() - start
+        files = os.listdir(directory)
+        events = sum(1 for name in files for _ in read_events(os.path.join(directory, name)))
+        stats = log.stats
+        print(f"Writer: {stats['events']} events in {stats['batches']} batches, {len(files)} file(s), "
+              f"{stats['bytes'] / stats['events']:.1f} compressed bytes per event, {events} read back, "
+              f"{elapsed:.2f} s to drain what was left at close()")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,22 @@
+import os
+import sys
+
+import pytest
+
+# The game's modules and assets are at the repository root
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+
+@pytest.fixture
+def game(monkeypatch):
+    """A started Game, with its window and audio on the dummy drivers and telemetry off."""
+    import telemetry
+    monkeypatch.chdir(ROOT) # Assets are loaded relative to the working directory
+    monkeypatch.setattr(telemetry, "Telemetry", telemetry.NoTelemetry)
+    import platformer
+    game = platformer.Game()
+    game.start()
+    return game
@@ -0,0 +1,30 @@
+import socket
+import time
+import zlib
+
+import net
+import snapshot
+
+
+def test_net_playing_scene_draws_a_frame(game):
+    from platformer import core
+    from platformer.game import NetPlayingScene, renderer
+
+    server = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    server.bind(("127.0.0.1", 0))
+    server.settimeout(2)
+    scene = NetPlayingScene(game, server.getsockname())
+    try:
+        scene.update(16) # Joins and sends the first input
+        _, client_address = server.recvfrom(net.MAX_PACKET)
+        state = snapshot.save(core.World(0))
+        server.sendto(net._STATE.pack(net.STATE, 1, net.NONE, net.NONE, 0) + zlib.compress(state), client_address)
+        deadline = time.monotonic() + 2
+        while scene.world is None and time.monotonic() < deadline:
+            scene.update(16)
+        assert scene.world is not None
+        scene.draw(renderer)
+        assert scene.pass_stats.views == 1
+    finally:
+        scene.connection.close()
+        server.close()
@@ -0,0 +1,14 @@
+import snapshot
+
+
+def test_quickload_from_another_level_redraws_its_terrain(game):
+    from platformer.game import PlayingScene
+
+    scene = PlayingScene(game, 0)
+    quicksave = snapshot.save(scene.world)
+    scene.load_level(1)
+    scene.restore(quicksave)
+    assert scene.world.level_index == 0
+    tiles = {id(tile["rect"]) for tile in scene.world.tiles}
+    drawn = {id(rect) for chunk in scene.terrain.chunk_tiles.values() for _, rect in chunk}
+    assert drawn == tiles
@@ -0,0 +1,16 @@
+from controls import ActionState
+from platformer import core
+
+
+def test_a_fall_only_sends_that_player_back(monkeypatch):
+    world = core.World(0, players=2)
+    stayer, faller = world.players
+    stayer.rect.x += 300 # Somewhere other than at the checkpoint
+    monkeypatch.setattr(stayer, "move", lambda actions, tiles: None)
+    faller.rect.top = core.SCREEN_HEIGHT + 1
+    where = stayer.rect.topleft
+    assert world.update([ActionState(), ActionState()], 16) == "respawned"
+    world.respawn_at_checkpoint()
+    assert stayer.rect.topleft == where
+    assert faller.rect.topleft == faller.spawn_point
+    assert faller.lives == 2 and faller.invulnerable